@@ -0,0 +1,105 @@
+"""
+Benchmark de los agregados del análisis exploratorio (fraudes por día, por hora y por categoría).
+
+Compara, con datos sintéticos (`synthetic_data.py`), las agregaciones con pandas (`resample` / `groupby`) con los
+conteos sobre códigos enteros con `np.bincount` de `helpers/eda_aggregates.py`, y verifica que los resultados
+coinciden. Con `--db` también mide las mismas agregaciones como consultas GROUP BY sobre una tabla de PostgreSQL
+(`sql_fraud_aggregates`).
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_eda_aggregates.py --rows 1000000
+    python benchmarks/bench_eda_aggregates.py --rows 1000000 --db pgserver
+"""
+# Librerias estandar
+import argparse
+import os
+import sys
+import time
+# Librearias de 3ros
+import pandas as pd
+from sqlalchemy import text
+
+# Permitir importar los helpers de la aplicación Streamlit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit_app'))
+
+from bench_pipeline import benchmark_engine
+from helpers.datetime_features import parsed_datetime
+from helpers.eda_aggregates import fraud_aggregates, sql_fraud_aggregates
+from synthetic_data import generate_transactions
+
+# Tabla temporal del benchmark
+BENCH_TABLE = 'bench_eda_transactions'
+
+
+def pandas_aggregates(data: pd.DataFrame) -> dict:
+    """
+    Agregados con pandas, como se calculaban antes: fechas como índice y `resample`, y `groupby` por categoría.
+    """
+    trans_dates = pd.DatetimeIndex(parsed_datetime(data, 'trans_date_trans_time'))
+    is_fraud = pd.Series(data['is_fraud'].to_numpy(dtype='int64'), index=trans_dates)
+
+    results = {}
+    for name, freq in [('per_day', 'D'), ('per_hour', 'h')]:
+        resampled = is_fraud.resample(freq)
+        results[name] = pd.DataFrame({
+            'period': resampled.size().index,
+            'total_transactions': resampled.size().to_numpy(),
+            'total_frauds': resampled.sum().to_numpy(),
+        })
+
+    by_category = data.groupby('category', observed=True)['is_fraud'].agg(total_transactions='size', total_frauds='sum')
+    by_category['fraud_pct'] = by_category['total_frauds'] / by_category['total_transactions'] * 100
+    results['by_category'] = by_category.sort_values('total_frauds', ascending=False, kind='stable').reset_index()
+
+    return results
+
+def timed(function, *args, repeat: int = 3) -> tuple:
+    """
+    Ejecuta una función `repeat` veces y retorna (mejor tiempo en segundos, último resultado).
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agregados del análisis exploratorio: pandas, bincount y SQL.")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--db', choices=['env', 'pgserver', 'none'], default='none', help="Base de datos para las consultas GROUP BY.")
+    args = parser.parse_args()
+
+    data = generate_transactions(args.rows, fraud_rate=0.01)
+    # Parsear las fechas antes de medir (ambas rutas reutilizan la misma caché)
+    parsed_datetime(data, 'trans_date_trans_time')
+
+    pandas_seconds, expected = timed(pandas_aggregates, data)
+    bincount_seconds, result = timed(fraud_aggregates, data)
+    for name in expected:
+        pd.testing.assert_frame_equal(expected[name], result[name], check_dtype=False, check_categorical=False)
+
+    print(f"{'ruta':<24}{'segundos':>12}")
+    print(f"{'pandas':<24}{pandas_seconds:>12.4f}")
+    print(f"{'bincount':<24}{bincount_seconds:>12.4f}")
+
+    engine, db_description = benchmark_engine(args.db)
+    if engine is not None:
+        print(f"\nBase de datos: {db_description}")
+        columns = ['trans_date_trans_time', 'category', 'is_fraud']
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        data[columns].to_sql(BENCH_TABLE, engine, index=False, chunksize=100_000, method='multi')
+
+        sql_seconds, sql_result = timed(sql_fraud_aggregates, engine, BENCH_TABLE)
+        assert sql_result['by_category']['total_frauds'].sum() == result['by_category']['total_frauds'].sum()
+
+        print(f"{'GROUP BY':<24}{sql_seconds:>12.4f}")
+
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+
+if __name__ == '__main__':
+    main()
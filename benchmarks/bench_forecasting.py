@@ -0,0 +1,87 @@
+"""
+Backtest del pronóstico de fraudes por hora con `FraudForecaster`.
+
+Recorre la serie con orígenes móviles: en cada origen incorpora de forma incremental las horas nuevas, pronostica
+las siguientes `--horizon` horas y compara con los fraudes reales. Reporta el MAE y el RMSE del modelo y de un
+pronóstico ingenuo estacional (repetir las últimas 24 horas), y el tiempo de la actualización y del pronóstico.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_forecasting.py --csv fraudTest.csv --horizon 24 --n-origins 30
+"""
+# Librerias estandar
+import argparse
+import os
+import sys
+import time
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+
+# Permitir importar los helpers de la aplicación Streamlit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit_app'))
+
+from helpers.datetime_features import parsed_datetime
+from helpers.forecasting import FORECAST_MODEL_PATH, SEASONAL_PERIOD, FraudForecaster
+
+
+def hourly_frauds(csv_path: str) -> pd.Series:
+    """
+    Cuenta los fraudes por hora de un CSV de transacciones, con 0 en las horas sin fraudes.
+
+    Parámetros:
+    - csv_path: Ruta al CSV de transacciones.
+
+    Retorna:
+    - Serie de fraudes indexada por hora.
+    """
+    data = pd.read_csv(csv_path, usecols=['trans_date_trans_time', 'is_fraud'])
+    hours = parsed_datetime(data, 'trans_date_trans_time').astype('datetime64[h]')
+    counts = data['is_fraud'].groupby(hours).sum()
+    counts.index = pd.DatetimeIndex(counts.index)
+
+    return counts.reindex(pd.date_range(counts.index.min(), counts.index.max(), freq=pd.Timedelta(hours=1)), fill_value=0)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backtest del pronóstico de fraudes por hora.")
+    parser.add_argument('--csv', required=True, help="CSV de transacciones con 'trans_date_trans_time' e 'is_fraud'.")
+    parser.add_argument('--model-path', default=FORECAST_MODEL_PATH)
+    parser.add_argument('--horizon', type=int, default=24, help="Horas a pronosticar desde cada origen.")
+    parser.add_argument('--n-origins', type=int, default=30, help="Número de orígenes del backtest.")
+    parser.add_argument('--step', type=int, default=24, help="Horas entre orígenes consecutivos.")
+    args = parser.parse_args()
+
+    series = hourly_frauds(args.csv)
+    first_origin = len(series) - args.horizon - (args.n_origins - 1) * args.step
+    if first_origin <= 0:
+        raise SystemExit("La serie es demasiado corta para ese número de orígenes y horizonte.")
+
+    forecaster = FraudForecaster(args.model_path)
+    forecaster.update(series.iloc[:first_origin])
+
+    errors = {'modelo': [], 'ingenuo estacional': []}
+    update_ms, forecast_ms = [], []
+    for origin in range(first_origin, first_origin + args.n_origins * args.step, args.step):
+        # Incorporar solo las horas nuevas desde el origen anterior
+        start = time.perf_counter()
+        forecaster.update(series.iloc[max(0, origin - args.step):origin])
+        update_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        forecast = forecaster.forecast(args.horizon).to_numpy()
+        forecast_ms.append((time.perf_counter() - start) * 1000)
+
+        actual = series.iloc[origin:origin + args.horizon].to_numpy()
+        naive = np.resize(series.iloc[origin - SEASONAL_PERIOD:origin].to_numpy(), args.horizon)
+        errors['modelo'].append(forecast - actual)
+        errors['ingenuo estacional'].append(naive - actual)
+
+    print(f"{len(series)} horas, {args.n_origins} orígenes, horizonte de {args.horizon} horas")
+    print(f"{'pronóstico':<20}{'MAE':>8}{'RMSE':>8}")
+    for name, error in errors.items():
+        error = np.concatenate(error)
+        print(f"{name:<20}{np.abs(error).mean():>8.3f}{np.sqrt((error ** 2).mean()):>8.3f}")
+    print(f"Actualización incremental: {np.mean(update_ms):.2f} ms; pronóstico: {np.mean(forecast_ms):.1f} ms por origen")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de la distancia Haversine: cálculo fila a fila con DataFrame.apply frente a la versión vectorizada.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_haversine.py
+"""
+# Librerias estandar
+import os
+import sys
+import time
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+
+# Permitir importar los helpers de la aplicación Streamlit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit_app'))
+
+from helpers.utils import haversine_distance, haversine_distance_array
+
+
+def make_coordinates(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Genera coordenadas aleatorias de compradores y vendedores dentro del rango del dataset original.
+
+    Parámetros:
+    - n_rows: Número de filas a generar.
+    - seed: Semilla del generador aleatorio.
+
+    Retorna:
+    - DataFrame con las columnas lat, long, merch_lat y merch_long.
+    """
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(20.0, 66.0, n_rows)
+    long = rng.uniform(-165.0, -67.0, n_rows)
+
+    return pd.DataFrame({
+        'lat': lat,
+        'long': long,
+        'merch_lat': lat + rng.uniform(-1.0, 1.0, n_rows),
+        'merch_long': long + rng.uniform(-1.0, 1.0, n_rows),
+    })
+
+def run_apply(data: pd.DataFrame) -> pd.Series:
+    """
+    Calcula la distancia fila a fila, como lo hacía originalmente `preprocessing_data`.
+    """
+    return data.apply(
+        lambda row: haversine_distance(row['lat'], row['long'], row['merch_lat'], row['merch_long']), axis=1
+    )
+
+def run_array(data: pd.DataFrame) -> np.ndarray:
+    """
+    Calcula la distancia con la versión vectorizada escribiendo en un arreglo float32 preasignado.
+    """
+    return haversine_distance_array(
+        data['lat'].to_numpy(), data['long'].to_numpy(),
+        data['merch_lat'].to_numpy(), data['merch_long'].to_numpy(),
+        out=np.empty(len(data), dtype=np.float32)
+    )
+
+def main(sizes=(10_000, 100_000, 1_000_000)) -> None:
+    print(f"{'filas':>10} {'apply [s]':>12} {'array [s]':>12} {'aceleración':>12} {'error máx [km]':>15}")
+    for n_rows in sizes:
+        data = make_coordinates(n_rows)
+
+        start = time.perf_counter()
+        expected = run_apply(data).to_numpy()
+        apply_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = run_array(data)
+        array_time = time.perf_counter() - start
+
+        max_error = np.abs(expected - result).max()
+        print(f"{n_rows:>10} {apply_time:>12.3f} {array_time:>12.4f} {apply_time / array_time:>11.0f}x {max_error:>15.2e}")
+
+
+if __name__ == '__main__':
+    main()
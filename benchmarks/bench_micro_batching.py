@@ -0,0 +1,81 @@
+"""
+Benchmark del micro-batching de predicciones frente a una llamada al modelo por transacción.
+
+Encola todas las transacciones a la vez en un `MicroBatcher` (una ráfaga de peticiones concurrentes) y compara
+las transacciones por segundo con las de llamar a `predict_proba` fila por fila. Verifica además que ambas rutas
+retornen las mismas probabilidades.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_micro_batching.py --csv fraudTest.csv --model-path streamlit_app/models/catboost_bestmodel.cbm
+"""
+# Librerias estandar
+import argparse
+import asyncio
+import os
+import sys
+import time
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+
+# Permitir importar los helpers de la aplicación Streamlit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit_app'))
+
+from helpers.micro_batching import MicroBatcher
+from helpers.scoring import REQUIRED_FIELDS, TransactionScorer
+
+
+async def score_batched(model, features: list, max_batch_size: int, max_wait_ms: float) -> tuple:
+    """
+    Puntúa todas las filas como peticiones concurrentes a través del micro-batcher.
+
+    Parámetros:
+    - model: Modelo de CatBoost.
+    - features: Lista de vectores de características.
+    - max_batch_size: Filas máximas por lote.
+    - max_wait_ms: Milisegundos máximos de espera para completar un lote.
+
+    Retorna:
+    - Una tupla con las probabilidades, el tiempo total en segundos y las estadísticas del micro-batcher.
+    """
+    async with MicroBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms) as batcher:
+        start = time.perf_counter()
+        probabilities = await asyncio.gather(*[batcher.predict(row) for row in features])
+        elapsed = time.perf_counter() - start
+
+        return np.array(probabilities), elapsed, batcher.stats()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-batching frente a una predicción por transacción.")
+    parser.add_argument('--csv', required=True, help="CSV de transacciones (mismo formato que el de la aplicación).")
+    parser.add_argument('--model-path', default='streamlit_app/models/catboost_bestmodel.cbm')
+    parser.add_argument('--n', type=int, default=10_000, help="Número de transacciones a puntuar.")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    records = pd.read_csv(args.csv, usecols=REQUIRED_FIELDS, nrows=args.n).to_dict('records')
+    scorer = TransactionScorer(model_path=args.model_path)
+    features = [scorer.features(record) for record in records]
+
+    # Calentamiento: la primera llamada a CatBoost inicializa estructuras internas
+    scorer.model.predict_proba(features[0].reshape(1, -1), thread_count=1)
+
+    # Una llamada al modelo por transacción
+    start = time.perf_counter()
+    single = np.array([scorer.model.predict_proba(row.reshape(1, -1), thread_count=1)[0, 1] for row in features])
+    single_elapsed = time.perf_counter() - start
+
+    batched, batched_elapsed, stats = asyncio.run(
+        score_batched(scorer.model, features, args.max_batch_size, args.max_wait_ms)
+    )
+
+    print(f"{'ruta':<16}{'filas/s':>12}")
+    print(f"{'por llamada':<16}{len(features) / single_elapsed:>12.0f}")
+    print(f"{'micro-batching':<16}{len(features) / batched_elapsed:>12.0f}")
+    print(f"Tamaño medio de lote: {stats['mean_batch_size']:.1f} ({stats['batches']} lotes)")
+    print(f"Diferencia máxima entre probabilidades: {np.abs(batched - single).max():.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+"""
+Benchmark del pipeline completo de predicción y carga con transacciones sintéticas (`synthetic_data.py`).
+
+Para cada tamaño genera (una sola vez) un .zip sintético y mide, con el `StageProfiler` de la aplicación, el
+tiempo, las filas por segundo y el pico de memoria de cada etapa:
+- Carga: `cache_uploaded_zip` y `load_dataset` (la caché en disco de la página de predicciones).
+- Modelo: `preprocessing_data`, `scale_features` y `catboost_model`, y la ruta actual de la página
+  (`build_feature_matrix`).
+- SQL: `normalize_tables`, `bulk_load_tables` con las 5 tablas de la página 'Carga a la BD', `append_new_data_to_db` (carga repetida de
+  usuarios: todos duplicados) y `check_users_in_db`.
+
+La base de datos es la de las variables de entorno (DB_USER, DB_HOST, ...) o, si no están definidas, un PostgreSQL
+local temporal con `pgserver` (pip install pgserver). Las tablas se crean con el prefijo 'bench_' y se eliminan al
+terminar. Sin base de datos disponible, las etapas SQL se omiten.
+
+Los resultados de cada ejecución se guardan en `--results-dir` como JSON y se agregan a `history.csv` con el commit
+actual, para comparar el rendimiento entre commits (`--compare` muestra la relación con el commit anterior). La
+carpeta por defecto, benchmarks/results/, no se versiona: el historial es propio de cada máquina.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_pipeline.py --sizes 10000,100000,1000000,5000000
+    python benchmarks/bench_pipeline.py --sizes 10000,100000 --db none --compare
+"""
+# Librerias estandar
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+# Librearias de 3ros
+import pandas as pd
+from sqlalchemy import create_engine, text
+from streamlit import config as st_config
+import streamlit.logger
+
+# Permitir importar los helpers de la aplicación Streamlit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit_app'))
+
+from helpers.artifacts import load_joblib
+from helpers.compiled_model import load_prediction_model
+from helpers.features import build_feature_matrix
+from helpers.normalization import normalize_tables
+from helpers.preprocessing import preprocessing_data, scale_features
+from helpers.profiling import StageProfiler, profile_stage
+from helpers.sql_utils import TABLE_DEPENDENCIES, append_new_data_to_db, bulk_load_tables, check_users_in_db, get_engine
+from helpers.upload_cache import cache_uploaded_zip, load_dataset
+from helpers.utils import catboost_model
+from synthetic_data import synthetic_zip
+
+# Los mensajes de Streamlit de los helpers SQL (st.info, st.success) no aplican fuera de la aplicación.
+# La configuración se lee antes, porque al leerla Streamlit restablece el nivel de los logs.
+st_config.get_config_options()
+streamlit.logger.set_log_level('error')
+
+# Prefijo de las tablas que crea el benchmark, para no tocar las tablas de la aplicación
+TABLE_PREFIX = 'bench_'
+
+
+def benchmark_engine(db: str):
+    """
+    Retorna el engine de la base de datos del benchmark.
+
+    Parámetros:
+    - db: 'env' (variables de entorno), 'pgserver' (PostgreSQL local temporal), 'none' o 'auto' (env si está
+      definida DB_HOST; si no, pgserver si está instalado; si no, none).
+
+    Retorna:
+    - Una tupla con el engine (o None) y la descripción de la base de datos.
+    """
+    if db == 'auto':
+        if os.getenv('DB_HOST'):
+            db = 'env'
+        else:
+            try:
+                import pgserver  # noqa: F401
+                db = 'pgserver'
+            except ImportError:
+                db = 'none'
+
+    if db == 'env':
+        return get_engine(), f"PostgreSQL en {os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}"
+    if db == 'pgserver':
+        import pgserver
+        # El servidor se detiene al terminar el proceso; los datos quedan en una carpeta temporal
+        server = pgserver.get_server(tempfile.mkdtemp(prefix='bench_pg_'))
+        uri = server.get_uri().replace('postgresql://', 'postgresql+psycopg2://', 1)
+        return create_engine(uri), "PostgreSQL local (pgserver)"
+
+    return None, "sin base de datos"
+
+def drop_benchmark_tables(engine) -> None:
+    """
+    Elimina las tablas creadas por el benchmark.
+    """
+    with engine.begin() as connection:
+        for table_name in TABLE_DEPENDENCIES:
+            connection.execute(text(f'DROP TABLE IF EXISTS "{TABLE_PREFIX}{table_name}"'))
+
+def run_pipeline(zip_path: str, scaler, model, engine=None, cache_dir: str = None) -> StageProfiler:
+    """
+    Ejecuta una vez el pipeline sobre un .zip y mide cada etapa.
+
+    Parámetros:
+    - zip_path: Ruta del .zip de transacciones.
+    - scaler: Escalador entrenado.
+    - model: Modelo de predicción.
+    - engine: Engine de la base de datos, o None para omitir las etapas SQL.
+    - cache_dir: Carpeta de la caché de datasets (vacía, para medir el primer parseo).
+
+    Retorna:
+    - El StageProfiler con las etapas medidas.
+    """
+    profiler = StageProfiler()
+    with profiler.activate():
+        # Carga: registrar el zip en la caché en disco y abrir el dataset
+        with open(zip_path, 'rb') as uploaded_file:
+            dataset_key = cache_uploaded_zip(uploaded_file, cache_dir=cache_dir)
+        data = load_dataset(dataset_key, cache_dir=cache_dir)
+
+        # Modelo: preprocesamiento, escalado y predicción con las funciones originales
+        features = preprocessing_data(data)
+        target = features.pop('is_fraud')
+        features_scaled = scale_features(features, scaler)
+        predictions, _, _ = catboost_model(features_scaled, target, model)
+        del features, features_scaled
+
+        # Ruta actual de la página de predicciones: matriz float32 escalada en una sola pasada
+        build_feature_matrix(data, scaler)
+
+        if engine is not None:
+            drop_benchmark_tables(engine)
+            # Las 5 tablas de la página 'Carga a la BD': 4 normalizadas desde el dataset y la de predicciones
+            tables = normalize_tables(data)
+            tables['predictions'] = pd.DataFrame({'trans_num': data['trans_num'], 'is_fraud': predictions})
+
+            # SQL: carga con COPY de las 5 tablas, en paralelo según sus dependencias
+            with profile_stage('bulk_load_tables', sum(len(table) for table in tables.values())):
+                bulk_load_tables(
+                    {TABLE_PREFIX + name: table for name, table in tables.items()},
+                    engine,
+                    dependencies={
+                        TABLE_PREFIX + name: [TABLE_PREFIX + dep for dep in deps] for name, deps in TABLE_DEPENDENCIES.items()
+                    }
+                )
+
+            # SQL: volver a cargar los usuarios (todos duplicados) y consultar cuáles existen
+            users = tables['users']
+            with profile_stage('append_new_data_to_db', len(users)):
+                append_new_data_to_db(['cc_num'], TABLE_PREFIX + 'users', users, engine)
+            with profile_stage('check_users_in_db', len(users)):
+                check_users_in_db(users, 'cc_num', TABLE_PREFIX + 'users', engine)
+
+            drop_benchmark_tables(engine)
+
+    return profiler
+
+def git_commit() -> dict:
+    """
+    Retorna el commit actual y si hay cambios sin confirmar (None si no es un repositorio git).
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+    return {'commit': commit, 'dirty': dirty}
+
+def save_results(results: pd.DataFrame, metadata: dict, results_dir: str) -> str:
+    """
+    Guarda los resultados de la ejecución en un JSON propio y los agrega a `history.csv`.
+
+    Parámetros:
+    - results: Una fila por tamaño y etapa.
+    - metadata: Commit, fecha, máquina y base de datos de la ejecución.
+    - results_dir: Carpeta de resultados.
+
+    Retorna:
+    - La ruta del JSON de la ejecución.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    run_name = f"{metadata['date'].replace(':', '').replace('-', '')}_{metadata['commit'] or 'nogit'}"
+    json_path = os.path.join(results_dir, f'{run_name}.json')
+    with open(json_path, 'w') as f:
+        json.dump({**metadata, 'results': results.to_dict('records')}, f, indent=2, default=float)
+
+    # Historial plano: una fila por ejecución, tamaño y etapa
+    history = results.assign(date=metadata['date'], commit=metadata['commit'], dirty=metadata['dirty'])
+    history_path = os.path.join(results_dir, 'history.csv')
+    history.to_csv(history_path, mode='a', index=False, header=not os.path.exists(history_path))
+
+    return json_path
+
+def compare_with_previous(results: pd.DataFrame, metadata: dict, results_dir: str) -> pd.DataFrame:
+    """
+    Compara los segundos de cada etapa con la ejecución más reciente de otro commit.
+
+    Parámetros:
+    - results: Resultados de esta ejecución.
+    - metadata: Metadatos de esta ejecución.
+    - results_dir: Carpeta de resultados (con `history.csv`).
+
+    Retorna:
+    - DataFrame con los segundos de ambas ejecuciones y la relación (mayor que 1: esta ejecución es más rápida),
+      o None si no hay una ejecución anterior de otro commit.
+    """
+    history_path = os.path.join(results_dir, 'history.csv')
+    if not os.path.exists(history_path):
+        return None
+
+    history = pd.read_csv(history_path)
+    previous = history[(history['commit'] != metadata['commit']) & (history['date'] < metadata['date'])]
+    if previous.empty:
+        return None
+
+    last = previous[previous['date'] == previous['date'].max()]
+    comparison = results.merge(last, on=['filas_dataset', 'etapa'], suffixes=('', '_anterior'))[
+        ['filas_dataset', 'etapa', 'segundos_anterior', 'segundos']
+    ]
+    comparison['aceleracion'] = comparison['segundos_anterior'] / comparison['segundos']
+    comparison.attrs['commit'] = last['commit'].iloc[0]
+
+    return comparison
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rendimiento del pipeline de predicción y carga con datos sintéticos.")
+    parser.add_argument('--sizes', default='10000,100000,1000000,5000000', help="Filas de cada dataset, separadas por comas.")
+    parser.add_argument('--model-path', default='streamlit_app/models/catboost_bestmodel.cbm')
+    parser.add_argument('--scaler-path', default='streamlit_app/models/scaler.pkl')
+    parser.add_argument('--db', choices=['auto', 'env', 'pgserver', 'none'], default='auto', help="Base de datos para las etapas SQL.")
+    parser.add_argument('--data-dir', default='benchmarks/data', help="Carpeta de los .zip sintéticos generados.")
+    parser.add_argument('--results-dir', default='benchmarks/results', help="Carpeta de los resultados.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', action='store_true', help="Comparar con la ejecución más reciente de otro commit.")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    scaler = load_joblib(args.scaler_path)
+    model = load_prediction_model(args.model_path)
+    engine, db_description = benchmark_engine(args.db)
+    print(f"Base de datos: {db_description}")
+
+    # Calentamiento con el tamaño más pequeño: la primera ejecución carga las tablas de referencia y el codificador
+    with tempfile.TemporaryDirectory(prefix='bench_cache_') as cache_dir:
+        run_pipeline(synthetic_zip(min(sizes), args.data_dir, seed=args.seed), scaler, model, cache_dir=cache_dir)
+
+    results = []
+    for n_rows in sizes:
+        zip_path = synthetic_zip(n_rows, args.data_dir, seed=args.seed)
+        with tempfile.TemporaryDirectory(prefix='bench_cache_') as cache_dir:
+            summary = run_pipeline(zip_path, scaler, model, engine, cache_dir).summary()
+        summary.insert(0, 'filas_dataset', n_rows)
+        results.append(summary)
+        print(f"\n{n_rows} filas")
+        print(summary.drop(columns='filas_dataset').to_string(index=False, float_format=lambda x: f'{x:.3f}'))
+
+    results = pd.concat(results, ignore_index=True)
+    metadata = {
+        **git_commit(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'database': db_description,
+    }
+
+    comparison = compare_with_previous(results, metadata, args.results_dir) if args.compare else None
+    json_path = save_results(results, metadata, args.results_dir)
+    print(f"\nResultados guardados en {json_path}")
+
+    if comparison is not None:
+        print(f"\nComparación con el commit {comparison.attrs['commit']}")
+        print(comparison.to_string(index=False, float_format=lambda x: f'{x:.3f}'))
+    elif args.compare:
+        print("\nNo hay una ejecución anterior de otro commit para comparar.")
+
+
+if __name__ == '__main__':
+    main()
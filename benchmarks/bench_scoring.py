@@ -0,0 +1,69 @@
+"""
+Benchmark de la latencia de puntuación de transacciones individuales con `TransactionScorer`.
+
+Mide, transacción por transacción, el tiempo de calcular las características y el tiempo total con la predicción
+de CatBoost, y reporta los percentiles p50, p95 y p99 en milisegundos.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_scoring.py --csv fraudTest.csv --model-path streamlit_app/models/catboost_bestmodel.cbm
+"""
+# Librerias estandar
+import argparse
+import os
+import sys
+import time
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+
+# Permitir importar los helpers de la aplicación Streamlit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit_app'))
+
+from helpers.scoring import REQUIRED_FIELDS, TransactionScorer
+
+
+def measure(function, records: list) -> np.ndarray:
+    """
+    Ejecuta una función sobre cada registro y retorna la latencia de cada llamada en milisegundos.
+
+    Parámetros:
+    - function: Función que recibe un registro.
+    - records: Lista de registros.
+
+    Retorna:
+    - Arreglo con la latencia de cada llamada en milisegundos.
+    """
+    latencies = np.empty(len(records))
+    for i, record in enumerate(records):
+        start = time.perf_counter()
+        function(record)
+        latencies[i] = time.perf_counter() - start
+
+    return latencies * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latencia de puntuación de transacciones individuales.")
+    parser.add_argument('--csv', required=True, help="CSV de transacciones (mismo formato que el de la aplicación).")
+    parser.add_argument('--model-path', default='streamlit_app/models/catboost_bestmodel.cbm')
+    parser.add_argument('--n', type=int, default=10_000, help="Número de transacciones a puntuar.")
+    args = parser.parse_args()
+
+    records = pd.read_csv(args.csv, usecols=REQUIRED_FIELDS, nrows=args.n).to_dict('records')
+    scorer = TransactionScorer(model_path=args.model_path)
+
+    # Calentamiento: la primera llamada a CatBoost inicializa estructuras internas
+    scorer.score(records[0])
+
+    results = {
+        'caracteristicas': measure(scorer.features, records),
+        'puntuacion': measure(scorer.score, records),
+    }
+
+    print(f"{'etapa':<16}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}")
+    for stage, latencies in results.items():
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{stage:<16}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
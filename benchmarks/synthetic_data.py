@@ -0,0 +1,232 @@
+"""
+Generador de transacciones sintéticas con las mismas columnas y formatos que el archivo que se sube a la aplicación.
+
+Los vendedores, ciudades, estados y profesiones se toman de las tablas de referencia de `streamlit_app/data/` (las
+profesiones con su frecuencia de `job_freq.csv`), y las categorías y géneros son los del codificador entrenado, de
+modo que todo el pipeline (enriquecimiento, One Hot Encoding, modelo) se ejecuta igual que con datos reales. Cada
+titular de tarjeta tiene sus datos fijos y realiza muchas transacciones, como en el dataset original.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/synthetic_data.py --rows 100000 --out benchmarks/data/synthetic_100000.zip
+"""
+# Librerias estandar
+import argparse
+import io
+import os
+import zipfile
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+
+# Columnas del archivo de transacciones, en el orden del CSV original
+TRANSACTION_COLUMNS = [
+    'trans_date_trans_time', 'cc_num', 'merchant', 'category', 'amt', 'first', 'last', 'gender',
+    'street', 'city', 'state', 'zip', 'lat', 'long', 'city_pop', 'job', 'dob', 'trans_num',
+    'unix_time', 'merch_lat', 'merch_long', 'is_fraud'
+]
+
+# Categorías y géneros que conoce el codificador entrenado (models/onehotencoder.pkl)
+CATEGORIES = [
+    'entertainment', 'food_dining', 'gas_transport', 'grocery_net', 'grocery_pos', 'health_fitness', 'home',
+    'kids_pets', 'misc_net', 'misc_pos', 'personal_care', 'shopping_net', 'shopping_pos', 'travel'
+]
+GENDERS = ['F', 'M']
+
+# Nombres y calles de los titulares (no los usa el modelo, pero sí las tablas de la base de datos)
+FIRST_NAMES = [
+    'Ana', 'Carlos', 'Daniel', 'Elena', 'Fernando', 'Gabriela', 'Hugo', 'Isabel', 'Jorge', 'Laura',
+    'Manuel', 'Natalia', 'Oscar', 'Patricia', 'Ricardo', 'Sofia', 'Tomas', 'Valeria', 'Walter', 'Ximena'
+]
+LAST_NAMES = [
+    'Alvarez', 'Benitez', 'Castro', 'Diaz', 'Espinoza', 'Flores', 'Garcia', 'Herrera', 'Iglesias', 'Juarez',
+    'Lopez', 'Martinez', 'Nunez', 'Ortiz', 'Perez', 'Quiroga', 'Ramirez', 'Sanchez', 'Torres', 'Vargas'
+]
+STREET_NAMES = ['Main', 'Oak', 'Pine', 'Maple', 'Cedar', 'Elm', 'Lake', 'Hill', 'Park', 'River']
+STREET_SUFFIXES = ['St', 'Ave', 'Rd', 'Blvd', 'Ln', 'Dr']
+
+# En el dataset original, unix_time está desplazado 7 años (2557 días) respecto de trans_date_trans_time
+UNIX_TIME_OFFSET = pd.Timedelta(days=2557)
+
+# Transacciones por titular y proporción de fraudes, similares a las del archivo de prueba original
+ROWS_PER_USER = 600
+FRAUD_RATE = 0.0039
+
+
+def load_reference_values(data_dir: str = 'streamlit_app/data') -> dict:
+    """
+    Lee los valores posibles de vendedor, ciudad, estado y profesión de las tablas de referencia de la aplicación.
+
+    Parámetros:
+    - data_dir: Carpeta con los CSV de referencia.
+
+    Retorna:
+    - Diccionario con los arreglos 'merchant', 'city', 'state', 'job' y las probabilidades 'job_p'.
+    """
+    jobs = pd.read_csv(os.path.join(data_dir, 'job_freq.csv'))
+
+    return {
+        'merchant': pd.read_csv(os.path.join(data_dir, 'group_fraud_by_merch.csv'))['merchant'].to_numpy(),
+        'city': pd.read_csv(os.path.join(data_dir, 'group_fraud_by_city.csv'))['city'].to_numpy(),
+        'state': pd.read_csv(os.path.join(data_dir, 'group_fraud_by_state.csv'))['state'].to_numpy(),
+        'job': jobs['job'].to_numpy(),
+        'job_p': (jobs['proportion'] / jobs['proportion'].sum()).to_numpy(),
+    }
+
+def _categorical(rng: np.random.Generator, values, size: int, p: np.ndarray = None) -> pd.Categorical:
+    """
+    Elige `size` valores al azar y los retorna como categórico (sin crear un objeto str por fila).
+    """
+    categories = pd.unique(np.asarray(values))
+    return pd.Categorical.from_codes(rng.choice(len(categories), size=size, p=p), categories=categories)
+
+def _hex_ids(rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Genera identificadores hexadecimales de 32 caracteres, como 'trans_num'.
+    """
+    high = rng.integers(0, 2 ** 63, size=size, dtype=np.int64)
+    low = rng.integers(0, 2 ** 63, size=size, dtype=np.int64)
+
+    return np.char.add(np.char.mod('%016x', high), np.char.mod('%016x', low))
+
+def generate_users(n_users: int, reference: dict, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Genera los titulares de tarjeta con sus datos fijos (nombre, dirección, ubicación, profesión y nacimiento).
+
+    Parámetros:
+    - n_users: Número de titulares.
+    - reference: Valores de referencia (`load_reference_values`).
+    - rng: Generador de números aleatorios.
+
+    Retorna:
+    - DataFrame con una fila por titular.
+    """
+    streets = [f"{name} {suffix}" for name in STREET_NAMES for suffix in STREET_SUFFIXES]
+    birth_days = rng.integers(0, (pd.Timestamp('2002-12-31') - pd.Timestamp('1930-01-01')).days, size=n_users)
+
+    return pd.DataFrame({
+        'cc_num': rng.integers(10 ** 15, 10 ** 16, size=n_users, dtype=np.int64),
+        'first': _categorical(rng, FIRST_NAMES, n_users),
+        'last': _categorical(rng, LAST_NAMES, n_users),
+        'gender': _categorical(rng, GENDERS, n_users),
+        'street': pd.Series(rng.integers(1, 9999, size=n_users)).astype(str).to_numpy()
+                  + ' ' + np.asarray(streets)[rng.integers(0, len(streets), size=n_users)],
+        'city': _categorical(rng, reference['city'], n_users),
+        'state': _categorical(rng, reference['state'], n_users),
+        'zip': rng.integers(1001, 99951, size=n_users).astype(np.int32),
+        'lat': rng.uniform(25.0, 48.0, size=n_users),
+        'long': rng.uniform(-124.0, -68.0, size=n_users),
+        'city_pop': np.round(rng.lognormal(8.5, 2.0, size=n_users)).clip(20, 3_000_000).astype(np.int32),
+        'job': _categorical(rng, reference['job'], n_users, p=reference['job_p']),
+        'dob': (pd.Timestamp('1930-01-01') + pd.to_timedelta(birth_days, unit='D')).strftime('%Y-%m-%d'),
+    })
+
+def generate_transactions(
+    n_rows: int,
+    seed: int = 0,
+    fraud_rate: float = FRAUD_RATE,
+    start: str = '2020-06-21',
+    days: int = 194,
+    data_dir: str = 'streamlit_app/data'
+) -> pd.DataFrame:
+    """
+    Genera un DataFrame de transacciones sintéticas con las columnas del archivo que se sube a la aplicación.
+
+    Parámetros:
+    - n_rows: Número de transacciones.
+    - seed: Semilla; la misma semilla y el mismo tamaño generan los mismos datos.
+    - fraud_rate: Proporción de transacciones marcadas como fraude.
+    - start: Fecha de la primera transacción.
+    - days: Días que abarcan las transacciones.
+    - data_dir: Carpeta con los CSV de referencia.
+
+    Retorna:
+    - DataFrame ordenado por fecha, con las columnas de `TRANSACTION_COLUMNS`.
+    """
+    rng = np.random.default_rng(seed)
+    reference = load_reference_values(data_dir)
+
+    # Titulares: cada uno realiza en promedio ROWS_PER_USER transacciones
+    users = generate_users(max(n_rows // ROWS_PER_USER, 10), reference, rng)
+    user_idx = rng.integers(0, len(users), size=n_rows)
+
+    # Fechas ordenadas con resolución de segundos
+    seconds = np.sort(rng.integers(0, days * 86_400, size=n_rows))
+    trans_time = pd.Timestamp(start) + pd.to_timedelta(seconds, unit='s')
+
+    # Datos del titular de cada transacción (los categóricos se indexan por código, sin copiar los textos)
+    data = users.iloc[user_idx].reset_index(drop=True)
+
+    data['trans_date_trans_time'] = trans_time
+    data['merchant'] = _categorical(rng, reference['merchant'], n_rows)
+    data['category'] = _categorical(rng, CATEGORIES, n_rows)
+    data['amt'] = np.round(rng.lognormal(3.5, 1.2, size=n_rows), 2)
+    data['trans_num'] = _hex_ids(rng, n_rows)
+    data['unix_time'] = (trans_time - UNIX_TIME_OFFSET).asi8 // 10 ** 9
+    # El vendedor está a menos de un grado de la ubicación del titular, como en el dataset original
+    data['merch_lat'] = data['lat'] + rng.uniform(-1.0, 1.0, size=n_rows)
+    data['merch_long'] = data['long'] + rng.uniform(-1.0, 1.0, size=n_rows)
+    data['is_fraud'] = (rng.random(n_rows) < fraud_rate).astype(np.int8)
+
+    return data[TRANSACTION_COLUMNS]
+
+def write_transactions_zip(data: pd.DataFrame, path: str, csv_name: str = 'transactions.csv') -> str:
+    """
+    Escribe las transacciones como un único CSV dentro de un .zip, el formato que acepta la aplicación.
+
+    Parámetros:
+    - data: DataFrame de transacciones.
+    - path: Ruta del .zip.
+    - csv_name: Nombre del CSV dentro del .zip.
+
+    Retorna:
+    - La ruta del .zip.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    # El CSV se comprime a medida que se escribe, sin crear el archivo descomprimido en disco
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+        with zip_file.open(csv_name, 'w', force_zip64=True) as member:
+            with io.TextIOWrapper(member, encoding='utf-8', newline='') as csv_stream:
+                data.to_csv(csv_stream, index=False)
+
+    return path
+
+def synthetic_zip(n_rows: int, data_dir: str = 'benchmarks/data', seed: int = 0) -> str:
+    """
+    Retorna la ruta del .zip sintético de `n_rows` filas, generándolo solo si todavía no existe.
+
+    Parámetros:
+    - n_rows: Número de transacciones.
+    - data_dir: Carpeta donde se guardan los archivos generados.
+    - seed: Semilla del generador.
+
+    Retorna:
+    - La ruta del .zip.
+    """
+    path = os.path.join(data_dir, f'synthetic_{n_rows}_seed{seed}.zip')
+    if not os.path.exists(path):
+        # Escribir en un archivo temporal para no dejar un .zip incompleto si se interrumpe
+        tmp_path = path + '.tmp'
+        write_transactions_zip(generate_transactions(n_rows, seed=seed), tmp_path)
+        os.replace(tmp_path, path)
+
+    return path
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera un archivo de transacciones sintéticas.")
+    parser.add_argument('--rows', type=int, required=True, help="Número de transacciones.")
+    parser.add_argument('--out', required=True, help="Ruta del archivo de salida (.zip o .csv).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fraud-rate', type=float, default=FRAUD_RATE)
+    args = parser.parse_args()
+
+    data = generate_transactions(args.rows, seed=args.seed, fraud_rate=args.fraud_rate)
+    if args.out.lower().endswith('.zip'):
+        write_transactions_zip(data, args.out)
+    else:
+        data.to_csv(args.out, index=False)
+    print(f"{len(data)} transacciones escritas en {args.out}")
+
+
+if __name__ == '__main__':
+    main()
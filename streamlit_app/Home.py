@@ -1,7 +1,11 @@
+import logging
+
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
+from helpers.dashboard_metrics import load_dashboard_metrics
+from helpers.forecasting import FORECAST_HORIZON_DAYS, load_forecaster
 from helpers.utils import config_sidebar
 
 # Ajustar el ancho para toda la pantalla 
@@ -15,15 +19,20 @@ if codigo_acceso == "1234":
     # Título de la página
     st.title("Detección de Fraude en Transacciones con Tarjetas de Crédito")
 
-    # Obtener los datos de la DB
-    n_transactions = 1852394
-    n_frauds = 9651
-    n_users = 999
+    # Obtener las métricas de las tablas resumen de la DB (en caché con TTL; si no hay DB se usan las del dataset histórico)
+    metrics = load_dashboard_metrics()
+    n_transactions = metrics['n_transactions']
+    n_frauds = metrics['n_frauds']
+    n_users = metrics['n_users']
+
+    # Avisar cuando el dashboard no muestra los datos de la base de datos
+    if metrics['source'] == 'static':
+        st.warning(f"El dashboard muestra los datos estáticos del dataset histórico: {metrics['static_reason']}.")
 
-    # Carga de datasets con el top 5 de fraudes
-    top_5_fraud_merch = pd.read_csv('streamlit_app/data/top_5_fraud_merch.csv')
-    top_5_fraud_city = pd.read_csv('streamlit_app/data/top_5_fraud_city.csv')
-    top_5_fraud_state = pd.read_csv('streamlit_app/data/top_5_fraud_state.csv')
+    # Top 5 de fraudes (copias, para no modificar los DataFrames en caché)
+    top_5_fraud_merch = metrics['top_5_fraud_merch'].copy()
+    top_5_fraud_city = metrics['top_5_fraud_city'].copy()
+    top_5_fraud_state = metrics['top_5_fraud_state'].copy()
 
     # Renombrar columnas
     top_5_fraud_merch.columns = ['Vendedor', 'Fraude [%]', 'Fraudes [#]']
@@ -52,18 +61,33 @@ if codigo_acceso == "1234":
         st.subheader("Estados con Fraude")
         st.dataframe(top_5_fraud_state.set_index(top_5_fraud_state.columns[0]))
     
-    global_frauds_per_day = pd.read_csv('./streamlit_app/data/global_frauds_per_day.csv', parse_dates=['trans_date_trans_time'], index_col='trans_date_trans_time')
+    # Fraudes por día
+    global_frauds_per_day = metrics['frauds_per_day']
 
     # Crear una figura de Plotly para la gráfica de línea
 
-    # Leer datos de tmp_series_pred
-    tmp_series_pred = pd.read_csv('./streamlit_app/data/tmp_series_pred.csv', parse_dates=['date'], index_col='date')
-
-    # Definir la fecha límite para las predicciones
-    end_date = '2020-12-22'
-
-    # Filtrar las predicciones hasta la fecha límite
-    tmp_series_pred = tmp_series_pred[tmp_series_pred.index <= end_date]
+    tmp_series_pred = None
+    if metrics['frauds_per_hour'] is not None:
+        # Pronóstico con el modelo de la serie temporal a partir de los fraudes por hora de la DB
+        # (el pronosticador se comparte entre sesiones y solo se recalcula cuando llegan datos nuevos)
+        try:
+            forecaster = load_forecaster()
+            forecaster.update(metrics['frauds_per_hour']['total_frauds'])
+            tmp_series_pred = forecaster.daily_forecast(FORECAST_HORIZON_DAYS).to_frame('prediction')
+        except ValueError:
+            # Aún no hay suficientes horas de historia para los desfases del modelo
+            pass
+        except Exception:
+            # Un fallo del modelo no debe tumbar el dashboard: se registra y se usa el pronóstico del dataset histórico
+            logging.getLogger(__name__).exception("No se pudo calcular el pronóstico de fraudes.")
+            st.warning("No se pudo calcular el pronóstico con los datos de la base de datos; se muestra el del dataset histórico.")
+
+    if tmp_series_pred is None:
+        # Sin datos por hora: pronóstico del dataset histórico
+        tmp_series_pred = pd.read_csv('./streamlit_app/data/tmp_series_pred.csv', parse_dates=['date'], index_col='date')
+
+        # Filtrar las predicciones hasta el último día con datos reales
+        tmp_series_pred = tmp_series_pred[tmp_series_pred.index <= global_frauds_per_day.index.max()]
 
     # Identificar la fecha de inicio de las predicciones
     start_date_predictions = tmp_series_pred.index.min()
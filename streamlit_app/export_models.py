@@ -0,0 +1,49 @@
+"""
+Exporta los modelos CatBoost (.cbm) a su forma compilada (arreglos NumPy con memory-map), para que los workers
+arranquen sin importar catboost ni leer el .cbm completo.
+
+Es un paso manual: se ejecuta una vez después de clonar el repositorio (la carpeta 'compiled' no se versiona) y cada
+vez que se actualiza un modelo. Sin la exportación, la aplicación usa los .cbm con CatBoost. Cada exportación se
+compara con las predicciones de CatBoost antes de guardarse.
+
+Uso (desde la raíz del repositorio):
+    python streamlit_app/export_models.py
+    python streamlit_app/export_models.py --models-dir streamlit_app/models --compiled-dir streamlit_app/models/compiled
+"""
+# Librerias estandar
+import argparse
+import os
+import sys
+import time
+
+# Permitir importar los helpers de la aplicación al ejecutar el script directamente
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Librerias locales
+from helpers.compiled_model import compiled_model_dir, export_compiled_model, load_compiled_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exporta los modelos CatBoost a su forma compilada.")
+    parser.add_argument('--models-dir', default='streamlit_app/models', help="Carpeta con los modelos .cbm.")
+    parser.add_argument('--compiled-dir', default=None, help="Carpeta de destino. Por defecto, la subcarpeta 'compiled' de --models-dir.")
+    args = parser.parse_args()
+
+    model_files = sorted(file_name for file_name in os.listdir(args.models_dir) if file_name.endswith('.cbm'))
+    if not model_files:
+        print(f"No hay modelos .cbm en {args.models_dir}.")
+        return
+
+    for file_name in model_files:
+        model_path = os.path.join(args.models_dir, file_name)
+        start = time.perf_counter()
+        out_dir = export_compiled_model(model_path, compiled_model_dir(model_path, args.compiled_dir))
+        model = load_compiled_model(out_dir)
+        print(
+            f"{file_name}: {model.tree_count_} árboles exportados en {out_dir} "
+            f"({time.perf_counter() - start:.2f} s, error máximo {model.meta['verification_max_error']:.1e})"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+# Librerias estandar
+import json
+import os
+import threading
+from typing import Dict, Iterable
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+# Librerias locales
+from helpers.dashboard_metrics import METRICS_BATCHES_TABLE
+from helpers.lookup import AGGREGATE_STORE_DIR
+
+# Archivo con los conteos acumulados y los lotes ya incorporados
+AGGREGATE_STATE_FILE = 'aggregate_state.json'
+
+# Dimensiones con porcentaje y ranking de fraude: columna clave -> (archivo, columna de porcentaje, columna de ranking).
+# Los archivos tienen el mismo formato que los CSV originales de `streamlit_app/data`.
+FRAUD_DIMENSIONS = {
+    'merchant': ('group_fraud_by_merch.csv', 'fraud_merch_pct', 'fraud_merch_rank'),
+    'city': ('group_fraud_by_city.csv', 'fraud_city_pct', 'fraud_city_rank'),
+    'state': ('group_fraud_by_state.csv', 'fraud_state_pct', 'fraud_state_rank'),
+}
+
+# Dimensión codificada por frecuencia: columna clave -> archivo
+FREQUENCY_DIMENSIONS = {
+    'job': 'job_freq.csv',
+}
+
+# Un solo proceso de actualización a la vez (varias sesiones pueden cargar datos al mismo tiempo)
+_store_lock = threading.Lock()
+
+
+def _empty_counts() -> pd.DataFrame:
+    """
+    Tabla vacía de conteos: índice = valor de la clave, columnas total_sales y fraud_sales.
+    """
+    return pd.DataFrame({'total_sales': pd.Series(dtype=np.int64), 'fraud_sales': pd.Series(dtype=np.int64)})
+
+def _batch_counts(column: pd.Series, is_fraud: np.ndarray) -> pd.DataFrame:
+    """
+    Cuenta transacciones y fraudes por valor de la clave en un lote, con una sola pasada (bincount) por columna.
+    """
+    # Factorizar la columna: las columnas categóricas ya traen sus códigos
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, uniques = column.cat.codes.to_numpy(), column.cat.categories
+    else:
+        codes, uniques = pd.factorize(column)
+
+    # Las claves nulas no se cuentan
+    valid = codes >= 0
+    total_sales = np.bincount(codes[valid], minlength=len(uniques))
+    fraud_sales = np.bincount(codes[valid], weights=is_fraud[valid], minlength=len(uniques)).astype(np.int64)
+
+    counts = pd.DataFrame({'total_sales': total_sales, 'fraud_sales': fraud_sales}, index=pd.Index(uniques))
+
+    # Las categorías sin transacciones en este lote no aportan nada
+    return counts[counts['total_sales'] > 0]
+
+def _write_csv_atomic(data: pd.DataFrame, path: str, **to_csv_kwargs) -> None:
+    """
+    Escribe un CSV con un nombre temporal y luego lo renombra, para que nunca se lea un archivo a medio escribir.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    data.to_csv(tmp_path, **to_csv_kwargs)
+    os.replace(tmp_path, path)
+
+
+class AggregateStore:
+    """
+    Conteos acumulados de transacciones y fraudes por vendedor, ciudad, estado y profesión.
+
+    Cada lote etiquetado se incorpora sumando sus conteos a los acumulados, sin volver a recorrer el historial.
+    A partir de los conteos se recalculan el porcentaje y el ranking de fraude (igual que en los notebooks:
+    `fraud_sales / total_sales * 100` y `rank(ascending=False)`) y la proporción de cada profesión.
+    """
+
+    def __init__(self, counts: Dict[str, pd.DataFrame] = None, batches: Iterable[str] = ()):
+        dimensions = list(FRAUD_DIMENSIONS) + list(FREQUENCY_DIMENSIONS)
+        self.counts = {key_col_name: _empty_counts() for key_col_name in dimensions}
+        self.counts.update(counts or {})
+        self.batches = list(batches)
+
+    @classmethod
+    def load(cls, store_dir: str = AGGREGATE_STORE_DIR) -> 'AggregateStore':
+        """
+        Carga el estado acumulado desde la carpeta de la store. Si no existe, retorna una store vacía.
+
+        Parámetros:
+        - store_dir: Carpeta de la store.
+
+        Retorna:
+        - AggregateStore con los conteos guardados.
+        """
+        state_path = os.path.join(store_dir, AGGREGATE_STATE_FILE)
+        if not os.path.exists(state_path):
+            return cls()
+
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        counts = {
+            key_col_name: pd.DataFrame(
+                {'total_sales': columns['total_sales'], 'fraud_sales': columns['fraud_sales']},
+                index=pd.Index(columns['keys']),
+                dtype=np.int64
+            )
+            for key_col_name, columns in state['counts'].items()
+        }
+
+        return cls(counts, state['batches'])
+
+    @classmethod
+    def from_database(
+        cls,
+        engine,
+        transactions_table: str = 'transactions',
+        users_table: str = 'users',
+        batches_table: str = METRICS_BATCHES_TABLE
+    ) -> 'AggregateStore':
+        """
+        Construye la store a partir de las transacciones ya cargadas en la base de datos, para que los conteos
+        incluyan el historial y no solo los lotes incorporados desde que existe la store.
+
+        Los lotes registrados en la tabla de lotes del dashboard (ver `refresh_dashboard_metrics`) ya están en las
+        transacciones, por lo que se marcan como incorporados y no se vuelven a contar.
+
+        Parámetros:
+        - engine: Conexión al motor de la base de datos.
+        - transactions_table: Tabla de transacciones.
+        - users_table: Tabla de usuarios (aporta la ciudad, el estado y la profesión).
+        - batches_table: Tabla con los lotes ya cargados.
+
+        Retorna:
+        - AggregateStore con los conteos de la base de datos, o vacía si aún no hay transacciones.
+        """
+        with engine.connect() as connection:
+            if not inspect(connection).has_table(transactions_table):
+                return cls()
+
+            # Transacciones sin duplicados y con la ciudad, el estado y la profesión de cada usuario
+            source = f"""
+            (SELECT DISTINCT ON (trans_num) * FROM {transactions_table} ORDER BY trans_num) t
+            LEFT JOIN (SELECT DISTINCT ON (cc_num) cc_num, city, state, job FROM {users_table} ORDER BY cc_num) u USING (cc_num)
+            """
+            key_expressions = {'merchant': 't.merchant', 'city': 'u.city', 'state': 'u.state', 'job': 'u.job'}
+
+            counts = {}
+            for key_col_name, key_expression in key_expressions.items():
+                counts[key_col_name] = pd.read_sql(text(f"""
+                SELECT {key_expression} AS key, COUNT(*) AS total_sales, SUM(t.is_fraud) AS fraud_sales
+                FROM {source}
+                WHERE {key_expression} IS NOT NULL
+                GROUP BY 1
+                """), connection, index_col='key').rename_axis(None).astype(np.int64)
+
+            batches = []
+            if inspect(connection).has_table(batches_table):
+                batches = connection.execute(text(f"SELECT batch_id FROM {batches_table} ORDER BY loaded_at")).scalars().all()
+
+        return cls(counts, batches)
+
+    @property
+    def total_transactions(self) -> int:
+        """
+        Número total de transacciones incorporadas.
+        """
+        return int(self.counts['state']['total_sales'].sum())
+
+    def fold(self, data: pd.DataFrame, batch_id: str = None, target_col_name: str = 'is_fraud') -> bool:
+        """
+        Incorpora un lote de transacciones etiquetadas a los conteos acumulados.
+
+        Parámetros:
+        - data: DataFrame con las columnas 'merchant', 'city', 'state', 'job' y la columna objetivo.
+        - batch_id: Identificador del lote (por ejemplo, la clave del dataset). Si ya se incorporó, se ignora.
+        - target_col_name: Nombre de la columna con la etiqueta real de fraude.
+
+        Retorna:
+        - True si el lote se incorporó, False si ya estaba incorporado.
+        """
+        if batch_id is not None and batch_id in self.batches:
+            return False
+
+        is_fraud = data[target_col_name].to_numpy(dtype=np.int64)
+        for key_col_name, counts in self.counts.items():
+            batch = _batch_counts(data[key_col_name], is_fraud)
+            self.counts[key_col_name] = counts.add(batch, fill_value=0).astype(np.int64)
+
+        if batch_id is not None:
+            self.batches.append(batch_id)
+
+        return True
+
+    def fraud_table(self, key_col_name: str) -> pd.DataFrame:
+        """
+        Calcula la tabla de porcentaje y ranking de fraude de una dimensión a partir de los conteos.
+
+        Parámetros:
+        - key_col_name: Columna clave ('merchant', 'city' o 'state').
+
+        Retorna:
+        - DataFrame con la clave, el porcentaje y el ranking, ordenado por la clave.
+        """
+        _, pct_col_name, rank_col_name = FRAUD_DIMENSIONS[key_col_name]
+        counts = self.counts[key_col_name].sort_index()
+
+        fraud_pct = counts['fraud_sales'] / counts['total_sales'] * 100
+
+        return pd.DataFrame({
+            key_col_name: counts.index,
+            pct_col_name: fraud_pct.to_numpy(),
+            rank_col_name: fraud_pct.rank(ascending=False).to_numpy(),
+        })
+
+    def frequency_table(self, key_col_name: str = 'job') -> pd.DataFrame:
+        """
+        Calcula la proporción de transacciones de cada valor de una dimensión (como `value_counts(normalize=True)`).
+
+        Parámetros:
+        - key_col_name: Columna clave.
+
+        Retorna:
+        - DataFrame con la clave y la columna 'proportion', de mayor a menor proporción.
+        """
+        total_sales = self.counts[key_col_name]['total_sales'].sort_values(ascending=False, kind='stable')
+
+        return pd.DataFrame({key_col_name: total_sales.index, 'proportion': (total_sales / total_sales.sum()).to_numpy()})
+
+    def save(self, store_dir: str = AGGREGATE_STORE_DIR) -> Dict[str, str]:
+        """
+        Guarda el estado acumulado y las instantáneas de las tablas en el formato de los CSV originales. Las
+        instantáneas de la carpeta por defecto reemplazan a los CSV originales en `calc_pct_n_rank`, `job_encoder`,
+        `enrichment_columns`, `build_feature_matrix` y `TransactionScorer` (ver `reference_table_path`).
+
+        Parámetros:
+        - store_dir: Carpeta de la store.
+
+        Retorna:
+        - Diccionario {columna clave: ruta de la instantánea}.
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        paths = {}
+
+        for key_col_name, (file_name, _, _) in FRAUD_DIMENSIONS.items():
+            paths[key_col_name] = os.path.join(store_dir, file_name)
+            _write_csv_atomic(self.fraud_table(key_col_name), paths[key_col_name])
+
+        for key_col_name, file_name in FREQUENCY_DIMENSIONS.items():
+            paths[key_col_name] = os.path.join(store_dir, file_name)
+            _write_csv_atomic(self.frequency_table(key_col_name), paths[key_col_name], index=False)
+
+        # El estado se guarda al final: si algo falla antes, el lote se puede volver a incorporar
+        state = {
+            'batches': self.batches,
+            'counts': {
+                key_col_name: {
+                    'keys': counts.index.tolist(),
+                    'total_sales': counts['total_sales'].tolist(),
+                    'fraud_sales': counts['fraud_sales'].tolist(),
+                }
+                for key_col_name, counts in self.counts.items()
+            },
+        }
+        state_path = os.path.join(store_dir, AGGREGATE_STATE_FILE)
+        tmp_path = f"{state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+        return paths
+
+
+def update_aggregate_store(
+    data: pd.DataFrame,
+    batch_id: str = None,
+    store_dir: str = AGGREGATE_STORE_DIR,
+    engine=None
+) -> tuple:
+    """
+    Incorpora un lote etiquetado a la store en disco y guarda las nuevas instantáneas.
+
+    La primera vez (sin estado guardado) la store se construye desde la base de datos con
+    `AggregateStore.from_database`, si se pasa un engine; si el lote ya está cargado en ella, ya queda contado.
+
+    Parámetros:
+    - data: DataFrame con las transacciones etiquetadas que el lote agrega; las que ya estaban cargadas no deben
+      incluirse, porque se sumarían dos veces (ver `new_rows` en sql_utils).
+    - batch_id: Identificador del lote; los lotes ya incorporados no se vuelven a contar.
+    - store_dir: Carpeta de la store.
+    - engine: Conexión al motor de la base de datos usada para construir la store la primera vez.
+
+    Retorna:
+    - Una tupla con la store actualizada y un booleano que indica si la store cambió (lote incorporado o store construida).
+    """
+    with _store_lock:
+        bootstrap = engine is not None and not os.path.exists(os.path.join(store_dir, AGGREGATE_STATE_FILE))
+        store = AggregateStore.from_database(engine) if bootstrap else AggregateStore.load(store_dir)
+        folded = store.fold(data, batch_id) or bootstrap
+        if folded:
+            store.save(store_dir)
+
+    return store, folded
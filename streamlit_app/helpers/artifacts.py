@@ -0,0 +1,161 @@
+# Librerias estandar
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Tuple
+# Librearias de 3ros
+import joblib
+import pandas as pd
+
+if TYPE_CHECKING:
+    from catboost import CatBoost
+
+# Funciones de pérdida de CatBoost que corresponden a modelos de clasificación
+CLASSIFICATION_LOSSES = {'Logloss', 'CrossEntropy', 'MultiClass', 'MultiClassOneVsAll'}
+
+
+class ArtifactRegistry:
+    """
+    Registro de artefactos (tablas de referencia, codificadores, escaladores y modelos) compartido por todo el proceso.
+
+    Cada archivo se carga una sola vez y se reutiliza entre reruns de Streamlit y entre sesiones.
+    La clave es la ruta absoluta del archivo; si su fecha de modificación (mtime) cambia en disco,
+    el artefacto se vuelve a cargar automáticamente.
+
+    Los objetos devueltos son compartidos, por lo que no deben modificarse en el lugar.
+    """
+
+    def __init__(self):
+        self._artifacts: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        # El lock global solo protege los diccionarios; cada artefacto se carga con su propio lock, de modo que una
+        # carga lenta (un modelo o un CSV grande) no bloquea las consultas de los demás artefactos
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key: Tuple[str, str], mtime: int) -> Tuple[bool, Any]:
+        """
+        Retorna (True, artefacto) si el artefacto está en caché y no cambió en disco, o (False, None).
+        """
+        with self._lock:
+            cached = self._artifacts.get(key)
+            if cached is not None and cached[0] == mtime:
+                self.hits += 1
+                return True, cached[1]
+
+        return False, None
+
+    def get(self, path: str, loader: Callable[[str], Any], variant: str = None) -> Any:
+        """
+        Retorna el artefacto de la ruta indicada, cargándolo con `loader` solo si no está en caché o si cambió en disco.
+
+        Si varios hilos piden a la vez el mismo artefacto, solo uno lo carga y los demás esperan su resultado;
+        los demás artefactos se siguen sirviendo mientras tanto.
+
+        Parámetros:
+        - path: Ruta al archivo del artefacto.
+        - loader: Función que recibe la ruta y retorna el objeto cargado.
+        - variant: Identificador opcional para guardar varias representaciones del mismo archivo. Por defecto se usa el nombre del loader.
+
+        Retorna:
+        - El objeto cargado.
+        """
+        abs_path = os.path.abspath(path)
+        key = (abs_path, variant or getattr(loader, '__qualname__', repr(loader)))
+        mtime = os.stat(abs_path).st_mtime_ns
+
+        found, artifact = self._cached(key, mtime)
+        if found:
+            return artifact
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Otro hilo pudo cargarlo mientras se esperaba el lock
+            found, artifact = self._cached(key, mtime)
+            if found:
+                return artifact
+
+            # No está en caché o el archivo cambió: cargarlo de nuevo, sin bloquear el registro
+            artifact = loader(abs_path)
+            with self._lock:
+                self.misses += 1
+                self._artifacts[key] = (mtime, artifact)
+
+            return artifact
+
+    def clear(self) -> None:
+        """
+        Elimina todos los artefactos cargados y reinicia los contadores.
+        """
+        with self._lock:
+            self._artifacts.clear()
+            self._load_locks.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Retorna los contadores de aciertos y fallos de la caché y el número de artefactos cargados.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'artifacts': len(self._artifacts)}
+
+
+# Registro único para todo el proceso
+registry = ArtifactRegistry()
+
+
+def _read_catboost_model(path: str) -> 'CatBoost':
+    # catboost se importa al cargar el primer modelo: su importación tarda más que la carga del .cbm
+    from catboost import CatBoost, CatBoostClassifier, CatBoostRegressor
+
+    # El .cbm se lee una sola vez; la clase se elige después con la función de pérdida guardada en el modelo
+    # (p. ej. 'Logloss' o 'RMSE'). Las subclases no añaden estado propio, solo cambian predict/predict_proba
+    model = CatBoost()
+    model.load_model(path)
+    loss_function = str(model.get_all_params().get('loss_function', '')).split(':')[0]
+    if loss_function in CLASSIFICATION_LOSSES:
+        model.__class__ = CatBoostClassifier
+    elif loss_function:
+        model.__class__ = CatBoostRegressor
+
+    return model
+
+def load_catboost_model(path: str) -> 'CatBoost':
+    """
+    Carga (una vez por proceso) un modelo CatBoost guardado en formato .cbm.
+
+    Parámetros:
+    - path: Ruta al archivo del modelo.
+
+    Retorna:
+    - El modelo cargado: CatBoostClassifier si su función de pérdida es de clasificación, CatBoostRegressor si es
+      de regresión, o CatBoost si el modelo no la guarda.
+    """
+    return registry.get(path, _read_catboost_model)
+
+def load_csv(path: str) -> pd.DataFrame:
+    """
+    Carga (una vez por proceso) una tabla de referencia en formato CSV.
+
+    Parámetros:
+    - path: Ruta al archivo CSV.
+
+    Retorna:
+    - DataFrame compartido con el contenido del archivo. No debe modificarse en el lugar.
+    """
+    return registry.get(path, pd.read_csv)
+
+def load_joblib(path: str) -> Any:
+    """
+    Carga (una vez por proceso) un objeto serializado con joblib, como el escalador o el codificador One Hot.
+
+    Parámetros:
+    - path: Ruta al archivo .pkl.
+
+    Retorna:
+    - El objeto deserializado.
+    """
+    return registry.get(path, joblib.load)
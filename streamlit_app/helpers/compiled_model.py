@@ -0,0 +1,336 @@
+# Librerias estandar
+import hashlib
+import json
+import os
+import tempfile
+# Librearias de 3ros
+import numpy as np
+# Librerias locales
+from helpers.artifacts import load_catboost_model, registry
+
+# Subcarpeta, junto a los .cbm, donde se guardan los modelos exportados (una carpeta por modelo)
+COMPILED_MODELS_SUBDIR = 'compiled'
+# Versión del formato de exportación; si cambia, las exportaciones anteriores se ignoran
+COMPILED_FORMAT_VERSION = 1
+# A partir de este número de filas se predice con CatBoost (C++ multihilo), si el .cbm original está disponible
+NATIVE_BATCH_ROWS = 10_000
+# Arreglos guardados como archivos .npy junto al model.json
+_ARRAY_NAMES = ['borders', 'border_offsets', 'split_features', 'split_bins', 'leaf_values']
+
+
+class CompiledCatBoostModel:
+    """
+    Evaluador NumPy de un modelo CatBoost de árboles simétricos (oblivious trees) exportado con
+    `export_compiled_model`.
+
+    Los arreglos se abren con memory-map, por lo que cargar el modelo no lee los árboles completos ni importa
+    catboost. Cada característica se cuantiza con los mismos bordes float32 que usa CatBoost, y el índice de la
+    hoja de cada árbol se arma con un bit por nivel; las predicciones coinciden con las de CatBoost.
+
+    Expone `predict` y `predict_proba` con la misma firma que CatBoostClassifier, para usarse en su lugar.
+    """
+
+    def __init__(self, meta: dict, arrays: dict, native_model_path: str = None):
+        self.meta = meta
+        self.feature_names_ = meta['feature_names']
+        self.tree_count_ = meta['tree_count']
+        self.class_names = meta['class_names']
+        self.scale = meta['scale']
+        self.bias = meta['bias']
+        self.borders = arrays['borders']
+        self.border_offsets = arrays['border_offsets']
+        self.split_features = arrays['split_features']
+        self.split_bins = arrays['split_bins']
+        self.leaf_values = arrays['leaf_values']
+        # Bin de los valores NaN por característica: 0 (menor que todos los bordes) o el último (mayor que todos)
+        self.nan_bins = np.where(meta['nan_as_max'], np.diff(self.border_offsets), 0).astype(self.split_bins.dtype)
+        self.native_model_path = native_model_path
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.class_names is not None
+
+    def _quantize(self, X: np.ndarray) -> np.ndarray:
+        """
+        Convierte cada valor en el número de bordes de su característica que son menores que él.
+        """
+        bins = np.empty(X.shape, dtype=self.split_bins.dtype)
+        for j in range(X.shape[1]):
+            feature_borders = self.borders[self.border_offsets[j]:self.border_offsets[j + 1]]
+            bins[:, j] = np.searchsorted(feature_borders, X[:, j], side='left')
+            bins[np.isnan(X[:, j]), j] = self.nan_bins[j]
+
+        return bins
+
+    def predict_raw(self, X, thread_count: int = None) -> np.ndarray:
+        """
+        Retorna la suma escalada de las hojas de todos los árboles (RawFormulaVal en CatBoost).
+
+        Parámetros:
+        - X: Matriz de características (filas, len(feature_names_)).
+        - thread_count: Hilos para CatBoost cuando el lote es grande. El evaluador NumPy usa un solo hilo.
+
+        Retorna:
+        - Arreglo float64 con el valor crudo de cada fila.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names_):
+            raise ValueError(f"Se esperaban {len(self.feature_names_)} características por fila.")
+
+        # Lotes grandes: CatBoost en C++ es más rápido que NumPy si el modelo original está disponible
+        if len(X) >= NATIVE_BATCH_ROWS and self.native_model_path and os.path.exists(self.native_model_path):
+            model = load_catboost_model(self.native_model_path)
+            return model.predict(X, prediction_type='RawFormulaVal', thread_count=thread_count or -1)
+
+        bins = self._quantize(X)
+        n_trees, depth = self.split_features.shape
+        leaf_offsets = np.arange(n_trees, dtype=np.intp) * self.leaf_values.shape[1]
+        flat_leaf_values = self.leaf_values.reshape(-1)
+        raw = np.empty(len(X))
+
+        # Procesar por bloques para acotar la memoria de los índices (filas x árboles)
+        chunk_rows = max(1, (1 << 22) // n_trees)
+        for start in range(0, len(X), chunk_rows):
+            chunk = bins[start:start + chunk_rows]
+            leaf_index = np.zeros((len(chunk), n_trees), dtype=np.intp)
+            goes_right = np.empty((len(chunk), n_trees), dtype=np.bool_)
+            # Un bit por nivel: 1 si el valor supera el borde del split de ese nivel
+            for level in range(depth):
+                np.greater(chunk[:, self.split_features[:, level]], self.split_bins[:, level], out=goes_right)
+                leaf_index |= goes_right.astype(np.intp) << level
+            raw[start:start + chunk_rows] = flat_leaf_values[leaf_index + leaf_offsets].sum(axis=1)
+
+        return self.scale * raw + self.bias
+
+    def predict_proba(self, X, thread_count: int = None) -> np.ndarray:
+        """
+        Retorna las probabilidades de cada clase, como CatBoostClassifier.predict_proba.
+
+        Parámetros:
+        - X: Matriz de características.
+        - thread_count: Hilos para CatBoost cuando el lote es grande.
+
+        Retorna:
+        - Arreglo de forma (filas, 2) con las probabilidades de la clase 0 y de la clase 1.
+        """
+        if not self.is_classifier:
+            raise ValueError("predict_proba solo está disponible para modelos de clasificación.")
+        probability = 1 / (1 + np.exp(-self.predict_raw(X, thread_count)))
+
+        return np.column_stack([1 - probability, probability])
+
+    def predict(self, X, thread_count: int = None) -> np.ndarray:
+        """
+        Retorna la clase predicha (clasificación) o el valor predicho (regresión), como CatBoost.predict.
+
+        Parámetros:
+        - X: Matriz de características.
+        - thread_count: Hilos para CatBoost cuando el lote es grande.
+
+        Retorna:
+        - Arreglo con una predicción por fila.
+        """
+        raw = self.predict_raw(X, thread_count)
+        if self.is_classifier:
+            return np.asarray(self.class_names)[(raw > 0).astype(np.intp)]
+
+        return raw
+
+
+def compiled_model_dir(model_path: str, compiled_dir: str = None) -> str:
+    """
+    Retorna la carpeta de exportación de un modelo: `compiled_dir/<nombre del .cbm>`, por defecto dentro de la
+    subcarpeta 'compiled' de la carpeta del modelo.
+    """
+    compiled_dir = compiled_dir or os.path.join(os.path.dirname(model_path), COMPILED_MODELS_SUBDIR)
+
+    return os.path.join(compiled_dir, os.path.splitext(os.path.basename(model_path))[0])
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+def _flatten_model(model_json: dict) -> tuple:
+    """
+    Convierte el JSON de un modelo CatBoost en los metadatos y los arreglos planos del evaluador.
+    """
+    if 'oblivious_trees' not in model_json:
+        raise ValueError("Solo se pueden exportar modelos de árboles simétricos (grow_policy='SymmetricTree').")
+    features_info = model_json['features_info']
+    if features_info.get('categorical_features'):
+        raise ValueError("El evaluador exportado solo admite características numéricas.")
+
+    float_features = sorted(features_info['float_features'], key=lambda feature: feature['flat_feature_index'])
+    n_features = len(float_features)
+    trees = model_json['oblivious_trees']
+    depth = max(len(tree['splits']) for tree in trees)
+    if any(len(tree['leaf_values']) != 2 ** len(tree['splits']) for tree in trees):
+        raise ValueError("El evaluador exportado solo admite modelos con una dimensión de salida.")
+
+    # Bordes de todas las características concatenados, con la posición donde empieza cada una
+    feature_borders = [np.asarray(feature.get('borders') or [], dtype=np.float32) for feature in float_features]
+    border_offsets = np.concatenate([[0], np.cumsum([len(borders) for borders in feature_borders])]).astype(np.int64)
+    if any(np.any(np.diff(borders) <= 0) for borders in feature_borders):
+        raise ValueError("Los bordes de cada característica deben estar ordenados de forma creciente.")
+    bins_dtype = np.uint8 if max(len(borders) for borders in feature_borders) < np.iinfo(np.uint8).max else np.uint16
+
+    # Cada split se guarda como (característica, índice del borde); los árboles más cortos se rellenan con un
+    # split que nunca se cumple (el bin máximo del tipo), y sus hojas sobrantes quedan en 0
+    split_features = np.zeros((len(trees), depth), dtype=np.int32)
+    split_bins = np.full((len(trees), depth), np.iinfo(bins_dtype).max, dtype=bins_dtype)
+    leaf_values = np.zeros((len(trees), 2 ** depth), dtype=np.float64)
+    for t, tree in enumerate(trees):
+        for level, split in enumerate(tree['splits']):
+            if split.get('split_type', 'FloatFeature') != 'FloatFeature':
+                raise ValueError(f"Tipo de split no soportado: {split['split_type']}.")
+            feature = split['float_feature_index']
+            split_features[t, level] = feature
+            split_bins[t, level] = np.searchsorted(feature_borders[feature], np.float32(split['border']))
+        leaf_values[t, :len(tree['leaf_values'])] = tree['leaf_values']
+
+    scale, bias = model_json.get('scale_and_bias', [1.0, [0.0]])
+    class_params = model_json['model_info'].get('class_params')
+    meta = {
+        'format_version': COMPILED_FORMAT_VERSION,
+        'feature_names': [feature.get('feature_id') or str(i) for i, feature in enumerate(float_features)],
+        'tree_count': len(trees),
+        'depth': depth,
+        'scale': float(scale),
+        'bias': float(bias[0]) if bias else 0.0,
+        'class_names': class_params['class_names'] if class_params else None,
+        # Con 'AsTrue' los NaN se tratan como mayores que todos los bordes; en otro caso, como menores
+        'nan_as_max': [feature.get('nan_value_treatment') == 'AsTrue' for feature in float_features],
+        'n_features': n_features,
+    }
+    arrays = {
+        'borders': np.concatenate(feature_borders) if feature_borders else np.empty(0, dtype=np.float32),
+        'border_offsets': border_offsets,
+        'split_features': split_features,
+        'split_bins': split_bins,
+        'leaf_values': leaf_values,
+    }
+
+    return meta, arrays
+
+def _verification_sample(meta: dict, arrays: dict, n_rows: int = 2_000, seed: int = 42) -> np.ndarray:
+    """
+    Genera filas con valores en los bordes, justo a cada lado de ellos y NaN, para comparar con CatBoost.
+    """
+    rng = np.random.default_rng(seed)
+    X = np.empty((n_rows, meta['n_features']), dtype=np.float32)
+    for j in range(meta['n_features']):
+        borders = arrays['borders'][arrays['border_offsets'][j]:arrays['border_offsets'][j + 1]]
+        # Los vecinos de ±FLT_MAX serían ±inf (nextafter desborda); esos bordes solo se prueban hacia el interior
+        finite_max = np.float32(np.finfo(np.float32).max)
+        below = np.nextafter(borders[borders > -finite_max], np.float32(-np.inf))
+        above = np.nextafter(borders[borders < finite_max], np.float32(np.inf))
+        candidates = np.concatenate([borders, below, above])
+        X[:, j] = rng.choice(candidates, n_rows) if len(candidates) else rng.normal(size=n_rows)
+    X[rng.random(X.shape) < 0.02] = np.nan
+
+    return X
+
+def export_compiled_model(model_path: str, out_dir: str = None, verify: bool = True) -> str:
+    """
+    Exporta un modelo CatBoost (.cbm) a arreglos NumPy (.npy) y un model.json con sus metadatos.
+
+    Parámetros:
+    - model_path: Ruta al modelo .cbm.
+    - out_dir: Carpeta de destino. Por defecto, `compiled_model_dir(model_path)`.
+    - verify: Si es True, compara las predicciones del modelo exportado con las de CatBoost antes de guardarlo.
+
+    Retorna:
+    - La carpeta con el modelo exportado.
+
+    Excepciones:
+    - ValueError: Si el modelo no es de árboles simétricos, tiene características categóricas o las predicciones
+      exportadas no coinciden con las de CatBoost.
+    """
+    # Librearias de 3ros (solo se necesitan al exportar)
+    from catboost import CatBoost
+
+    out_dir = out_dir or compiled_model_dir(model_path)
+    model = CatBoost()
+    model.load_model(model_path)
+
+    # El JSON de CatBoost describe los bordes, los splits y las hojas de cada árbol
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_path = os.path.join(temp_dir, 'model.json')
+        model.save_model(json_path, format='json')
+        with open(json_path, encoding='utf-8') as f:
+            meta, arrays = _flatten_model(json.load(f))
+    meta['source_sha256'] = _file_sha256(model_path)
+
+    if verify:
+        X = _verification_sample(meta, arrays)
+        expected = model.predict(X, prediction_type='RawFormulaVal', thread_count=1)
+        actual = CompiledCatBoostModel(meta, arrays).predict_raw(X)
+        max_error = float(np.max(np.abs(actual - expected)))
+        if max_error > 1e-9 * max(1.0, float(np.max(np.abs(expected)))):
+            raise ValueError(f"El modelo exportado no coincide con CatBoost (error máximo {max_error:.3e}).")
+        meta['verification_max_error'] = max_error
+
+    # Escribir los arreglos y al final el model.json, que marca la exportación como completa
+    os.makedirs(out_dir, exist_ok=True)
+    for name in _ARRAY_NAMES:
+        np.save(os.path.join(out_dir, f'{name}.npy'), np.ascontiguousarray(arrays[name]))
+    meta_path = os.path.join(out_dir, 'model.json')
+    with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+    return out_dir
+
+def _read_compiled_model(meta_path: str) -> CompiledCatBoostModel:
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != COMPILED_FORMAT_VERSION:
+        raise ValueError(f"Versión de exportación no soportada en {meta_path}.")
+
+    # Memory-map: las páginas de los árboles se leen del disco (o de la caché del sistema) al usarse
+    model_dir = os.path.dirname(meta_path)
+    arrays = {name: np.load(os.path.join(model_dir, f'{name}.npy'), mmap_mode='r') for name in _ARRAY_NAMES}
+
+    return CompiledCatBoostModel(meta, arrays)
+
+def load_compiled_model(model_dir: str) -> CompiledCatBoostModel:
+    """
+    Carga (una vez por proceso) un modelo exportado con `export_compiled_model`.
+
+    Parámetros:
+    - model_dir: Carpeta del modelo exportado.
+
+    Retorna:
+    - El modelo CompiledCatBoostModel, con sus arreglos abiertos en memory-map.
+    """
+    return registry.get(os.path.join(model_dir, 'model.json'), _read_compiled_model)
+
+def load_prediction_model(model_path: str, compiled_dir: str = None):
+    """
+    Carga el modelo para predecir: la exportación compilada si existe y corresponde al .cbm, o el .cbm con
+    CatBoost en caso contrario.
+
+    Parámetros:
+    - model_path: Ruta al modelo .cbm.
+    - compiled_dir: Carpeta de los modelos exportados. Por defecto, la subcarpeta 'compiled' junto al modelo.
+
+    Retorna:
+    - Un CompiledCatBoostModel o el modelo de CatBoost de `load_catboost_model` (CatBoostClassifier o
+      CatBoostRegressor según su función de pérdida), todos con `predict`.
+    """
+    model_dir = compiled_model_dir(model_path, compiled_dir)
+    if os.path.exists(os.path.join(model_dir, 'model.json')):
+        compiled = load_compiled_model(model_dir)
+        # Sin el .cbm (por ejemplo, si solo se desplegó la exportación) se usa la exportación directamente;
+        # con el .cbm, solo si su hash coincide con el del modelo exportado
+        if not os.path.exists(model_path):
+            return compiled
+        if registry.get(model_path, _file_sha256, variant='sha256') == compiled.meta['source_sha256']:
+            compiled.native_model_path = model_path
+            return compiled
+
+    return load_catboost_model(model_path)
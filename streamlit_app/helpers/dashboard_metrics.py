@@ -0,0 +1,336 @@
+# Librerias estandar
+import logging
+import os
+# Librearias de 3ros
+import pandas as pd
+from sqlalchemy import text
+import streamlit as st
+# Librerias locales
+from helpers.eda_aggregates import fraud_counts_per_period
+from helpers.sql_utils import get_engine, interactive_connection
+
+logger = logging.getLogger(__name__)
+
+# Tablas resumen del dashboard: conteos por clave (vendedor, ciudad, estado, usuario), por día, por hora y lotes incorporados
+METRICS_BY_KEY_TABLE = 'dashboard_metrics_by_key'
+METRICS_PER_DAY_TABLE = 'dashboard_metrics_per_day'
+METRICS_PER_HOUR_TABLE = 'dashboard_metrics_per_hour'
+METRICS_BATCHES_TABLE = 'dashboard_metrics_batches'
+
+# Dimensión de la tabla resumen -> columna de las transacciones
+METRIC_DIMENSIONS = {
+    'merchant': 'merchant',
+    'city': 'city',
+    'state': 'state',
+    'users': 'cc_num',
+}
+
+# Segundos que Home.py reutiliza las métricas antes de volver a consultarlas
+DASHBOARD_METRICS_TTL = int(os.getenv('DASHBOARD_METRICS_TTL', 300))
+
+# Métricas del dataset histórico, usadas si la base de datos no está disponible o aún no tiene datos
+STATIC_METRICS = {
+    'n_transactions': 1852394,
+    'n_frauds': 9651,
+    'n_users': 999,
+}
+
+CREATE_METRICS_TABLES_SQL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {METRICS_BY_KEY_TABLE} (
+        dimension TEXT NOT NULL,
+        key TEXT NOT NULL,
+        total_sales BIGINT NOT NULL,
+        fraud_sales BIGINT NOT NULL,
+        PRIMARY KEY (dimension, key)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {METRICS_PER_DAY_TABLE} (
+        day DATE PRIMARY KEY,
+        total_transactions BIGINT NOT NULL,
+        total_frauds BIGINT NOT NULL
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {METRICS_PER_HOUR_TABLE} (
+        hour TIMESTAMP PRIMARY KEY,
+        total_transactions BIGINT NOT NULL,
+        total_frauds BIGINT NOT NULL
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {METRICS_BATCHES_TABLE} (
+        batch_id TEXT PRIMARY KEY,
+        loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+]
+
+
+def create_metrics_tables(connection) -> None:
+    """
+    Crea las tablas resumen del dashboard si no existen.
+
+    Args:
+        connection: Conexión de SQLAlchemy abierta dentro de una transacción.
+    """
+    for statement in CREATE_METRICS_TABLES_SQL:
+        connection.execute(text(statement))
+
+def _batch_metrics(data: pd.DataFrame, datatime_col_name: str, target_col_name: str) -> tuple:
+    """
+    Agrega un lote en memoria: conteos por dimensión, por día y por hora, listos para enviarse como arreglos.
+    """
+    is_fraud = data[target_col_name].to_numpy(dtype='int64')
+
+    # Conteos por clave de cada dimensión
+    by_key = []
+    for dimension, col_name in METRIC_DIMENSIONS.items():
+        # Las columnas categóricas se agrupan por sus códigos; las claves nulas no se cuentan
+        counts = pd.DataFrame({'key': data[col_name].array, 'is_fraud': is_fraud}).groupby('key', observed=True).agg(
+            total_sales=('is_fraud', 'size'),
+            fraud_sales=('is_fraud', 'sum')
+        )
+        counts.index = counts.index.astype(str)
+        by_key.append(counts.assign(dimension=dimension))
+    by_key = pd.concat(by_key).reset_index()
+
+    # Conteos por día y por hora con códigos enteros de periodo y np.bincount (solo los periodos con transacciones)
+    per_day = fraud_counts_per_period(data, 'D', datatime_col_name, target_col_name).rename(columns={'period': 'day'})
+    per_hour = fraud_counts_per_period(data, 'h', datatime_col_name, target_col_name).rename(columns={'period': 'hour'})
+
+    return by_key, per_day, per_hour
+
+def refresh_dashboard_metrics(
+    data: pd.DataFrame,
+    engine=None,
+    batch_id: str = None,
+    datatime_col_name: str = 'trans_date_trans_time',
+    target_col_name: str = 'is_fraud'
+) -> bool:
+    """
+    Incorpora un lote de transacciones etiquetadas a las tablas resumen del dashboard.
+
+    El lote se agrega en memoria y se suma a los conteos existentes con un único INSERT ... ON CONFLICT DO UPDATE
+    por tabla, sin recorrer las transacciones ya cargadas.
+
+    Para que los conteos coincidan con `rebuild_dashboard_metrics`, que cuenta una vez cada trans_num, `data` solo
+    debe tener las transacciones que la carga agrega a la base de datos, una vez cada una (ver `new_rows` en sql_utils).
+
+    Args:
+        data (pd.DataFrame): Transacciones nuevas con 'merchant', 'city', 'state', 'cc_num', la fecha y la etiqueta de fraude.
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+        batch_id (str, optional): Identificador del lote (por ejemplo, la clave del dataset). Un lote ya incorporado se ignora.
+        datatime_col_name (str, optional): Columna con la fecha de la transacción. Default es 'trans_date_trans_time'.
+        target_col_name (str, optional): Columna con la etiqueta de fraude. Default es 'is_fraud'.
+
+    Returns:
+        bool: True si el lote se incorporó, False si ya estaba incorporado.
+    """
+    if engine is None:
+        engine = get_engine()
+
+    by_key, per_day, per_hour = _batch_metrics(data, datatime_col_name, target_col_name)
+
+    with engine.begin() as connection:
+        create_metrics_tables(connection)
+
+        # Registrar el lote; si ya existía, no se vuelve a contar
+        if batch_id is not None:
+            inserted = connection.execute(
+                text(f"INSERT INTO {METRICS_BATCHES_TABLE} (batch_id) VALUES (:batch_id) ON CONFLICT DO NOTHING RETURNING batch_id"),
+                {'batch_id': batch_id}
+            ).first()
+            if inserted is None:
+                return False
+
+        # Sumar los conteos del lote a los acumulados (los arreglos se envían en una sola sentencia)
+        connection.execute(
+            text(f"""
+            INSERT INTO {METRICS_BY_KEY_TABLE} (dimension, key, total_sales, fraud_sales)
+            SELECT * FROM unnest(CAST(:dimension AS TEXT[]), CAST(:key AS TEXT[]), CAST(:total_sales AS BIGINT[]), CAST(:fraud_sales AS BIGINT[]))
+            ON CONFLICT (dimension, key) DO UPDATE SET
+                total_sales = {METRICS_BY_KEY_TABLE}.total_sales + EXCLUDED.total_sales,
+                fraud_sales = {METRICS_BY_KEY_TABLE}.fraud_sales + EXCLUDED.fraud_sales
+            """),
+            {col_name: by_key[col_name].tolist() for col_name in ['dimension', 'key', 'total_sales', 'fraud_sales']}
+        )
+        connection.execute(
+            text(f"""
+            INSERT INTO {METRICS_PER_DAY_TABLE} (day, total_transactions, total_frauds)
+            SELECT * FROM unnest(CAST(:day AS DATE[]), CAST(:total_transactions AS BIGINT[]), CAST(:total_frauds AS BIGINT[]))
+            ON CONFLICT (day) DO UPDATE SET
+                total_transactions = {METRICS_PER_DAY_TABLE}.total_transactions + EXCLUDED.total_transactions,
+                total_frauds = {METRICS_PER_DAY_TABLE}.total_frauds + EXCLUDED.total_frauds
+            """),
+            {
+                'day': per_day['day'].dt.date.tolist(),
+                'total_transactions': per_day['total_transactions'].tolist(),
+                'total_frauds': per_day['total_frauds'].tolist(),
+            }
+        )
+        connection.execute(
+            text(f"""
+            INSERT INTO {METRICS_PER_HOUR_TABLE} (hour, total_transactions, total_frauds)
+            SELECT * FROM unnest(CAST(:hour AS TIMESTAMP[]), CAST(:total_transactions AS BIGINT[]), CAST(:total_frauds AS BIGINT[]))
+            ON CONFLICT (hour) DO UPDATE SET
+                total_transactions = {METRICS_PER_HOUR_TABLE}.total_transactions + EXCLUDED.total_transactions,
+                total_frauds = {METRICS_PER_HOUR_TABLE}.total_frauds + EXCLUDED.total_frauds
+            """),
+            {
+                'hour': per_hour['hour'].dt.to_pydatetime().tolist(),
+                'total_transactions': per_hour['total_transactions'].tolist(),
+                'total_frauds': per_hour['total_frauds'].tolist(),
+            }
+        )
+
+    return True
+
+def rebuild_dashboard_metrics(engine=None, transactions_table: str = 'transactions', users_table: str = 'users') -> None:
+    """
+    Reconstruye las tablas resumen desde cero a partir de las tablas de transacciones y usuarios ya cargadas.
+
+    Solo es necesario una vez, para una base de datos con transacciones cargadas antes de existir las tablas resumen;
+    después, cada carga las actualiza con `refresh_dashboard_metrics`.
+
+    Args:
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+        transactions_table (str, optional): Tabla de transacciones. Default es 'transactions'.
+        users_table (str, optional): Tabla de usuarios (aporta la ciudad y el estado). Default es 'users'.
+    """
+    if engine is None:
+        engine = get_engine()
+
+    # Transacciones sin duplicados y con la ciudad y el estado de cada usuario
+    source = f"""
+    (SELECT DISTINCT ON (trans_num) * FROM {transactions_table} ORDER BY trans_num) t
+    LEFT JOIN (SELECT DISTINCT ON (cc_num) cc_num, city, state FROM {users_table} ORDER BY cc_num) u USING (cc_num)
+    """
+    key_expressions = {'merchant': 't.merchant', 'city': 'u.city', 'state': 'u.state', 'users': 't.cc_num::TEXT'}
+
+    with engine.begin() as connection:
+        create_metrics_tables(connection)
+        connection.execute(text(f"TRUNCATE {METRICS_BY_KEY_TABLE}, {METRICS_PER_DAY_TABLE}, {METRICS_PER_HOUR_TABLE}"))
+
+        for dimension, key_expression in key_expressions.items():
+            connection.execute(text(f"""
+            INSERT INTO {METRICS_BY_KEY_TABLE} (dimension, key, total_sales, fraud_sales)
+            SELECT :dimension, {key_expression}, COUNT(*), SUM(t.is_fraud)
+            FROM {source}
+            WHERE {key_expression} IS NOT NULL
+            GROUP BY {key_expression}
+            """), {'dimension': dimension})
+
+        connection.execute(text(f"""
+        INSERT INTO {METRICS_PER_DAY_TABLE} (day, total_transactions, total_frauds)
+        SELECT t.trans_date_trans_time::DATE, COUNT(*), SUM(t.is_fraud)
+        FROM {source}
+        GROUP BY 1
+        """))
+
+        connection.execute(text(f"""
+        INSERT INTO {METRICS_PER_HOUR_TABLE} (hour, total_transactions, total_frauds)
+        SELECT date_trunc('hour', t.trans_date_trans_time::TIMESTAMP), COUNT(*), SUM(t.is_fraud)
+        FROM {source}
+        GROUP BY 1
+        """))
+
+def query_dashboard_metrics(engine=None) -> dict:
+    """
+    Consulta las métricas del dashboard desde las tablas resumen (unas pocas miles de filas como máximo).
+
+    Args:
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+
+    Returns:
+        dict: 'n_transactions', 'n_frauds', 'n_users', los top 5 ('top_5_fraud_merch', 'top_5_fraud_city',
+        'top_5_fraud_state', con las mismas columnas que los CSV de `data/`), 'frauds_per_day' y 'frauds_per_hour'.
+    """
+    if engine is None:
+        engine = get_engine()
+
+    top_5_columns = {
+        'top_5_fraud_merch': ('merchant', 'merchant', 'fraud_merch_pct'),
+        'top_5_fraud_city': ('city', 'city', 'fraud_city_pct'),
+        'top_5_fraud_state': ('state', 'state', 'fraud_state_pct'),
+    }
+
+    with interactive_connection(engine) as connection:
+        n_transactions, n_frauds = connection.execute(text(
+            f"SELECT COALESCE(SUM(total_transactions), 0), COALESCE(SUM(total_frauds), 0) FROM {METRICS_PER_DAY_TABLE}"
+        )).one()
+        n_users = connection.execute(text(
+            f"SELECT COUNT(*) FROM {METRICS_BY_KEY_TABLE} WHERE dimension = 'users'"
+        )).scalar_one()
+
+        metrics = {'n_transactions': int(n_transactions), 'n_frauds': int(n_frauds), 'n_users': int(n_users)}
+
+        for name, (dimension, key_col_name, pct_col_name) in top_5_columns.items():
+            metrics[name] = pd.read_sql(text(f"""
+            SELECT key AS {key_col_name}, fraud_sales * 100.0 / total_sales AS {pct_col_name}, fraud_sales
+            FROM {METRICS_BY_KEY_TABLE}
+            WHERE dimension = :dimension
+            ORDER BY {pct_col_name} DESC, fraud_sales DESC, key
+            LIMIT 5
+            """), connection, params={'dimension': dimension})
+
+        metrics['frauds_per_day'] = pd.read_sql(text(f"""
+        SELECT day AS trans_date_trans_time, total_frauds AS total_transacciones
+        FROM {METRICS_PER_DAY_TABLE}
+        ORDER BY day
+        """), connection, parse_dates=['trans_date_trans_time'], index_col='trans_date_trans_time')
+
+        metrics['frauds_per_hour'] = pd.read_sql(text(f"""
+        SELECT hour, total_frauds
+        FROM {METRICS_PER_HOUR_TABLE}
+        ORDER BY hour
+        """), connection, parse_dates=['hour'], index_col='hour')
+
+    return metrics
+
+def static_dashboard_metrics(data_dir: str = 'streamlit_app/data') -> dict:
+    """
+    Métricas del dataset histórico a partir de los CSV de `data/`, con la misma estructura que `query_dashboard_metrics`.
+    Los CSV no incluyen conteos por hora, por lo que 'frauds_per_hour' es None.
+
+    Args:
+        data_dir (str, optional): Carpeta con los CSV. Default es 'streamlit_app/data'.
+
+    Returns:
+        dict: Métricas del dashboard.
+    """
+    metrics = dict(STATIC_METRICS)
+    for name in ['top_5_fraud_merch', 'top_5_fraud_city', 'top_5_fraud_state']:
+        metrics[name] = pd.read_csv(os.path.join(data_dir, f'{name}.csv'))
+    metrics['frauds_per_day'] = pd.read_csv(
+        os.path.join(data_dir, 'global_frauds_per_day.csv'),
+        parse_dates=['trans_date_trans_time'],
+        index_col='trans_date_trans_time'
+    )
+    metrics['frauds_per_hour'] = None
+
+    return metrics
+
+@st.cache_data(ttl=DASHBOARD_METRICS_TTL, show_spinner=False)
+def load_dashboard_metrics() -> dict:
+    """
+    Retorna las métricas del dashboard, reutilizadas durante `DASHBOARD_METRICS_TTL` segundos por todas las sesiones.
+
+    Se consultan las tablas resumen de la base de datos; si no está configurada, no responde o aún no tiene
+    transacciones, se usan las métricas estáticas del dataset histórico.
+
+    Returns:
+        dict: Métricas del dashboard, con la clave 'source' igual a 'db' o 'static' y, si es 'static', la clave
+        'static_reason' con el motivo (para mostrarlo en el dashboard).
+    """
+    try:
+        metrics = query_dashboard_metrics()
+        if metrics['n_transactions'] > 0:
+            return {**metrics, 'source': 'db'}
+        static_reason = "la base de datos aún no tiene transacciones cargadas"
+    except Exception as e:
+        logger.warning("No se pudieron consultar las métricas del dashboard; se usan las del dataset histórico.", exc_info=True)
+        static_reason = f"no se pudo consultar la base de datos ({type(e).__name__}: {e})"
+
+    return {**static_dashboard_metrics(), 'source': 'static', 'static_reason': static_reason}
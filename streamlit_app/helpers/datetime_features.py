@@ -0,0 +1,171 @@
+# Librerias estandar
+from datetime import date
+import threading
+from typing import Dict, Tuple
+import weakref
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.profiling import profiled
+from helpers.schema import DATE_FORMATS
+
+# Fechas ya parseadas por dataset: id(DataFrame) -> {nombre de columna: (huella de la columna, arreglo datetime64[ns])}.
+# Cada entrada se elimina automáticamente cuando el DataFrame deja de existir (weakref.finalize),
+# así el DataFrame del usuario no se modifica ni se le añaden atributos.
+# La caché supone que los valores de la columna no se editan en su lugar (ver parsed_datetime).
+_parsed: Dict[int, Dict[str, Tuple[tuple, np.ndarray]]] = {}
+_parsed_lock = threading.Lock()
+
+
+def _forget_dataset(dataset_id: int) -> None:
+    """
+    Elimina de la caché las fechas parseadas de un DataFrame que ya no existe.
+    """
+    with _parsed_lock:
+        _parsed.pop(dataset_id, None)
+
+def _column_fingerprint(column: pd.Series) -> tuple:
+    """
+    Identifica una columna sin recorrerla: dirección del arreglo subyacente, longitud y primer y último valor. Si la
+    columna se reemplaza (df[col] = ...) o se reordena, la huella cambia y se vuelve a parsear; una edición en su
+    lugar de una fila intermedia (df.loc[i, col] = ...) no la cambia. Un hash del contenido sí lo detectaría, pero
+    recorrer una columna de texto cuesta más que volver a parsearla con formato fijo.
+    """
+    values = column.to_numpy(copy=False)
+    if len(values) == 0:
+        return (0, 0, None, None)
+
+    return (values.__array_interface__['data'][0], len(values), str(values[0]), str(values[-1]))
+
+def parsed_datetime(data: pd.DataFrame, col_name: str, date_format: str = None) -> np.ndarray:
+    """
+    Retorna una columna de fechas como arreglo datetime64[ns], parseándola una sola vez por dataset.
+
+    Si la columna ya es de tipo datetime (por ejemplo, leída con `read_transactions`) no se parsea. Si es texto,
+    se parsea con el formato fijo de `DATE_FORMATS` (sin inferirlo) y el resultado se guarda en caché mientras el
+    DataFrame exista. La entrada solo se reutiliza si la columna conserva el mismo arreglo subyacente, la misma
+    longitud y los mismos valores en los extremos (ver `_column_fingerprint`).
+
+    La caché solo es válida para DataFrames cuyas fechas no se editan en su lugar después de usarlas, como los CSV
+    leídos sin esquema que la aplicación solo lee (los datasets de `load_dataset` ya tienen fechas datetime y no
+    pasan por la caché). Para cambiar fechas de un DataFrame ya usado, se debe asignar la columna completa
+    (df[col] = ...) o usar una copia; editar filas sueltas devolvería las fechas anteriores.
+
+    Parámetros:
+    - data: DataFrame con la columna de fechas.
+    - col_name: Nombre de la columna de fechas.
+    - date_format: Formato de la fecha. Si es None, se usa el de `DATE_FORMATS`.
+
+    Retorna:
+    - Arreglo datetime64[ns] con una posición por fila (NaT para fechas inválidas).
+    """
+    column = data[col_name]
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.to_numpy(dtype='datetime64[ns]')
+
+    dataset_id = id(data)
+    fingerprint = _column_fingerprint(column)
+    with _parsed_lock:
+        cached = _parsed.get(dataset_id, {}).get(col_name)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    # Parsear con formato fijo; los valores inválidos quedan como NaT
+    values = pd.to_datetime(column, format=date_format or DATE_FORMATS.get(col_name), errors='coerce')
+    values = values.to_numpy(dtype='datetime64[ns]')
+
+    with _parsed_lock:
+        if dataset_id not in _parsed:
+            _parsed[dataset_id] = {}
+            weakref.finalize(data, _forget_dataset, dataset_id)
+        _parsed[dataset_id][col_name] = (fingerprint, values)
+
+    return values
+
+def datetime_parts(data: pd.DataFrame, datatime_col_name: str = 'trans_date_trans_time') -> Dict[str, np.ndarray]:
+    """
+    Calcula el día, mes, año, hora y día de la semana de una columna de fechas con aritmética de datetime64,
+    sin crear objetos de fecha ni accesores `.dt`.
+
+    Parámetros:
+    - data: DataFrame con la columna de fechas.
+    - datatime_col_name: Nombre de la columna de fechas.
+
+    Retorna:
+    - Diccionario con los arreglos 'day', 'month', 'hour', 'weekday' (int8) y 'year' (int16).
+
+    Excepciones:
+    - ValueError: Si la columna contiene fechas inválidas.
+    """
+    timestamps = parsed_datetime(data, datatime_col_name)
+    if np.isnat(timestamps).any():
+        raise ValueError(f"La columna '{datatime_col_name}' contiene fechas inválidas.")
+
+    # Truncar a día y a mes; la conversión de unidades de datetime64 redondea hacia abajo
+    days = timestamps.astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    days_since_epoch = days.view(np.int64)
+    months_since_epoch = months.view(np.int64)
+
+    return {
+        'day': ((days - months.astype('datetime64[D]')).view(np.int64) + 1).astype(np.int8),
+        'month': (months_since_epoch % 12 + 1).astype(np.int8),
+        'year': (months_since_epoch // 12 + 1970).astype(np.int16),
+        'hour': ((timestamps - days).view(np.int64) // 3_600_000_000_000).astype(np.int8),
+        # El 1970-01-01 fue jueves (3 con 0=lunes)
+        'weekday': ((days_since_epoch + 3) % 7).astype(np.int8),
+    }
+
+def age_in_years(data: pd.DataFrame, dob_col_name: str = 'dob', reference_date: date = None) -> np.ndarray:
+    """
+    Calcula la edad en años completos (días / 365.25, truncado) a partir de una columna de fechas de nacimiento.
+
+    Parámetros:
+    - data: DataFrame con la columna de fechas de nacimiento.
+    - dob_col_name: Nombre de la columna de fechas de nacimiento.
+    - reference_date: Fecha respecto a la que se calcula la edad. Si es None, se usa la fecha actual.
+
+    Retorna:
+    - Arreglo int16 con la edad de cada fila.
+
+    Excepciones:
+    - ValueError: Si la columna contiene fechas inválidas.
+    """
+    dob = parsed_datetime(data, dob_col_name)
+    if np.isnat(dob).any():
+        raise ValueError(f"La columna '{dob_col_name}' contiene fechas inválidas.")
+
+    reference_day = np.datetime64(reference_date or date.today(), 'D')
+    days = (reference_day - dob.astype('datetime64[D]')).view(np.int64)
+
+    return (days / 365.25).astype(np.int16)
+
+@profiled()
+def datetime_feature_columns(
+    data: pd.DataFrame,
+    datatime_col_name: str = 'trans_date_trans_time',
+    dob_col_name: str = 'dob'
+) -> Dict[str, np.ndarray]:
+    """
+    Calcula las columnas de fecha/hora y edad que usa el modelo, sin modificar el DataFrame.
+
+    Parámetros:
+    - data: DataFrame con las transacciones.
+    - datatime_col_name: Nombre de la columna con la fecha de la transacción.
+    - dob_col_name: Nombre de la columna con la fecha de nacimiento.
+
+    Retorna:
+    - Diccionario {nombre de columna: arreglo} con 'trans_day', 'trans_month', 'trans_year', 'trans_hour',
+      'trans_weekday' y 'age'.
+    """
+    parts = datetime_parts(data, datatime_col_name)
+
+    return {
+        'trans_day': parts['day'],
+        'trans_month': parts['month'],
+        'trans_year': parts['year'],
+        'trans_hour': parts['hour'],
+        'trans_weekday': parts['weekday'],
+        'age': age_in_years(data, dob_col_name),
+    }
@@ -0,0 +1,268 @@
+# Librerias estandar
+from collections import OrderedDict
+import threading
+from typing import Dict
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+# Librerias locales
+from helpers.datetime_features import parsed_datetime
+from helpers.profiling import profiled
+from helpers.sql_utils import get_engine, interactive_connection
+
+# Nanosegundos de cada periodo de agregación
+PERIOD_NS = {
+    'D': 86_400 * 10 ** 9,
+    'h': 3_600 * 10 ** 9,
+}
+
+# Código de las fechas inválidas (NaT). Ningún periodo real llega a este valor, mientras que los códigos negativos
+# sí son válidos (fechas anteriores a 1970, como algunas fechas de nacimiento)
+NAT_CODE = np.iinfo(np.int64).min
+
+# Resultados de las consultas GROUP BY, por clave del dataset y estado de la tabla (los más recientes)
+_MAX_SQL_RESULTS = 8
+_sql_results = OrderedDict()
+_sql_results_lock = threading.Lock()
+
+
+def period_codes(
+    data: pd.DataFrame,
+    unit: str = 'D',
+    datatime_col_name: str = 'trans_date_trans_time',
+    rows: np.ndarray = None
+) -> np.ndarray:
+    """
+    Convierte la columna de fechas en códigos enteros de periodo: días (o horas) desde 1970-01-01.
+
+    Se calculan desde la fecha parseada y no desde 'unix_time', que en el dataset original está desplazado 7 años
+    respecto de 'trans_date_trans_time'.
+
+    Parámetros:
+    - data: DataFrame con la columna de fechas.
+    - unit: 'D' para días o 'h' para horas.
+    - datatime_col_name: Nombre de la columna de fechas.
+    - rows: Máscara booleana opcional para calcular los códigos solo de algunas filas (por ejemplo, los fraudes).
+
+    Retorna:
+    - Arreglo int64 con el código de cada fila (negativo antes de 1970); las fechas inválidas (NaT) quedan en `NAT_CODE`.
+    """
+    trans_dates = parsed_datetime(data, datatime_col_name)
+    if rows is not None:
+        trans_dates = trans_dates[rows]
+    codes = np.floor_divide(trans_dates.view('int64'), PERIOD_NS[unit])
+    codes[np.isnat(trans_dates)] = NAT_CODE
+
+    return codes
+
+def bincount_by_code(codes: np.ndarray, weights: np.ndarray = None) -> tuple:
+    """
+    Cuenta las filas de cada código entre el mínimo y el máximo con `np.bincount` y, opcionalmente, suma un peso
+    por código (por ejemplo, el indicador de fraude).
+
+    Parámetros:
+    - codes: Códigos enteros (`period_codes`); los iguales a `NAT_CODE` (fechas inválidas) no se cuentan.
+    - weights: Valores enteros a sumar por código, o None.
+
+    Retorna:
+    - Una tupla (primer código, filas por código, suma de los pesos por código o None).
+    """
+    valid = codes != NAT_CODE
+    if not valid.all():
+        codes = codes[valid]
+        weights = weights[valid] if weights is not None else None
+    if len(codes) == 0:
+        return 0, np.zeros(0, dtype=np.int64), None if weights is None else np.zeros(0, dtype=np.int64)
+
+    first = int(codes.min())
+    offsets = codes - first
+    counts = np.bincount(offsets)
+    sums = None if weights is None else np.bincount(offsets, weights=weights, minlength=len(counts)).astype(np.int64)
+
+    return first, counts, sums
+
+@profiled()
+def fraud_counts_per_period(
+    data: pd.DataFrame,
+    unit: str = 'D',
+    datatime_col_name: str = 'trans_date_trans_time',
+    fraud_col_name: str = 'is_fraud',
+    fill_gaps: bool = False
+) -> pd.DataFrame:
+    """
+    Cuenta las transacciones y los fraudes por día o por hora sin copiar ni modificar el DataFrame.
+
+    Parámetros:
+    - data: DataFrame de transacciones.
+    - unit: 'D' para días o 'h' para horas.
+    - datatime_col_name: Nombre de la columna de fechas.
+    - fraud_col_name: Nombre de la columna de fraude, 0 o 1.
+    - fill_gaps: Si es True, incluye con 0 los periodos sin transacciones entre el primero y el último.
+
+    Retorna:
+    - DataFrame con las columnas 'period', 'total_transactions' y 'total_frauds', ordenado por periodo.
+    """
+    first, totals, frauds = bincount_by_code(
+        period_codes(data, unit, datatime_col_name),
+        data[fraud_col_name].to_numpy(dtype=np.int64)
+    )
+    positions = np.arange(len(totals)) if fill_gaps else np.flatnonzero(totals)
+
+    return pd.DataFrame({
+        'period': ((first + positions) * PERIOD_NS[unit]).astype('datetime64[ns]'),
+        'total_transactions': totals[positions],
+        'total_frauds': frauds[positions],
+    })
+
+@profiled()
+def fraud_counts_by_category(
+    data: pd.DataFrame,
+    category_col_name: str = 'category',
+    fraud_col_name: str = 'is_fraud'
+) -> pd.DataFrame:
+    """
+    Cuenta las transacciones, los fraudes y el porcentaje de fraude por categoría, a partir de los códigos enteros
+    de la columna categórica.
+
+    Parámetros:
+    - data: DataFrame de transacciones.
+    - category_col_name: Nombre de la columna de categorías.
+    - fraud_col_name: Nombre de la columna de fraude, 0 o 1.
+
+    Retorna:
+    - DataFrame con 'category', 'total_transactions', 'total_frauds' y 'fraud_pct', ordenado por fraudes.
+    """
+    column = data[category_col_name]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, categories = column.cat.codes.to_numpy(), column.cat.categories
+    else:
+        codes, categories = pd.factorize(column)
+
+    # Los valores nulos tienen código -1 y no se cuentan
+    is_fraud = data[fraud_col_name].to_numpy(dtype=np.int64)
+    valid = codes >= 0
+    totals = np.bincount(codes[valid], minlength=len(categories))
+    frauds = np.bincount(codes[valid], weights=is_fraud[valid], minlength=len(categories)).astype(np.int64)
+
+    counts = pd.DataFrame({
+        'category': np.asarray(categories),
+        'total_transactions': totals,
+        'total_frauds': frauds,
+    })
+    counts = counts[counts['total_transactions'] > 0]
+    counts['fraud_pct'] = counts['total_frauds'] / counts['total_transactions'] * 100
+
+    return counts.sort_values('total_frauds', ascending=False, kind='stable').reset_index(drop=True)
+
+def fraud_aggregates(data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Calcula los agregados del análisis exploratorio en memoria: fraudes por día, por hora y por categoría.
+
+    Parámetros:
+    - data: DataFrame de transacciones.
+
+    Retorna:
+    - Diccionario con 'per_day', 'per_hour' y 'by_category'.
+    """
+    return {
+        'per_day': fraud_counts_per_period(data, 'D', fill_gaps=True),
+        'per_hour': fraud_counts_per_period(data, 'h', fill_gaps=True),
+        'by_category': fraud_counts_by_category(data),
+    }
+
+def _table_version(connection, transactions_table: str) -> tuple:
+    """
+    Estado de la tabla de transacciones que cambia con cada carga: número de filas y fecha más reciente.
+
+    Es una sola lectura de la tabla, sin agrupar ni transferir resultados, mucho más barata que las tres consultas
+    GROUP BY. El número de filas detecta también las cargas con fechas anteriores a la más reciente.
+    """
+    total_rows, last_trans_time = connection.execute(
+        text(f"SELECT COUNT(*), MAX(trans_date_trans_time) FROM {transactions_table}")
+    ).one()
+
+    return total_rows, str(last_trans_time)
+
+def _aggregate_queries(connection, transactions_table: str) -> Dict[str, pd.DataFrame]:
+    """
+    Ejecuta las consultas GROUP BY de los agregados y completa los periodos vacíos con 0.
+    """
+    # La fecha se guarda como texto o timestamp según cómo se creó la tabla; se convierte en la consulta
+    trans_time = "trans_date_trans_time::TIMESTAMP"
+    queries = {
+        'per_day': f"""
+        SELECT date_trunc('day', {trans_time}) AS period, COUNT(*) AS total_transactions, SUM(is_fraud) AS total_frauds
+        FROM {transactions_table} GROUP BY 1 ORDER BY 1
+        """,
+        'per_hour': f"""
+        SELECT date_trunc('hour', {trans_time}) AS period, COUNT(*) AS total_transactions, SUM(is_fraud) AS total_frauds
+        FROM {transactions_table} GROUP BY 1 ORDER BY 1
+        """,
+        'by_category': f"""
+        SELECT category, COUNT(*) AS total_transactions, SUM(is_fraud) AS total_frauds,
+               100.0 * SUM(is_fraud) / COUNT(*) AS fraud_pct
+        FROM {transactions_table} GROUP BY 1 ORDER BY total_frauds DESC, category
+        """,
+    }
+    results = {name: pd.read_sql(text(query), connection) for name, query in queries.items()}
+
+    # Mismos periodos que la ruta en memoria (fill_gaps=True): los días u horas sin transacciones quedan en 0
+    for name, freq in [('per_day', 'D'), ('per_hour', 'h')]:
+        counts = results[name].set_index('period')
+        if not counts.empty:
+            counts = counts.reindex(pd.date_range(counts.index.min(), counts.index.max(), freq=freq), fill_value=0)
+        results[name] = counts.rename_axis('period').reset_index().astype({'total_transactions': 'int64', 'total_frauds': 'int64'})
+
+    return results
+
+def sql_fraud_aggregates(engine=None, transactions_table: str = 'transactions') -> Dict[str, pd.DataFrame]:
+    """
+    Calcula los mismos agregados que `fraud_aggregates` con consultas GROUP BY sobre la tabla de transacciones,
+    sin caché.
+
+    Args:
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+        transactions_table (str, optional): Tabla de transacciones. Default es 'transactions'.
+
+    Returns:
+        Dict[str, pd.DataFrame]: 'per_day', 'per_hour' y 'by_category', con las mismas columnas que `fraud_aggregates`.
+    """
+    with interactive_connection(engine or get_engine()) as connection:
+        return _aggregate_queries(connection, transactions_table)
+
+def query_fraud_aggregates(
+    dataset_key: str,
+    engine=None,
+    transactions_table: str = 'transactions'
+) -> Dict[str, pd.DataFrame]:
+    """
+    Igual que `sql_fraud_aggregates`, con los resultados en caché.
+
+    La clave de la caché es la clave del dataset más el estado de la tabla (número de filas y fecha más reciente,
+    ver `_table_version`), que se consulta en cada llamada: cuando una carga agrega filas a la tabla, el estado
+    cambia y los agregados se vuelven a calcular en lugar de devolver los de antes de la carga.
+
+    Args:
+        dataset_key (str): Clave del dataset cargado en la tabla (hash SHA-256 del zip, ver `upload_cache`).
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+        transactions_table (str, optional): Tabla de transacciones. Default es 'transactions'.
+
+    Returns:
+        Dict[str, pd.DataFrame]: 'per_day', 'per_hour' y 'by_category', con las mismas columnas que `fraud_aggregates`.
+    """
+    with interactive_connection(engine or get_engine()) as connection:
+        key = (dataset_key, transactions_table, _table_version(connection, transactions_table))
+        with _sql_results_lock:
+            if key in _sql_results:
+                _sql_results.move_to_end(key)
+                return _sql_results[key]
+
+        results = _aggregate_queries(connection, transactions_table)
+
+    with _sql_results_lock:
+        _sql_results[key] = results
+        while len(_sql_results) > _MAX_SQL_RESULTS:
+            _sql_results.popitem(last=False)
+
+    return results
@@ -0,0 +1,149 @@
+# Librerias estandar
+from typing import List
+# Librearias de 3ros
+import joblib
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.artifacts import registry
+from helpers.profiling import profiled
+
+
+class CompiledOneHotEncoder:
+    """
+    One Hot Encoding precompilado a partir de un `OneHotEncoder` de scikit-learn ya entrenado.
+
+    Para cada columna de entrada se calcula una sola vez la columna de salida que corresponde a cada categoría
+    (o -1 si la categoría se descarta con `drop` o no existe). Al transformar, los códigos de cada fila se escriben
+    directamente como indicadores en una matriz reservada de antemano, sin crear DataFrames intermedios.
+    """
+
+    def __init__(
+        self,
+        feature_names_in: List[str],
+        categories: List[np.ndarray],
+        drop_idx: List[int],
+        handle_unknown: str = 'ignore'
+    ):
+        self.feature_names_in = list(feature_names_in)
+        self.categories = [pd.Index(column_categories) for column_categories in categories]
+        self.handle_unknown = handle_unknown
+
+        # Columna de salida de cada categoría; la categoría descartada queda en -1
+        self.output_columns = []
+        self.feature_names_out = []
+        for col_name, column_categories, dropped in zip(self.feature_names_in, self.categories, drop_idx):
+            output_columns = np.full(len(column_categories), -1, dtype=np.int64)
+            for i, category in enumerate(column_categories):
+                if dropped is not None and i == dropped:
+                    continue
+                output_columns[i] = len(self.feature_names_out)
+                self.feature_names_out.append(f"{col_name}_{category}")
+            self.output_columns.append(output_columns)
+
+    @classmethod
+    def from_encoder(cls, encoder) -> 'CompiledOneHotEncoder':
+        """
+        Construye el codificador precompilado y verifica que sus columnas coincidan con las del codificador original.
+
+        Parámetros:
+        - encoder: `OneHotEncoder` de scikit-learn entrenado.
+
+        Retorna:
+        - CompiledOneHotEncoder equivalente.
+
+        Excepciones:
+        - ValueError: Si el codificador usa categorías poco frecuentes o sus columnas no coinciden.
+        """
+        if getattr(encoder, '_infrequent_enabled', False):
+            raise ValueError("El codificador agrupa categorías poco frecuentes y no se puede precompilar.")
+
+        drop_idx = encoder.drop_idx_
+        if drop_idx is None:
+            drop_idx = [None] * len(encoder.categories_)
+
+        compiled = cls(encoder.feature_names_in_, encoder.categories_, list(drop_idx), encoder.handle_unknown)
+
+        # Las columnas deben coincidir exactamente con las del codificador entrenado
+        if compiled.feature_names_out != list(encoder.get_feature_names_out()):
+            raise ValueError("Las columnas del One Hot Encoding precompilado no coinciden con las del codificador.")
+
+        return compiled
+
+    def _column_positions(self, column: pd.Series, j: int) -> np.ndarray:
+        """
+        Calcula, para cada fila, la columna de salida de su categoría (-1 si no se marca ninguna).
+        """
+        # Factorizar la columna: las columnas categóricas ya traen sus códigos
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes, uniques = column.cat.codes.to_numpy(), column.cat.categories
+        else:
+            codes, uniques = pd.factorize(column)
+
+        # Resolver solo los valores únicos contra las categorías entrenadas
+        unique_categories = self.categories[j].get_indexer(uniques)
+        if self.handle_unknown == 'error' and ((unique_categories < 0).any() or (codes < 0).any()):
+            raise ValueError(f"La columna '{self.feature_names_in[j]}' contiene categorías desconocidas.")
+
+        unique_positions = np.where(unique_categories >= 0, self.output_columns[j][unique_categories], -1)
+
+        # El código -1 (valor nulo) toma el último elemento, que no marca ninguna columna
+        unique_positions = np.append(unique_positions, -1)
+
+        return unique_positions[codes]
+
+    @profiled('one_hot', rows=1)
+    def transform(self, data: pd.DataFrame, out: np.ndarray = None) -> np.ndarray:
+        """
+        Aplica el One Hot Encoding escribiendo los indicadores en una matriz.
+
+        Parámetros:
+        - data: DataFrame con las columnas de entrada del codificador.
+        - out: Matriz de salida de forma (filas, len(feature_names_out)), por ejemplo una porción de la matriz
+          de características. Si es None, se reserva una matriz uint8.
+
+        Retorna:
+        - La matriz con los indicadores (0 o 1).
+        """
+        n_rows = len(data)
+        if out is None:
+            out = np.zeros((n_rows, len(self.feature_names_out)), dtype=np.uint8)
+        else:
+            out[...] = 0
+
+        rows = np.arange(n_rows)
+        for j, col_name in enumerate(self.feature_names_in):
+            positions = self._column_positions(data[col_name], j)
+            marked = positions >= 0
+            out[rows[marked], positions[marked]] = 1
+
+        return out
+
+    def transform_frame(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aplica el One Hot Encoding y retorna las columnas uint8 con sus nombres, alineadas con el índice de `data`.
+
+        Parámetros:
+        - data: DataFrame con las columnas de entrada del codificador.
+
+        Retorna:
+        - DataFrame con una columna uint8 por categoría codificada.
+        """
+        return pd.DataFrame(self.transform(data), columns=self.feature_names_out, index=data.index)
+
+
+def load_onehot_encoder(path: str) -> CompiledOneHotEncoder:
+    """
+    Carga (una vez por proceso) un `OneHotEncoder` entrenado y construye su versión precompilada.
+
+    Parámetros:
+    - path: Ruta al archivo joblib del codificador.
+
+    Retorna:
+    - CompiledOneHotEncoder compartido por todo el proceso.
+    """
+    return registry.get(
+        path,
+        lambda abs_path: CompiledOneHotEncoder.from_encoder(joblib.load(abs_path)),
+        variant='compiled_ohe'
+    )
@@ -0,0 +1,122 @@
+# Librerias estandar
+from typing import List
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.artifacts import load_joblib
+from helpers.datetime_features import datetime_feature_columns
+from helpers.encoding import load_onehot_encoder
+from helpers.lookup import load_lookup_table, reference_table_path
+from helpers.preprocessing import COLS_TO_SCALE
+from helpers.profiling import profile_stage, profiled
+from helpers.utils import haversine_distance_array
+
+# Columnas generadas por el One Hot Encoding de 'category' y 'gender' (drop='first'), en el orden del modelo;
+# se verifican contra el codificador entrenado al construir la matriz
+OHE_COLUMNS = [
+    'category_food_dining', 'category_gas_transport', 'category_grocery_net', 'category_grocery_pos',
+    'category_health_fitness', 'category_home', 'category_kids_pets', 'category_misc_net',
+    'category_misc_pos', 'category_personal_care', 'category_shopping_net', 'category_shopping_pos',
+    'category_travel', 'gender_M'
+]
+
+# Orden de las columnas que espera el modelo: primero las columnas escaladas y luego las del One Hot Encoding
+FEATURE_COLUMNS = COLS_TO_SCALE + OHE_COLUMNS
+
+
+@profiled()
+def build_feature_matrix(
+    data: pd.DataFrame,
+    scaler=None,
+    scale: bool = True,
+    scaler_path: str = 'streamlit_app/models/scaler.pkl',
+    ohe_path: str = 'streamlit_app/models/onehotencoder.pkl',
+    group_merch_path: str = None,
+    group_city_path: str = None,
+    group_state_path: str = None,
+    job_freq_path: str = None,
+    cols_to_transform: List[str] = ['category', 'gender']
+) -> np.ndarray:
+    """
+    Construye en una sola pasada la matriz de características del modelo, sin DataFrames intermedios.
+
+    Se reserva una única matriz float32 con las columnas en el orden de `FEATURE_COLUMNS` y cada bloque de
+    características (valores numéricos, enriquecimiento, fecha/hora, edad, distancia y One Hot Encoding) se escribe
+    directamente en su columna. El escalado se aplica en el lugar sobre las columnas numéricas. El DataFrame de
+    entrada no se copia ni se modifica.
+
+    Parámetros:
+    - data: DataFrame con las transacciones.
+    - scaler: Escalador entrenado. Si es None, se carga desde `scaler_path`.
+    - scale: Si se escalan las columnas numéricas.
+    - scaler_path: Ruta al archivo del escalador entrenado.
+    - ohe_path: Ruta al archivo que contiene el codificador One Hot Encoder entrenado.
+    - group_merch_path: Ruta al archivo CSV con los datos de fraude por vendedor. Si es None, se usa `reference_table_path`.
+    - group_city_path: Ruta al archivo CSV con los datos de fraude por ciudad. Si es None, se usa `reference_table_path`.
+    - group_state_path: Ruta al archivo CSV con los datos de fraude por estado. Si es None, se usa `reference_table_path`.
+    - job_freq_path: Ruta al archivo CSV con la frecuencia de las profesiones. Si es None, se usa `reference_table_path`.
+    - cols_to_transform: Columnas a las que se aplica el One Hot Encoding.
+
+    Retorna:
+    - Matriz float32 de forma (filas, len(FEATURE_COLUMNS)), lista para CatBoost.
+    """
+    n_rows = len(data)
+    col_index = {col_name: j for j, col_name in enumerate(FEATURE_COLUMNS)}
+
+    # Matriz por columnas (order='F') para que cada bloque se escriba en memoria contigua
+    features = np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=np.float32, order='F')
+
+    # Columnas numéricas que pasan directo
+    for col_name in ['amt', 'zip', 'city_pop']:
+        features[:, col_index[col_name]] = data[col_name].to_numpy()
+
+    # Porcentaje y ranking de fraude por vendedor, ciudad y estado, y codificación de la profesión
+    group_merch_path = group_merch_path or reference_table_path('group_fraud_by_merch.csv')
+    group_city_path = group_city_path or reference_table_path('group_fraud_by_city.csv')
+    group_state_path = group_state_path or reference_table_path('group_fraud_by_state.csv')
+    job_freq_path = job_freq_path or reference_table_path('job_freq.csv')
+    lookups = [
+        (load_lookup_table(group_merch_path, 'merchant', ['fraud_merch_pct', 'fraud_merch_rank']), 'merchant', None),
+        (load_lookup_table(group_city_path, 'city', ['fraud_city_pct', 'fraud_city_rank']), 'city', None),
+        (load_lookup_table(group_state_path, 'state', ['fraud_state_pct', 'fraud_state_rank']), 'state', None),
+        (load_lookup_table(job_freq_path, 'job', ['proportion']), 'job', {'proportion': 'job_encoded'}),
+    ]
+    with profile_stage('enriquecimiento', n_rows):
+        for table, key_col_name, rename in lookups:
+            row_positions = table.positions(data[key_col_name])
+            for name, values in table.values.items():
+                features[:, col_index[(rename or {}).get(name, name)]] = values[row_positions]
+
+    # Día, mes, año, hora y día de la semana de la transacción, y edad (fechas parseadas una sola vez por dataset)
+    for col_name, values in datetime_feature_columns(data).items():
+        features[:, col_index[col_name]] = values
+
+    # Distancia entre el vendedor y el comprador, escrita directamente en su columna
+    haversine_distance_array(
+        data['lat'].to_numpy(), data['long'].to_numpy(),
+        data['merch_lat'].to_numpy(), data['merch_long'].to_numpy(),
+        out=features[:, col_index['distance_to_merch']]
+    )
+
+    # One Hot Encoding precompilado, escrito directamente en su bloque de columnas
+    encoder = load_onehot_encoder(ohe_path)
+    if list(cols_to_transform) != encoder.feature_names_in or encoder.feature_names_out != OHE_COLUMNS:
+        raise ValueError("Las columnas del codificador One Hot no coinciden con las columnas del modelo.")
+    ohe_start = col_index[OHE_COLUMNS[0]]
+    encoder.transform(data, out=features[:, ohe_start:ohe_start + len(OHE_COLUMNS)])
+
+    # Escalar en el lugar las columnas numéricas: (x - media) / desviación
+    if scale:
+        if scaler is None:
+            scaler = load_joblib(scaler_path)
+        if list(getattr(scaler, 'feature_names_in_', COLS_TO_SCALE)) != COLS_TO_SCALE:
+            raise ValueError("Las columnas del escalador no coinciden con las columnas numéricas del modelo.")
+        with profile_stage('escalado', n_rows):
+            scaled = features[:, :len(COLS_TO_SCALE)]
+            if scaler.with_mean:
+                scaled -= scaler.mean_.astype(np.float32)
+            if scaler.with_std:
+                scaled /= scaler.scale_.astype(np.float32)
+
+    return features
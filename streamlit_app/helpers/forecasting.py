@@ -0,0 +1,221 @@
+# Librerias estandar
+import os
+import threading
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.artifacts import registry
+from helpers.compiled_model import load_prediction_model
+
+# Modelo de la serie temporal (notebooks/Analisis_serie_tmp.ipynb): entrenado con los fraudes por hora
+FORECAST_MODEL_PATH = 'streamlit_app/models/catboost_model_tmp_series.cbm'
+# Desfases y periodo estacional (24 horas) con los que se entrenó el modelo
+MAX_LAG = 70
+SEASONAL_PERIOD = 24
+# Días que Home.py predice a partir de la última hora con datos
+FORECAST_HORIZON_DAYS = int(os.getenv('FRAUD_FORECAST_HORIZON_DAYS', 14))
+
+CALENDAR_FEATURES = ['year', 'month', 'day', 'day_of_week']
+FORECAST_FEATURES = CALENDAR_FEATURES + [f'lag_{lag}' for lag in range(1, MAX_LAG + 1)] + ['trending', 'seasonal']
+
+_ONE_HOUR = pd.Timedelta(hours=1)
+
+
+def _trend_weights(period: int) -> np.ndarray:
+    """
+    Pesos de la media móvil centrada de `seasonal_decompose`: 2 x `period` si el periodo es par.
+    """
+    if period % 2 == 0:
+        return np.concatenate([[0.5], np.ones(period - 1), [0.5]]) / period
+
+    return np.ones(period) / period
+
+def trend_component(values: np.ndarray, period: int = SEASONAL_PERIOD) -> np.ndarray:
+    """
+    Calcula la tendencia de una serie con una media móvil centrada (como `seasonal_decompose`).
+
+    Parámetros:
+    - values: Valores de la serie.
+    - period: Periodo estacional.
+
+    Retorna:
+    - Arreglo con la tendencia; los extremos sin ventana completa quedan en NaN.
+    """
+    weights = _trend_weights(period)
+    half = len(weights) // 2
+    trend = np.full(len(values), np.nan)
+    if len(values) >= len(weights):
+        trend[half:len(values) - half] = np.convolve(values, weights, mode='valid')
+
+    return trend
+
+def seasonal_component(values: np.ndarray, trend: np.ndarray, period: int = SEASONAL_PERIOD) -> np.ndarray:
+    """
+    Calcula el patrón estacional: la media de la serie sin tendencia en cada posición del periodo, centrada en 0.
+
+    Parámetros:
+    - values: Valores de la serie.
+    - trend: Tendencia de la serie (`trend_component`).
+    - period: Periodo estacional.
+
+    Retorna:
+    - Arreglo de longitud `period`; la posición i corresponde a los índices i, i + period, i + 2 * period, ...
+    """
+    detrended = values - trend
+    n_periods = -(-len(values) // period)
+    padded = np.full(n_periods * period, np.nan)
+    padded[:len(values)] = detrended
+    with np.errstate(invalid='ignore'):
+        phases = np.nanmean(padded.reshape(n_periods, period), axis=0)
+
+    return phases - np.nanmean(phases)
+
+
+class FraudForecaster:
+    """
+    Pronóstico recursivo de los fraudes por hora con el modelo CatBoost de la serie temporal.
+
+    La serie se actualiza de forma incremental con `update` (solo se escriben las horas nuevas o modificadas) y el
+    pronóstico de cada horizonte se guarda en caché hasta que llegan datos nuevos.
+
+    Las características son las del notebook de la serie temporal: año, mes, día y día de la semana, `MAX_LAG`
+    desfases, tendencia y componente estacional de la hora anterior. Como la tendencia centrada necesita valores
+    futuros, se usa la última tendencia con la ventana completa.
+    """
+
+    def __init__(self, model_path: str = FORECAST_MODEL_PATH, period: int = SEASONAL_PERIOD, max_lag: int = MAX_LAG):
+        self.model = load_prediction_model(model_path)
+        if list(self.model.feature_names_) != FORECAST_FEATURES:
+            raise ValueError("Las características del modelo no coinciden con las de la serie temporal.")
+
+        self.period = period
+        self.max_lag = max_lag
+        self.start = None
+        self.values = np.empty(0)
+        self._forecasts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def end(self) -> pd.Timestamp:
+        """
+        Última hora de la serie.
+        """
+        return self.start + (len(self.values) - 1) * _ONE_HOUR
+
+    def update(self, frauds_per_hour: pd.Series) -> int:
+        """
+        Incorpora conteos de fraudes por hora a la serie. Las horas sin registro dentro del rango quedan en 0.
+
+        Parámetros:
+        - frauds_per_hour: Serie indexada por hora (la serie completa o solo las horas nuevas).
+
+        Retorna:
+        - Número de horas añadidas o modificadas. Si es 0, el pronóstico en caché sigue siendo válido.
+        """
+        if len(frauds_per_hour) == 0:
+            return 0
+
+        hours = pd.DatetimeIndex(frauds_per_hour.index).floor(_ONE_HOUR)
+        counts = frauds_per_hour.to_numpy(dtype=np.float64)
+
+        with self._lock:
+            first, last = hours.min(), hours.max()
+            if self.start is None:
+                self.start, self.values = first, np.empty(0)
+
+            # Ampliar la serie con ceros hacia atrás o hacia adelante si llegan horas fuera del rango actual
+            n_before = max(0, (self.start - first) // _ONE_HOUR)
+            n_after = max(0, (last - self.start) // _ONE_HOUR + 1 - n_before - len(self.values))
+            values = np.concatenate([np.zeros(n_before), self.values, np.zeros(n_after)])
+            self.start -= n_before * _ONE_HOUR
+
+            positions = ((hours - self.start) // _ONE_HOUR).to_numpy()
+            changed = int(np.count_nonzero(values[positions] != counts)) + n_before + n_after
+            values[positions] = counts
+
+            if changed:
+                self.values = values
+                self._forecasts.clear()
+
+            return changed
+
+    def forecast(self, horizon: int) -> pd.Series:
+        """
+        Pronostica los fraudes de las próximas `horizon` horas, usando cada predicción como desfase de las siguientes.
+
+        Parámetros:
+        - horizon: Número de horas a pronosticar.
+
+        Retorna:
+        - Serie indexada por hora con los fraudes pronosticados (no negativos).
+        """
+        with self._lock:
+            if horizon in self._forecasts:
+                return self._forecasts[horizon]
+            if len(self.values) < self.max_lag + len(_trend_weights(self.period)):
+                raise ValueError(f"Se necesitan al menos {self.max_lag + len(_trend_weights(self.period))} horas de historia.")
+
+            n_history = len(self.values)
+            hours = pd.date_range(self.end + _ONE_HOUR, periods=horizon, freq=_ONE_HOUR)
+
+            # Columnas que no dependen de las predicciones, calculadas para todo el horizonte a la vez
+            rows = np.empty((horizon, len(FORECAST_FEATURES)))
+            rows[:, 0] = hours.year
+            rows[:, 1] = hours.month
+            rows[:, 2] = hours.day
+            rows[:, 3] = hours.dayofweek
+            phases = seasonal_component(self.values, trend_component(self.values, self.period), self.period)
+            rows[:, -1] = phases[(np.arange(n_history, n_history + horizon) - 1) % self.period]
+
+            # Recursión: desfases y tendencia con las horas observadas y las ya pronosticadas
+            weights = _trend_weights(self.period)
+            extended = np.concatenate([self.values, np.empty(horizon)])
+            lag_columns = slice(len(CALENDAR_FEATURES), len(CALENDAR_FEATURES) + self.max_lag)
+            for step in range(horizon):
+                t = n_history + step
+                rows[step, lag_columns] = extended[t - 1:t - 1 - self.max_lag:-1]
+                rows[step, -2] = extended[t - len(weights):t] @ weights
+                extended[t] = max(0.0, float(self.model.predict(rows[step:step + 1])[0]))
+
+            forecast = pd.Series(extended[n_history:], index=hours, name='prediction')
+            self._forecasts[horizon] = forecast
+
+            return forecast
+
+    def daily_forecast(self, days: int) -> pd.Series:
+        """
+        Pronostica los fraudes por día sumando el pronóstico por hora. El primer día suma las horas ya observadas
+        de ese día y las pronosticadas.
+
+        Parámetros:
+        - days: Número de días a pronosticar a partir del último día con datos.
+
+        Retorna:
+        - Serie indexada por día con los fraudes pronosticados.
+        """
+        hours_left_today = 23 - self.end.hour
+        hourly = self.forecast(hours_left_today + 24 * days)
+        daily = hourly.groupby(hourly.index.normalize()).sum()
+
+        # Completar el último día observado con sus horas ya registradas
+        if hours_left_today:
+            day_start = self.end.normalize()
+            observed = self.values[max(0, len(self.values) - 1 - (self.end - day_start) // _ONE_HOUR):].sum()
+            daily.iloc[0] += observed
+        daily.index.name = 'date'
+
+        return daily
+
+
+def load_forecaster(model_path: str = FORECAST_MODEL_PATH) -> FraudForecaster:
+    """
+    Retorna el pronosticador compartido por el proceso (se crea de nuevo si el modelo cambia en disco).
+
+    Parámetros:
+    - model_path: Ruta al modelo CatBoost de la serie temporal.
+
+    Retorna:
+    - El FraudForecaster del modelo.
+    """
+    return registry.get(model_path, FraudForecaster, variant='forecaster')
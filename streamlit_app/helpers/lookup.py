@@ -0,0 +1,173 @@
+# Librerias estandar
+import os
+from typing import Dict, List
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.artifacts import registry
+
+# Carpeta de las tablas de referencia originales, calculadas con el dataset histórico
+REFERENCE_DATA_DIR = 'streamlit_app/data'
+
+# Carpeta de las instantáneas que guarda la store de agregados después de cada carga (ver aggregate_store.py)
+AGGREGATE_STORE_DIR = os.getenv('AGGREGATE_STORE_DIR', 'streamlit_app/data/aggregates')
+
+
+class LookupTable:
+    """
+    Índice hash precalculado que asocia los valores de una columna clave (vendedor, ciudad, estado o profesión)
+    con una o más columnas de valores de una tabla de referencia.
+
+    Reemplaza a `DataFrame.merge(..., how='left')`: en lugar de copiar el DataFrame completo, la columna clave
+    se factoriza una sola vez y cada valor único se resuelve contra el índice. Las claves desconocidas o nulas
+    se resuelven a NaN, igual que en un left join.
+    """
+
+    def __init__(self, keys: pd.Index, values: Dict[str, np.ndarray]):
+        self.keys = keys
+        # Cada arreglo lleva un NaN extra al final que se usa para las claves desconocidas
+        self.values = {name: np.append(np.asarray(column, dtype=np.float64), np.nan) for name, column in values.items()}
+
+    @classmethod
+    def from_frame(cls, table: pd.DataFrame, key_col_name: str, value_col_names: List[str]) -> 'LookupTable':
+        """
+        Construye el índice a partir de una tabla de referencia.
+
+        Parámetros:
+        - table: DataFrame con la columna clave y las columnas de valores.
+        - key_col_name: Nombre de la columna clave.
+        - value_col_names: Nombres de las columnas de valores.
+
+        Retorna:
+        - LookupTable listo para consultar.
+        """
+        # Un left join con claves repetidas duplicaría filas; se conserva la primera aparición
+        table = table.drop_duplicates(subset=key_col_name)
+        keys = pd.Index(table[key_col_name])
+        values = {name: table[name].to_numpy() for name in value_col_names}
+
+        return cls(keys, values)
+
+    def positions(self, column: pd.Series) -> np.ndarray:
+        """
+        Calcula, para cada fila, la posición de su clave en la tabla de referencia.
+
+        Parámetros:
+        - column: Serie con las claves a buscar.
+
+        Retorna:
+        - Arreglo de enteros con la posición de cada fila; las claves desconocidas apuntan a la posición de NaN.
+        """
+        # Factorizar la columna: las columnas categóricas ya traen sus códigos
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes, uniques = column.cat.codes.to_numpy(), column.cat.categories
+        else:
+            codes, uniques = pd.factorize(column)
+
+        # Resolver solo los valores únicos contra el índice (-1 si no existen)
+        unique_positions = self.keys.get_indexer(uniques)
+        unique_positions[unique_positions < 0] = len(self.keys)
+
+        # El código -1 (valor nulo) toma el último elemento, que apunta a la posición de NaN
+        unique_positions = np.append(unique_positions, len(self.keys))
+
+        return unique_positions[codes]
+
+    def lookup(self, column: pd.Series) -> Dict[str, np.ndarray]:
+        """
+        Retorna las columnas de valores alineadas con las filas de `column`.
+
+        Parámetros:
+        - column: Serie con las claves a buscar.
+
+        Retorna:
+        - Diccionario {nombre de columna: arreglo float64}.
+        """
+        row_positions = self.positions(column)
+
+        return {name: values[row_positions] for name, values in self.values.items()}
+
+
+def reference_table_path(file_name: str) -> str:
+    """
+    Retorna la ruta de una tabla de referencia: la instantánea de la store de agregados si ya existe o, si no,
+    el CSV original de `streamlit_app/data`.
+
+    Es la ruta por defecto de todas las funciones que usan las tablas de porcentaje/ranking de fraude y de frecuencia
+    de profesiones, para que los conteos actualizados por cada carga lleguen a las predicciones. La ruta se resuelve
+    en cada llamada; `load_lookup_table` vuelve a leer el archivo cuando cambia su fecha de modificación.
+
+    Parámetros:
+    - file_name: Nombre del archivo (por ejemplo, 'group_fraud_by_merch.csv').
+
+    Retorna:
+    - Ruta del archivo a cargar.
+    """
+    snapshot_path = os.path.join(AGGREGATE_STORE_DIR, file_name)
+    if os.path.exists(snapshot_path):
+        return snapshot_path
+
+    return os.path.join(REFERENCE_DATA_DIR, file_name)
+
+def load_lookup_table(path: str, key_col_name: str, value_col_names: List[str]) -> LookupTable:
+    """
+    Carga (una vez por proceso) un archivo CSV de referencia y construye su LookupTable.
+
+    Parámetros:
+    - path: Ruta al archivo CSV.
+    - key_col_name: Nombre de la columna clave.
+    - value_col_names: Nombres de las columnas de valores.
+
+    Retorna:
+    - LookupTable compartido por todo el proceso.
+    """
+    variant = f"lookup:{key_col_name}:{','.join(value_col_names)}"
+
+    return registry.get(
+        path,
+        lambda abs_path: LookupTable.from_frame(pd.read_csv(abs_path), key_col_name, value_col_names),
+        variant=variant
+    )
+
+def enrichment_columns(
+    data: pd.DataFrame,
+    group_merch_path: str = None,
+    group_city_path: str = None,
+    group_state_path: str = None,
+    job_freq_path: str = None
+) -> Dict[str, np.ndarray]:
+    """
+    Calcula en una sola pasada las nueve columnas de enriquecimiento del modelo: porcentaje y ranking de fraude
+    por vendedor, ciudad y estado, y la codificación por frecuencia de la profesión.
+
+    El DataFrame de entrada no se copia ni se modifica.
+
+    Parámetros:
+    - data: DataFrame con las columnas 'merchant', 'city', 'state' y 'job'.
+    - group_merch_path: Ruta al archivo CSV con los datos de fraude por vendedor. Si es None, se usa `reference_table_path`.
+    - group_city_path: Ruta al archivo CSV con los datos de fraude por ciudad. Si es None, se usa `reference_table_path`.
+    - group_state_path: Ruta al archivo CSV con los datos de fraude por estado. Si es None, se usa `reference_table_path`.
+    - job_freq_path: Ruta al archivo CSV con la frecuencia de las profesiones. Si es None, se usa `reference_table_path`.
+
+    Retorna:
+    - Diccionario ordenado {nombre de columna: arreglo} con las nueve columnas, en el orden que espera el modelo.
+    """
+    group_merch_path = group_merch_path or reference_table_path('group_fraud_by_merch.csv')
+    group_city_path = group_city_path or reference_table_path('group_fraud_by_city.csv')
+    group_state_path = group_state_path or reference_table_path('group_fraud_by_state.csv')
+    job_freq_path = job_freq_path or reference_table_path('job_freq.csv')
+
+    stages = [
+        (load_lookup_table(group_merch_path, 'merchant', ['fraud_merch_pct', 'fraud_merch_rank']), 'merchant', None),
+        (load_lookup_table(group_city_path, 'city', ['fraud_city_pct', 'fraud_city_rank']), 'city', None),
+        (load_lookup_table(group_state_path, 'state', ['fraud_state_pct', 'fraud_state_rank']), 'state', None),
+        (load_lookup_table(job_freq_path, 'job', ['proportion']), 'job', {'proportion': 'job_encoded'}),
+    ]
+
+    columns = {}
+    for table, key_col_name, rename in stages:
+        for name, values in table.lookup(data[key_col_name]).items():
+            columns[(rename or {}).get(name, name)] = values
+
+    return columns
@@ -0,0 +1,186 @@
+# Librerias estandar
+import asyncio
+from typing import Dict, List, Sequence
+# Librearias de 3ros
+import numpy as np
+
+
+class Histogram:
+    """
+    Histograma acumulado con límites superiores fijos (como los histogramas de Prometheus).
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        # Un contador por límite y uno más para los valores mayores que el último límite
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Registra un valor en el primer intervalo cuyo límite superior lo contiene.
+        """
+        self.counts[int(np.searchsorted(self.bounds, value, side='left'))] += 1
+        self.total += 1
+        self.sum += value
+
+    def to_dict(self) -> Dict[str, int]:
+        """
+        Retorna los conteos por intervalo, con la etiqueta de su límite superior ('+Inf' para el último).
+        """
+        labels = [str(bound) for bound in self.bounds] + ['+Inf']
+
+        return dict(zip(labels, self.counts))
+
+
+def _power_of_two_bounds(max_value: int) -> List[int]:
+    """
+    Límites 1, 2, 4, ... hasta cubrir `max_value`.
+    """
+    bounds = [1]
+    while bounds[-1] < max_value:
+        bounds.append(bounds[-1] * 2)
+
+    return bounds
+
+
+class MicroBatcher:
+    """
+    Cola asíncrona que agrupa filas de características de transacciones individuales y las puntúa con una
+    sola llamada vectorizada a `predict_proba`.
+
+    Cada lote se cierra al llegar a `max_batch_size` filas o cuando pasan `max_wait_ms` milisegundos desde la
+    primera fila del lote. La predicción se ejecuta en un hilo, para que el bucle de eventos siga aceptando
+    peticiones mientras tanto, y cada resultado se devuelve a la petición que lo originó.
+    """
+
+    def __init__(self, model, max_batch_size: int = 64, max_wait_ms: float = 2.0, thread_count: int = 1):
+        if max_batch_size <= 0:
+            raise ValueError("El tamaño máximo del lote debe ser mayor que 0.")
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.thread_count = thread_count
+
+        self.batch_size_histogram = Histogram(_power_of_two_bounds(max_batch_size))
+        self.queue_depth_histogram = Histogram(_power_of_two_bounds(max(max_batch_size * 16, 1024)))
+
+        self._queue = None
+        self._worker = None
+
+    async def start(self) -> None:
+        """
+        Inicia la tarea que forma y puntúa los lotes. Debe llamarse dentro del bucle de eventos que la usará.
+        """
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Detiene la tarea de los lotes; las peticiones pendientes reciben una cancelación.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+
+    async def __aenter__(self) -> 'MicroBatcher':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def predict(self, features: np.ndarray) -> float:
+        """
+        Encola una fila de características y espera su probabilidad de fraude.
+
+        Parámetros:
+        - features: Vector de características escalado (por ejemplo, `TransactionScorer.features(record)`).
+
+        Retorna:
+        - Probabilidad de fraude entre 0 y 1.
+        """
+        if self._worker is None:
+            raise RuntimeError("El micro-batcher no está iniciado; llama a start() primero.")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((features, future))
+        self.queue_depth_histogram.observe(self._queue.qsize())
+
+        return await future
+
+    def stats(self) -> dict:
+        """
+        Retorna los histogramas de tamaño de lote y profundidad de la cola, y el número de lotes y peticiones.
+        """
+        return {
+            'batches': self.batch_size_histogram.total,
+            'requests': int(self.batch_size_histogram.sum),
+            'mean_batch_size': self.batch_size_histogram.sum / self.batch_size_histogram.total if self.batch_size_histogram.total else 0.0,
+            'batch_size': self.batch_size_histogram.to_dict(),
+            'queue_depth': self.queue_depth_histogram.to_dict(),
+        }
+
+    async def _next_batch(self) -> list:
+        """
+        Espera la primera fila y agrupa las siguientes hasta llenar el lote o agotar el tiempo de espera.
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            # Primero se toma lo que ya está en la cola, sin esperar
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """
+        Forma lotes de forma continua y reparte las probabilidades entre las peticiones.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+
+            # Las peticiones canceladas mientras esperaban ya no se puntúan
+            batch = [(features, future) for features, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            self.batch_size_histogram.observe(len(batch))
+
+            try:
+                rows = np.vstack([features for features, _ in batch])
+                probabilities = await loop.run_in_executor(
+                    None, lambda: self.model.predict_proba(rows, thread_count=self.thread_count)[:, 1]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), probability in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(float(probability))
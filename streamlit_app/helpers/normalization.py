@@ -0,0 +1,135 @@
+# Librerias estandar
+from collections import OrderedDict
+import threading
+from typing import Dict, List
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.profiling import profiled
+
+# Columnas de cada tabla relacional construida desde el archivo de transacciones ('predictions' sale del modelo)
+TABLE_COLUMNS = {
+    'users': ['cc_num', 'zip', 'first', 'last', 'gender', 'street', 'city', 'state', 'job', 'dob'],
+    'merchants': ['merchant', 'merch_lat', 'merch_long'],
+    'locations': ['city', 'state', 'city_pop'],
+    'transactions': ['trans_date_trans_time', 'cc_num', 'merchant', 'category', 'amt', 'lat', 'long', 'trans_num', 'unix_time', 'is_fraud'],
+}
+
+# Multiplicador para combinar los hashes de las columnas de una fila (primo FNV-1 de 64 bits)
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+# Tablas ya normalizadas, compartidas por todo el proceso (las de los datasets más recientes)
+_MAX_TABLES_IN_MEMORY = 2
+_tables = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def _column_hash(column: pd.Series) -> np.ndarray:
+    """
+    Hash de 64 bits de cada valor de una columna. En las columnas categóricas solo se calculan los hashes de las
+    categorías y se reparten por sus códigos; los valores nulos tienen un hash fijo.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        category_hashes = pd.util.hash_array(np.asarray(column.cat.categories))
+        codes = column.cat.codes.to_numpy()
+        # El código -1 (nulo) toma la última posición, reservada para el hash de los nulos
+        return np.append(category_hashes, np.uint64(0)).take(codes)
+
+    return pd.util.hash_array(column.to_numpy())
+
+def _combine_hash(row_hash: np.ndarray, column_hash: np.ndarray) -> np.ndarray:
+    """
+    Añade el hash de una columna al hash de cada fila (la aritmética de uint64 se desborda sin error).
+    """
+    row_hash *= _HASH_MULTIPLIER
+    row_hash ^= column_hash
+
+    return row_hash
+
+def _first_occurrences(data: pd.DataFrame, columns: List[str], column_hashes: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Retorna las posiciones de la primera aparición de cada fila distinta de `data[columns]`.
+
+    Las columnas de texto sin categorías ('trans_num') son las más costosas de convertir en hash, por lo que primero
+    se comparan las demás columnas: las filas que ya son únicas con ellas no necesitan el hash de los textos, que solo
+    se calcula para las filas con posibles duplicados.
+    """
+    object_columns = [col_name for col_name in columns if col_name not in column_hashes]
+    row_hash = np.zeros(len(data), dtype=np.uint64)
+    for col_name in columns:
+        if col_name in column_hashes:
+            _combine_hash(row_hash, column_hashes[col_name])
+
+    if not object_columns:
+        return np.flatnonzero(~pd.Series(row_hash).duplicated(keep='first').to_numpy())
+
+    # Filas que comparten el hash de las demás columnas con alguna otra fila
+    candidates = np.flatnonzero(pd.Series(row_hash).duplicated(keep=False).to_numpy())
+    is_first = np.ones(len(data), dtype=bool)
+    if len(candidates):
+        candidate_hash = row_hash[candidates]
+        for col_name in object_columns:
+            _combine_hash(candidate_hash, pd.util.hash_array(data[col_name].to_numpy()[candidates]))
+        is_first[candidates] = ~pd.Series(candidate_hash).duplicated(keep='first').to_numpy()
+
+    return np.flatnonzero(is_first)
+
+@profiled()
+def normalize_tables(data: pd.DataFrame, table_columns: Dict[str, List[str]] = TABLE_COLUMNS) -> Dict[str, pd.DataFrame]:
+    """
+    Construye en una sola pasada las tablas relacionales sin filas duplicadas.
+
+    Cada columna se convierte una sola vez en un hash de 64 bits, aunque aparezca en varias tablas (en las columnas
+    categóricas, solo sus categorías), y las filas duplicadas se detectan sobre el hash combinado de las columnas de
+    cada tabla en lugar de comparar los textos ('street', 'first', 'last', ...). Solo se copian las filas que se
+    conservan. El resultado es el mismo que con `drop_duplicates`: primera aparición de cada fila y el índice original
+    (una colisión de hashes de 64 bits es despreciable con millones de filas).
+
+    Parámetros:
+    - data: DataFrame de transacciones.
+    - table_columns: Columnas de cada tabla.
+
+    Retorna:
+    - Diccionario {nombre de la tabla: DataFrame sin duplicados}.
+    """
+    # Hash de cada columna usada por alguna tabla, calculado una sola vez (salvo las columnas de texto sin categorías)
+    columns = list(dict.fromkeys(col_name for cols in table_columns.values() for col_name in cols))
+    column_hashes = {
+        col_name: _column_hash(data[col_name]) for col_name in columns if data[col_name].dtype != object
+    }
+
+    tables = {}
+    for table_name, cols in table_columns.items():
+        rows = _first_occurrences(data, cols, column_hashes)
+        # Si no hay duplicados, basta con seleccionar las columnas (sin reordenar las filas)
+        tables[table_name] = data[cols] if len(rows) == len(data) else data.iloc[rows, [data.columns.get_loc(col_name) for col_name in cols]]
+
+    return tables
+
+def load_normalized_tables(dataset_key: str, data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Retorna las tablas relacionales de un dataset, normalizándolo solo la primera vez.
+
+    Las tablas se comparten entre reruns y sesiones, por lo que no deben modificarse en el lugar.
+
+    Parámetros:
+    - dataset_key: Clave del dataset (hash SHA-256 del zip, ver `upload_cache`).
+    - data: DataFrame del dataset.
+
+    Retorna:
+    - Diccionario {nombre de la tabla: DataFrame sin duplicados}.
+    """
+    with _tables_lock:
+        if dataset_key in _tables:
+            _tables.move_to_end(dataset_key)
+            return _tables[dataset_key]
+
+    tables = normalize_tables(data)
+
+    with _tables_lock:
+        _tables[dataset_key] = tables
+        while len(_tables) > _MAX_TABLES_IN_MEMORY:
+            _tables.popitem(last=False)
+
+    return tables
@@ -0,0 +1,90 @@
+# Librerias estandar
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import multiprocessing
+import os
+import threading
+from typing import Callable, List
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.features import build_feature_matrix
+from helpers.profiling import profiled
+
+# Columnas que la construcción de características no usa; no se envían a los procesos
+UNUSED_COLUMNS = ['Unnamed: 0', 'cc_num', 'first', 'last', 'street', 'unix_time', 'trans_num']
+
+# Pool de procesos reutilizado entre llamadas; se reemplaza solo si cambia el número de procesos
+_executor: ProcessPoolExecutor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _partition_bounds(n_rows: int, n_workers: int, min_rows_per_partition: int) -> np.ndarray:
+    """
+    Límites (por posición de fila) de las particiones. Con pocos datos se usan menos particiones para que cada una
+    justifique el costo de enviarla a otro proceso.
+    """
+    n_partitions = max(1, min(n_workers, n_rows // max(min_rows_per_partition, 1)))
+
+    return np.linspace(0, n_rows, n_partitions + 1).astype(int)
+
+def _map_in_pool(n_workers: int, function: Callable, partitions: List[pd.DataFrame]) -> list:
+    """
+    Aplica `function` a cada partición en el pool de procesos persistente y retorna los resultados en orden.
+
+    Se mantiene un solo pool: si se pide otro número de procesos, el pool anterior se cierra (sus tareas en curso
+    terminan) y se crea uno nuevo, de modo que cambiar los núcleos en la página no deja procesos huérfanos. Las
+    tareas se envían mientras se tiene el lock, para que otra sesión no cierre el pool entre su creación y el envío.
+
+    Se usa el método 'spawn' porque el servidor de Streamlit tiene varios hilos activos y hacer fork en ese
+    estado no es seguro. Cada proceso carga las tablas de referencia una sola vez y las reutiliza.
+    """
+    global _executor, _executor_workers
+
+    with _executor_lock:
+        if _executor is None or _executor_workers != n_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context('spawn'))
+            _executor_workers = n_workers
+        futures = [_executor.submit(function, partition) for partition in partitions]
+
+    return [future.result() for future in futures]
+
+@profiled()
+def parallel_build_features(
+    data: pd.DataFrame,
+    scaler=None,
+    n_workers: int = None,
+    min_rows_per_partition: int = 50_000
+) -> np.ndarray:
+    """
+    Ejecuta `build_feature_matrix` en paralelo dividiendo las filas en particiones procesadas por un pool de procesos.
+
+    Cada proceso devuelve su bloque de la matriz float32 ya escalado, y los bloques se unen en el orden original.
+
+    Parámetros:
+    - data: DataFrame con las transacciones.
+    - scaler: Escalador entrenado. Si es None, cada proceso lo carga desde la ruta por defecto.
+    - n_workers: Número de procesos. Si es None, se usan todos los núcleos disponibles.
+    - min_rows_per_partition: Tamaño mínimo de cada partición; con pocos datos se usan menos procesos.
+
+    Retorna:
+    - Matriz float32 igual a la que retorna `build_feature_matrix(data, scaler)`.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    bounds = _partition_bounds(len(data), n_workers, min_rows_per_partition)
+    if len(bounds) == 2:
+        return build_feature_matrix(data, scaler)
+
+    # Enviar solo las columnas que se usan para construir las características
+    data = data.drop(columns=[col for col in UNUSED_COLUMNS + ['is_fraud'] if col in data.columns])
+
+    partitions = [data.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    results = _map_in_pool(n_workers, partial(build_feature_matrix, scaler=scaler), partitions)
+
+    return np.concatenate(results, axis=0)
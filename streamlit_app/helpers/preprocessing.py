@@ -1,6 +1,18 @@
+import numpy as np
 import pandas as pd
-from helpers.utils import calc_pct_n_rank, datetime_split, dob_to_age, haversine_distance, job_encoder, ohe_data
+from helpers.datetime_features import datetime_feature_columns
+from helpers.lookup import enrichment_columns
+from helpers.profiling import profiled
+from helpers.utils import haversine_distance_array, ohe_data
 
+# Columnas redundantes o con poca información que se eliminan antes de entrenar/predecir
+COLUMNS_TO_DROP = [
+    'Unnamed: 0', 'cc_num', 'first', 'last', 'street', 'unix_time', 'trans_num',
+    'merchant', 'city', 'state', 'job', 'trans_date_trans_time',
+    'dob', 'lat', 'long', 'merch_lat', 'merch_long', 'category', 'gender'
+]
+
+@profiled()
 def preprocessing_data(data: pd.DataFrame) -> pd.DataFrame:
     """
     Preprocesa un DataFrame realizando varias transformaciones de datos.
@@ -12,32 +24,59 @@ def preprocessing_data(data: pd.DataFrame) -> pd.DataFrame:
     - DataFrame preprocesado con características transformadas y columnas redundantes eliminadas.
     """
     
-    # Calcular el porcentaje y rango de fraude de los vendedores, ciudades y estados.
-    data = calc_pct_n_rank(data)
+    # Día del mes, mes, año, hora y día de la semana de la transacción, y edad a partir de la fecha de nacimiento.
+    # Se calculan sobre el DataFrame original para reutilizar las fechas ya parseadas de ese dataset.
+    datetime_columns = datetime_feature_columns(data)
 
-    # Transformar la profesión en números basados en la frecuencia.
-    data = job_encoder(data)
+    # Copia superficial: las nuevas columnas no copian los datos ni modifican el DataFrame original.
+    data = data.copy(deep=False)
 
-    # Dividir la columna de fecha/hora en columnas separadas para día del mes, mes, año, hora y día de la semana.
-    data = datetime_split(data)
+    # Añadir en una sola pasada el porcentaje y rango de fraude de los vendedores, ciudades y estados,
+    # y la profesión transformada en números basados en la frecuencia.
+    for col_name, values in enrichment_columns(data).items():
+        data[col_name] = values
 
-    # Transformar la fecha de nacimiento en edad.
-    data = dob_to_age(data)
+    # Añadir las columnas de fecha/hora y edad.
+    for col_name, values in datetime_columns.items():
+        data[col_name] = values
 
     # Crear una nueva columna con la distancia entre el vendedor y el comprador.
-    data["distance_to_merch"] = data.apply(
-        lambda row: haversine_distance(row['lat'], row['long'], row['merch_lat'], row['merch_long']), axis=1
+    data["distance_to_merch"] = haversine_distance_array(
+        data['lat'].to_numpy(), data['long'].to_numpy(),
+        data['merch_lat'].to_numpy(), data['merch_long'].to_numpy(),
+        out=np.empty(len(data), dtype=np.float32)
     )
 
     # Convertir las columnas categóricas usando One Hot Encoding.
     data_ohe = ohe_data(data)
 
     # Eliminar columnas redundantes o con poca información para el modelo.
-    columns_to_drop = [
-        'Unnamed: 0', 'cc_num', 'first', 'last', 'street', 'unix_time', 'trans_num',
-        'merchant', 'city', 'state', 'job', 'trans_date_trans_time',
-        'dob', 'lat', 'long', 'merch_lat', 'merch_long', 'category', 'gender'
-    ]
-    data_ohe.drop(columns=columns_to_drop, axis=1, inplace=True)
+    data_ohe.drop(columns=COLUMNS_TO_DROP, inplace=True, errors='ignore')
     
-    return data_ohe
\ No newline at end of file
+    return data_ohe
+
+# Columnas numéricas que el escalador entrenado espera, en su orden original
+COLS_TO_SCALE = [
+    'amt', 'zip', 'city_pop', 'fraud_merch_pct', 'fraud_merch_rank',
+    'fraud_city_pct', 'fraud_city_rank', 'fraud_state_pct', 'fraud_state_rank',
+    'job_encoded', 'trans_day', 'trans_month', 'trans_year', 'trans_hour',
+    'trans_weekday', 'age', 'distance_to_merch'
+]
+
+@profiled()
+def scale_features(features: pd.DataFrame, scaler, cols_to_scale: list = COLS_TO_SCALE) -> pd.DataFrame:
+    """
+    Escala las columnas numéricas de las características con el escalador entrenado.
+
+    Parámetros:
+    - features: DataFrame con las características preprocesadas (sin la columna objetivo).
+    - scaler: Escalador entrenado (StandardScaler).
+    - cols_to_scale: Columnas a escalar, en el orden en que se entrenó el escalador.
+
+    Retorna:
+    - DataFrame con las mismas columnas que `features` y las columnas numéricas escaladas.
+    """
+    features_scaled = features.copy()
+    features_scaled[cols_to_scale] = scaler.transform(features[cols_to_scale])
+
+    return features_scaled
@@ -0,0 +1,339 @@
+# Librerias estandar
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import json
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Union
+# Librearias de 3ros
+import pandas as pd
+import streamlit as st
+
+# Perfilador activo en el contexto actual (hilo del script de Streamlit); None si no se está midiendo
+_active_profiler: ContextVar[Optional['StageProfiler']] = ContextVar('active_profiler', default=None)
+
+# Prefijo de las métricas exportadas en formato Prometheus
+PROMETHEUS_PREFIX = 'fraud_pipeline_stage'
+
+
+class _RssMonitor:
+    """
+    Lee la memoria residente (RSS) actual y el pico desde el último reinicio.
+
+    En Linux el pico se reinicia escribiendo '5' en /proc/self/clear_refs, por lo que el pico de cada etapa es
+    exacto. En otros sistemas se usa la RSS actual de psutil (sin pico real: el delta es final - inicial); sin
+    psutil (dependencia opcional) la memoria no se mide.
+
+    Nada de esto ocurre al importar el módulo: el sistema se revisa la primera vez que un perfilador mide una etapa.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = False
+        self.exact_peak = False
+        self.available = False
+        self._process = None
+
+    def ensure_ready(self) -> None:
+        """
+        Elige la forma de medir la memoria (una sola vez por proceso).
+        """
+        with self._lock:
+            if self._ready:
+                return
+            self._ready = True
+
+            if sys.platform.startswith('linux'):
+                try:
+                    self.exact_peak = self.available = True
+                    self.reset_peak()
+                    self.read()
+                    return
+                except OSError:
+                    self.exact_peak = self.available = False
+
+            try:
+                import psutil
+                self._process = psutil.Process()
+                self.available = True
+            except ImportError:
+                pass
+
+    def reset_peak(self) -> None:
+        if self.exact_peak:
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+
+    def read(self) -> tuple:
+        """
+        Retorna (RSS actual, pico de RSS desde el último reinicio), en bytes; (0, 0) si la memoria no se mide.
+        """
+        if self.exact_peak:
+            values = {}
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith(('VmRSS:', 'VmHWM:')):
+                        name, value = line.split(':')
+                        values[name] = int(value.split()[0]) * 1024
+            return values['VmRSS'], values['VmHWM']
+
+        if self._process is not None:
+            rss = self._process.memory_info().rss
+            return rss, rss
+
+        return 0, 0
+
+
+_rss_monitor = _RssMonitor()
+
+
+class StageProfiler:
+    """
+    Registro del tiempo, las filas por segundo y el pico de memoria de cada etapa del pipeline de predicción.
+
+    Las etapas se miden con el context manager `profile_stage` o con el decorador `profiled` sobre los helpers; las
+    etapas anidadas se registran con su ruta ('build_feature_matrix/one_hot'). Solo se mide mientras el perfilador
+    está activo (`with profiler.activate():` o `start()`/`stop()`); en otro caso los helpers decorados no hacen nada
+    extra. Los helpers que se ejecutan en otros procesos (pool de `parallel.py`) se miden como una sola etapa.
+
+    El pico de RSS es el del proceso completo: con varias sesiones de Streamlit midiendo a la vez es aproximado.
+    """
+
+    def __init__(self):
+        self.records: List[dict] = []
+        self._open: List[dict] = []
+        self._token = None
+
+    def start(self) -> 'StageProfiler':
+        """
+        Activa el perfilador en el contexto actual, para que los helpers decorados registren sus etapas en él.
+        """
+        _rss_monitor.ensure_ready()
+        self._token = _active_profiler.set(self)
+        return self
+
+    def stop(self) -> None:
+        """
+        Desactiva el perfilador en el contexto actual.
+        """
+        if self._token is not None:
+            _active_profiler.reset(self._token)
+            self._token = None
+
+    @contextmanager
+    def activate(self) -> Iterator['StageProfiler']:
+        """
+        Activa el perfilador dentro de un bloque `with`.
+        """
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def _observe_peak(self) -> int:
+        """
+        Propaga el pico de RSS desde el último reinicio a todas las etapas abiertas y lo reinicia.
+        """
+        _rss_monitor.ensure_ready()
+        with _rss_monitor._lock:
+            rss, peak = _rss_monitor.read()
+            for record in self._open:
+                record['_peak'] = max(record['_peak'], peak)
+            _rss_monitor.reset_peak()
+
+        return rss
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None) -> Iterator[dict]:
+        """
+        Mide una etapa.
+
+        Parámetros:
+        - name: Nombre de la etapa.
+        - rows: Filas procesadas (para calcular las filas por segundo). Puede asignarse después en record['rows'].
+
+        Retorna:
+        - Un context manager que entrega el registro de la etapa.
+        """
+        path = f"{self._open[-1]['stage']}/{name}" if self._open else name
+        record = {'stage': path, 'rows': rows, '_peak': 0}
+        record['_rss_start'] = self._observe_peak()
+        self._open.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self._observe_peak()
+            self._open.pop()
+            peak_rss_delta = max(0, record.pop('_peak') - record.pop('_rss_start'))
+            record['peak_rss_delta_bytes'] = peak_rss_delta if _rss_monitor.available else None
+            record['rows_per_second'] = record['rows'] / record['seconds'] if record['rows'] and record['seconds'] else None
+            self.records.append(record)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Retorna una fila por etapa (en el orden en que empezaron), sumando las llamadas repetidas a la misma etapa.
+        """
+        columns = ['etapa', 'llamadas', 'segundos', 'filas', 'filas_por_segundo', 'pico_rss_mb']
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+
+        records = pd.DataFrame(self.records)
+        summary = records.groupby('stage', sort=False).agg(
+            llamadas=('seconds', 'size'),
+            segundos=('seconds', 'sum'),
+            filas=('rows', 'sum'),
+            pico_rss_mb=('peak_rss_delta_bytes', 'max'),
+        )
+        # Las etapas anidadas terminan antes que su etapa padre; se ordenan por su primera aparición en la ruta
+        order = {stage: i for i, stage in enumerate(dict.fromkeys(
+            prefix for stage in records['stage'] for prefix in _stage_prefixes(stage)
+        ))}
+        summary = summary.loc[sorted(summary.index, key=order.get)]
+        summary['filas'] = summary['filas'].where(summary['filas'] > 0)
+        summary['filas_por_segundo'] = summary['filas'] / summary['segundos']
+        # Sin medición de memoria (ver _RssMonitor) la columna queda vacía
+        summary['pico_rss_mb'] = pd.to_numeric(summary['pico_rss_mb']) / 2 ** 20
+
+        return summary.reset_index().rename(columns={'stage': 'etapa'})[columns]
+
+    def to_json(self) -> str:
+        """
+        Exporta las mediciones de cada llamada en formato JSON.
+        """
+        return json.dumps({
+            'stages': self.records, 'exact_peak_rss': _rss_monitor.exact_peak, 'rss_available': _rss_monitor.available
+        }, indent=2)
+
+    def to_prometheus(self, labels: Dict[str, str] = None) -> str:
+        """
+        Exporta el resumen por etapa en el formato de texto de Prometheus (gauges de la última ejecución).
+
+        Parámetros:
+        - labels: Etiquetas adicionales para todas las series (por ejemplo, {'page': 'predicciones'}).
+
+        Retorna:
+        - Texto listo para exponer o para enviar a un Pushgateway.
+        """
+        summary = self.summary()
+        metrics = [
+            ('seconds', 'segundos', 'Wall time of the stage in the last run.'),
+            ('rows_per_second', 'filas_por_segundo', 'Rows processed per second by the stage in the last run.'),
+            ('peak_rss_delta_bytes', 'pico_rss_mb', 'Peak resident memory above the RSS at the start of the stage.'),
+            ('calls', 'llamadas', 'Number of calls to the stage in the last run.'),
+        ]
+        extra_labels = ''.join(f',{key}="{_escape_label(value)}"' for key, value in (labels or {}).items())
+
+        lines = []
+        for metric, col_name, help_text in metrics:
+            name = f'{PROMETHEUS_PREFIX}_{metric}'
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            for _, row in summary.iterrows():
+                value = row[col_name] * 2 ** 20 if metric == 'peak_rss_delta_bytes' else row[col_name]
+                if pd.notna(value):
+                    lines.append(f'{name}{{stage="{_escape_label(row["etapa"])}"{extra_labels}}} {float(value):.6g}')
+
+        return '\n'.join(lines) + '\n'
+
+    def exceeded_budgets(self, budgets: Dict[str, float]) -> Dict[str, float]:
+        """
+        Compara el tiempo de cada etapa con un presupuesto, para detectar regresiones.
+
+        Parámetros:
+        - budgets: Segundos máximos por etapa ({'caracteristicas': 2.0, ...}).
+
+        Retorna:
+        - Diccionario {etapa: segundos medidos} con las etapas que superaron su presupuesto.
+        """
+        seconds = self.summary().set_index('etapa')['segundos']
+
+        return {stage: float(seconds[stage]) for stage, budget in budgets.items() if stage in seconds and seconds[stage] > budget}
+
+
+def _stage_prefixes(stage: str) -> List[str]:
+    parts = stage.split('/')
+    return ['/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def active_profiler() -> Optional[StageProfiler]:
+    """
+    Retorna el perfilador activo en el contexto actual, o None.
+    """
+    return _active_profiler.get()
+
+@contextmanager
+def profile_stage(name: str, rows: int = None) -> Iterator[Optional[dict]]:
+    """
+    Mide un bloque como etapa del perfilador activo; si no hay uno activo, no hace nada.
+
+    Parámetros:
+    - name: Nombre de la etapa.
+    - rows: Filas procesadas en el bloque.
+
+    Retorna:
+    - Un context manager que entrega el registro de la etapa (o None si no se está midiendo).
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield None
+        return
+
+    with profiler.stage(name, rows) as record:
+        yield record
+
+def profiled(name: str = None, rows: Union[int, str, None] = 0) -> Callable:
+    """
+    Decorador que mide cada llamada a una función como etapa del perfilador activo.
+
+    Parámetros:
+    - name: Nombre de la etapa. Por defecto, el nombre de la función.
+    - rows: De dónde sale el número de filas: la posición del argumento cuya longitud se usa (0 por defecto; 1 para
+      métodos), 'result' para la longitud del resultado o None para no registrarlo.
+
+    Retorna:
+    - La función decorada.
+    """
+    def decorator(function: Callable) -> Callable:
+        stage_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return function(*args, **kwargs)
+
+            with profiler.stage(stage_name) as record:
+                if isinstance(rows, int) and len(args) > rows and hasattr(args[rows], '__len__'):
+                    record['rows'] = len(args[rows])
+                result = function(*args, **kwargs)
+                if rows == 'result' and hasattr(result, '__len__'):
+                    record['rows'] = len(result)
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+def render_profiler(profiler: StageProfiler, title: str = "Rendimiento") -> None:
+    """
+    Muestra en un expander de Streamlit el resumen por etapa y los botones para descargar el JSON y el texto de
+    Prometheus.
+
+    Parámetros:
+    - profiler: Perfilador con las etapas medidas.
+    - title: Título del expander.
+    """
+    with st.expander(title):
+        st.dataframe(profiler.summary().style.hide(axis="index").format(precision=3, na_rep='-'))
+        col_json, col_prometheus = st.columns(2)
+        with col_json:
+            st.download_button("Descargar JSON", profiler.to_json(), file_name="rendimiento.json", mime="application/json")
+        with col_prometheus:
+            st.download_button("Descargar Prometheus", profiler.to_prometheus(), file_name="rendimiento.prom", mime="text/plain")
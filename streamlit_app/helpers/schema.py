@@ -0,0 +1,116 @@
+# Librerias estandar
+from typing import Iterator, List
+# Librearias de 3ros
+import pandas as pd
+
+# Tipos compactos de cada columna del archivo de transacciones.
+# - Columnas de baja cardinalidad como 'category'.
+# - Coordenadas y montos como float32.
+# - Enteros con el menor tamaño que cubre su rango (cc_num y unix_time necesitan 64 bits).
+TRANSACTION_DTYPES = {
+    'cc_num': 'int64',
+    'merchant': 'category',
+    'category': 'category',
+    'amt': 'float32',
+    'first': 'category',
+    'last': 'category',
+    'gender': 'category',
+    'street': 'category',
+    'city': 'category',
+    'state': 'category',
+    'zip': 'int32',
+    'lat': 'float32',
+    'long': 'float32',
+    'city_pop': 'int32',
+    'job': 'category',
+    'trans_num': 'object',
+    'unix_time': 'int64',
+    'merch_lat': 'float32',
+    'merch_long': 'float32',
+    'is_fraud': 'int8',
+}
+
+# Columnas de fecha y su formato fijo (se parsean una sola vez, sin inferir el formato)
+DATE_FORMATS = {
+    'trans_date_trans_time': '%Y-%m-%d %H:%M:%S',
+    'dob': '%Y-%m-%d',
+}
+
+# Columnas categóricas (útil para reconstruir los tipos al leer desde otros formatos)
+CATEGORY_COLUMNS = [col for col, dtype in TRANSACTION_DTYPES.items() if dtype == 'category']
+
+# Todas las columnas que se conservan del archivo ('Unnamed: 0' es el índice exportado y se descarta)
+TRANSACTION_COLUMNS = [
+    'trans_date_trans_time', 'cc_num', 'merchant', 'category', 'amt', 'first', 'last', 'gender',
+    'street', 'city', 'state', 'zip', 'lat', 'long', 'city_pop', 'job', 'dob', 'trans_num',
+    'unix_time', 'merch_lat', 'merch_long', 'is_fraud'
+]
+
+# Columnas necesarias para predecir: el modelo nunca usa 'first', 'last', 'street', 'cc_num' ni 'unix_time'
+MODEL_COLUMNS = [
+    'trans_date_trans_time', 'merchant', 'category', 'amt', 'gender', 'city', 'state', 'zip',
+    'lat', 'long', 'city_pop', 'job', 'dob', 'trans_num', 'merch_lat', 'merch_long', 'is_fraud'
+]
+
+
+def apply_transaction_schema(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parsea las columnas de fecha de un bloque recién leído con su formato fijo.
+
+    Parámetros:
+    - data: DataFrame leído con los tipos de `TRANSACTION_DTYPES`.
+
+    Retorna:
+    - El mismo DataFrame con las columnas de fecha en formato datetime.
+    """
+    for col_name, date_format in DATE_FORMATS.items():
+        if col_name in data.columns and not pd.api.types.is_datetime64_any_dtype(data[col_name]):
+            data[col_name] = pd.to_datetime(data[col_name], format=date_format)
+
+    return data
+
+def _read_csv_kwargs(columns: List[str]) -> dict:
+    """
+    Argumentos de `pd.read_csv` que aplican el esquema de transacciones a las columnas indicadas.
+    """
+    selected = set(columns)
+
+    return {
+        'usecols': lambda col_name: col_name in selected,
+        'dtype': {col: dtype for col, dtype in TRANSACTION_DTYPES.items() if col in selected},
+    }
+
+def read_transactions(source, columns: List[str] = TRANSACTION_COLUMNS) -> pd.DataFrame:
+    """
+    Lee un CSV de transacciones aplicando el esquema compacto de tipos y el formato fijo de fechas.
+
+    Parámetros:
+    - source: Ruta o archivo abierto con el CSV.
+    - columns: Columnas a conservar. Por defecto todas las del esquema; usar `MODEL_COLUMNS` si solo se va a predecir.
+
+    Retorna:
+    - DataFrame con los tipos del esquema.
+    """
+    return apply_transaction_schema(pd.read_csv(source, **_read_csv_kwargs(columns)))
+
+def read_transactions_in_chunks(
+    source,
+    chunksize: int,
+    columns: List[str] = TRANSACTION_COLUMNS
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee un CSV de transacciones por bloques de filas aplicando el esquema compacto de tipos.
+
+    Las categorías de las columnas 'category' pueden variar entre bloques.
+
+    Parámetros:
+    - source: Ruta o archivo abierto con el CSV.
+    - chunksize: Número de filas por bloque.
+    - columns: Columnas a conservar.
+
+    Retorna:
+    - Un iterador de DataFrames, uno por bloque.
+    """
+    with pd.read_csv(source, chunksize=chunksize, **_read_csv_kwargs(columns)) as reader:
+        for chunk in reader:
+            yield apply_transaction_schema(chunk)
@@ -0,0 +1,184 @@
+# Librerias estandar
+from datetime import date, datetime
+from typing import Dict, Iterable, List
+# Librearias de 3ros
+import numpy as np
+# Librerias locales
+from helpers.artifacts import load_joblib
+from helpers.compiled_model import load_prediction_model
+from helpers.encoding import load_onehot_encoder
+from helpers.features import FEATURE_COLUMNS, OHE_COLUMNS
+from helpers.lookup import load_lookup_table, reference_table_path
+from helpers.preprocessing import COLS_TO_SCALE
+from helpers.schema import DATE_FORMATS
+from helpers.utils import haversine_distance
+
+# Campos que debe traer cada transacción a puntuar
+REQUIRED_FIELDS = [
+    'trans_date_trans_time', 'merchant', 'category', 'amt', 'gender', 'city', 'state', 'zip',
+    'lat', 'long', 'city_pop', 'job', 'dob', 'merch_lat', 'merch_long'
+]
+
+
+class TransactionScorer:
+    """
+    Puntuación de transacciones individuales con el modelo, el escalador, el codificador y las tablas de
+    referencia residentes en memoria.
+
+    Calcula para un solo registro las mismas características que `build_feature_matrix` (en el mismo orden y con
+    la misma aritmética float32), usando diccionarios y operaciones escalares en lugar de DataFrames.
+    """
+
+    def __init__(
+        self,
+        model_path: str = 'streamlit_app/models/catboost_bestmodel.cbm',
+        scaler_path: str = 'streamlit_app/models/scaler.pkl',
+        ohe_path: str = 'streamlit_app/models/onehotencoder.pkl',
+        group_merch_path: str = None,
+        group_city_path: str = None,
+        group_state_path: str = None,
+        job_freq_path: str = None,
+        threshold: float = 0.5
+    ):
+        self.model = load_prediction_model(model_path)
+        self.threshold = threshold
+        col_index = {col_name: j for j, col_name in enumerate(FEATURE_COLUMNS)}
+
+        # Tablas de referencia como diccionarios {clave: valores en el orden de las características}; por defecto, las
+        # instantáneas de la store de agregados o los CSV originales (se leen una vez, al crear el scorer)
+        group_merch_path = group_merch_path or reference_table_path('group_fraud_by_merch.csv')
+        group_city_path = group_city_path or reference_table_path('group_fraud_by_city.csv')
+        group_state_path = group_state_path or reference_table_path('group_fraud_by_state.csv')
+        job_freq_path = job_freq_path or reference_table_path('job_freq.csv')
+        self.lookups = []
+        for path, key_col_name, value_col_names, feature_names in [
+            (group_merch_path, 'merchant', ['fraud_merch_pct', 'fraud_merch_rank'], ['fraud_merch_pct', 'fraud_merch_rank']),
+            (group_city_path, 'city', ['fraud_city_pct', 'fraud_city_rank'], ['fraud_city_pct', 'fraud_city_rank']),
+            (group_state_path, 'state', ['fraud_state_pct', 'fraud_state_rank'], ['fraud_state_pct', 'fraud_state_rank']),
+            (job_freq_path, 'job', ['proportion'], ['job_encoded']),
+        ]:
+            table = load_lookup_table(path, key_col_name, value_col_names)
+            rows = np.column_stack([table.values[name][:-1] for name in value_col_names]).tolist()
+            positions = [col_index[name] for name in feature_names]
+            self.lookups.append((key_col_name, positions, dict(zip(table.keys, rows)), [np.nan] * len(positions)))
+
+        # One Hot Encoding como diccionarios {categoría: columna de la matriz} (las descartadas no se incluyen)
+        encoder = load_onehot_encoder(ohe_path)
+        if encoder.feature_names_out != OHE_COLUMNS:
+            raise ValueError("Las columnas del codificador One Hot no coinciden con las columnas del modelo.")
+        ohe_start = col_index[OHE_COLUMNS[0]]
+        self.ohe = [
+            (col_name, {
+                category: ohe_start + int(position)
+                for category, position in zip(categories, output_columns) if position >= 0
+            })
+            for col_name, categories, output_columns in zip(encoder.feature_names_in, encoder.categories, encoder.output_columns)
+        ]
+
+        # Media y desviación del escalador en float32, como en la ruta por lotes
+        scaler = load_joblib(scaler_path)
+        if list(getattr(scaler, 'feature_names_in_', COLS_TO_SCALE)) != COLS_TO_SCALE:
+            raise ValueError("Las columnas del escalador no coinciden con las columnas numéricas del modelo.")
+        n_scaled = len(COLS_TO_SCALE)
+        self.mean = scaler.mean_.astype(np.float32) if scaler.with_mean else np.zeros(n_scaled, dtype=np.float32)
+        self.scale = scaler.scale_.astype(np.float32) if scaler.with_std else np.ones(n_scaled, dtype=np.float32)
+
+        self.col_index = col_index
+
+    def features(self, record: Dict) -> np.ndarray:
+        """
+        Calcula el vector de características escalado de una transacción.
+
+        Parámetros:
+        - record: Diccionario con los campos de `REQUIRED_FIELDS` (mismos nombres que las columnas del CSV).
+
+        Retorna:
+        - Arreglo float32 de longitud len(FEATURE_COLUMNS).
+
+        Excepciones:
+        - KeyError: Si falta algún campo requerido.
+        - ValueError: Si un valor no tiene el tipo o el formato esperado.
+        """
+        values = [0.0] * len(FEATURE_COLUMNS)
+        col_index = self.col_index
+
+        # Columnas numéricas que pasan directo
+        values[col_index['amt']] = float(record['amt'])
+        values[col_index['zip']] = float(record['zip'])
+        values[col_index['city_pop']] = float(record['city_pop'])
+
+        # Porcentaje y ranking de fraude por vendedor, ciudad y estado, y codificación de la profesión
+        for key_col_name, positions, table, missing in self.lookups:
+            for position, value in zip(positions, table.get(record[key_col_name], missing)):
+                values[position] = value
+
+        # Día, mes, año, hora y día de la semana de la transacción
+        trans_date = _parse_datetime(record['trans_date_trans_time'], DATE_FORMATS['trans_date_trans_time'])
+        values[col_index['trans_day']] = trans_date.day
+        values[col_index['trans_month']] = trans_date.month
+        values[col_index['trans_year']] = trans_date.year
+        values[col_index['trans_hour']] = trans_date.hour
+        values[col_index['trans_weekday']] = trans_date.weekday()
+
+        # Edad en años completos
+        dob = _parse_datetime(record['dob'], DATE_FORMATS['dob'])
+        values[col_index['age']] = int((date.today() - dob.date()).days / 365.25)
+
+        # Distancia entre el vendedor y el comprador
+        values[col_index['distance_to_merch']] = haversine_distance(
+            float(record['lat']), float(record['long']), float(record['merch_lat']), float(record['merch_long'])
+        )
+
+        # One Hot Encoding (las categorías desconocidas quedan en 0)
+        for col_name, positions in self.ohe:
+            position = positions.get(record[col_name])
+            if position is not None:
+                values[position] = 1.0
+
+        # Escalar las columnas numéricas en float32: (x - media) / desviación
+        features = np.array(values, dtype=np.float32)
+        n_scaled = len(self.mean)
+        features[:n_scaled] -= self.mean
+        features[:n_scaled] /= self.scale
+
+        return features
+
+    def score(self, record: Dict) -> float:
+        """
+        Retorna la probabilidad de fraude de una transacción.
+
+        Parámetros:
+        - record: Diccionario con los campos de la transacción.
+
+        Retorna:
+        - Probabilidad de fraude entre 0 y 1.
+        """
+        features = self.features(record)
+
+        return float(self.model.predict_proba(features.reshape(1, -1), thread_count=1)[0, 1])
+
+    def score_many(self, records: Iterable[Dict]) -> List[float]:
+        """
+        Retorna la probabilidad de fraude de varias transacciones con una sola llamada al modelo.
+
+        Parámetros:
+        - records: Transacciones a puntuar.
+
+        Retorna:
+        - Lista con la probabilidad de fraude de cada transacción.
+        """
+        features = np.vstack([self.features(record) for record in records])
+
+        return self.model.predict_proba(features, thread_count=1)[:, 1].tolist()
+
+
+def _parse_datetime(value, date_format: str) -> datetime:
+    """
+    Convierte un valor de fecha (texto con el formato fijo, datetime o date) en datetime.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+
+    return datetime.strptime(value, date_format)
@@ -1,20 +1,68 @@
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+import io
 import os
+import threading
+import time
+from psycopg2 import sql
+import psycopg2.errors
 from sqlalchemy import create_engine, inspect, text
 import pandas as pd
 import streamlit as st
 
-def db_conn() -> object:
+# Tablas que deben cargarse antes de cada tabla relacional
+TABLE_DEPENDENCIES = {
+    'users': [],
+    'merchants': [],
+    'locations': [],
+    'predictions': [],
+    'transactions': ['users', 'merchants', 'predictions'],
+}
+
+# Columnas que identifican una fila de cada tabla al omitir las filas que ya existen (append_new_data_to_db).
+# Vendedores y ubicaciones no tienen un identificador propio: se comparan todas sus columnas, como en drop_duplicates
+TABLE_KEYS = {
+    'users': ['cc_num'],
+    'merchants': ['merchant', 'merch_lat', 'merch_long'],
+    'locations': ['city', 'state', 'city_pop'],
+    'predictions': ['trans_num'],
+    'transactions': ['trans_num'],
+}
+
+# Tiempo máximo (ms) de las consultas interactivas de la interfaz (ver interactive_connection). Las cargas masivas
+# no tienen límite, salvo que se configure DB_STATEMENT_TIMEOUT_MS para todas las conexiones
+INTERACTIVE_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_INTERACTIVE_STATEMENT_TIMEOUT_MS', 30000))
+
+# Engines compartidos por todo el proceso (ver get_engine)
+_engines = {}
+_engines_lock = threading.Lock()
+
+def db_conn(
+    pool_size: int = None,
+    max_overflow: int = None,
+    pool_pre_ping: bool = True,
+    pool_recycle: int = None,
+    statement_timeout_ms: int = None
+) -> object:
     """
     Crea y retorna una conexión a una base de datos PostgreSQL utilizando las credenciales almacenadas en las variables de entorno.
 
+    Parámetros:
+    - pool_size: Conexiones que el pool mantiene abiertas. Por defecto la variable DB_POOL_SIZE o 5.
+    - max_overflow: Conexiones adicionales permitidas sobre pool_size. Por defecto la variable DB_MAX_OVERFLOW o 10.
+    - pool_pre_ping: Si se verifica cada conexión antes de usarla, para descartar conexiones cerradas por el servidor.
+    - pool_recycle: Segundos tras los cuales una conexión se recicla. Por defecto la variable DB_POOL_RECYCLE o 1800.
+    - statement_timeout_ms: Tiempo máximo de cada sentencia en milisegundos (0 lo desactiva). Por defecto la variable DB_STATEMENT_TIMEOUT_MS o 0,
+      para no cancelar las cargas masivas; las consultas interactivas usan `interactive_connection`.
+
     Retorna:
     - engine: Un objeto de SQLAlchemy Engine que representa la conexión a la base de datos.
 
     Comportamiento:
     1. Obtiene las variables de entorno necesarias para la conexión a la base de datos.
     2. Construye una URL de conexión usando estas variables.
-    3. Crea y retorna un objeto de SQLAlchemy Engine para conectar con la base de datos PostgreSQL.
+    3. Crea y retorna un objeto de SQLAlchemy Engine con la configuración del pool de conexiones.
     """
     # Obtener las variables de entorno
     db_user = os.getenv('DB_USER')
@@ -32,118 +80,443 @@ def db_conn() -> object:
         f'postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}'
     )
 
+    # Configuración del pool: parámetros explícitos o variables de entorno
+    if pool_size is None:
+        pool_size = int(os.getenv('DB_POOL_SIZE', 5))
+    if max_overflow is None:
+        max_overflow = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    if pool_recycle is None:
+        pool_recycle = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    if statement_timeout_ms is None:
+        statement_timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+
     # Crear y retornar el engine de SQLAlchemy
-    engine = create_engine(connection_url)
+    engine = create_engine(
+        connection_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+        pool_recycle=pool_recycle,
+        connect_args={'options': f'-c statement_timeout={statement_timeout_ms}'}
+    )
 
     return engine
 
+def get_engine(**pool_options) -> object:
+    """
+    Retorna el engine compartido por todo el proceso, creándolo con `db_conn` la primera vez.
+
+    Todas las sesiones de Streamlit toman conexiones del mismo pool, en lugar de abrir un pool por usuario.
+
+    Parámetros:
+    - pool_options: Parámetros de `db_conn` (pool_size, max_overflow, pool_pre_ping, pool_recycle, statement_timeout_ms).
+      Cada combinación distinta crea su propio engine.
+
+    Retorna:
+    - engine: El objeto de SQLAlchemy Engine compartido.
+    """
+    key = tuple(sorted(pool_options.items()))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = db_conn(**pool_options)
+            _engines[key] = engine
+
+        return engine
+
+@contextmanager
+def interactive_connection(engine=None, timeout_ms: int = None):
+    """
+    Abre una conexión dentro de una transacción con un tiempo máximo por sentencia, para las consultas que espera la interfaz.
+
+    El límite se fija con SET LOCAL (set_config(..., true)), por lo que termina con la transacción y no afecta a las
+    demás conexiones del pool, como las de las cargas masivas.
+
+    Args:
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+        timeout_ms (int, optional): Tiempo máximo de cada sentencia en milisegundos. Default es INTERACTIVE_STATEMENT_TIMEOUT_MS.
+
+    Yields:
+        La conexión de SQLAlchemy.
+    """
+    if engine is None:
+        engine = get_engine()
+    if timeout_ms is None:
+        timeout_ms = INTERACTIVE_STATEMENT_TIMEOUT_MS
+
+    with engine.begin() as connection:
+        connection.execute(text("SELECT set_config('statement_timeout', :timeout, true)"), {'timeout': str(int(timeout_ms))})
+        yield connection
+
+def _sql_column_type(dtype) -> str:
+    """
+    Tipo de PostgreSQL de una columna nueva, el mismo que usa `DataFrame.to_sql` para cada tipo de pandas.
+    """
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE PRECISION'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'TIMESTAMP WITHOUT TIME ZONE'
+
+    return 'TEXT'
+
+def ensure_table(data: pd.DataFrame, table_name: str, engine) -> List[str]:
+    """
+    Crea la tabla con el esquema del DataFrame si no existe o, si existe, le añade las columnas que le faltan.
+
+    Las tablas creadas por versiones anteriores de la aplicación pueden no tener columnas que ahora se cargan (por
+    ejemplo, 'trans_num' en 'predictions'); se añaden con `ALTER TABLE ... ADD COLUMN` y las filas anteriores quedan
+    con NULL en ellas.
+
+    Args:
+        data (pd.DataFrame): DataFrame con las columnas que se van a cargar.
+        table_name (str): Nombre de la tabla.
+        engine: Conexión al motor de la base de datos.
+
+    Returns:
+        List[str]: Columnas añadidas a una tabla existente.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        data.head(0).to_sql(table_name, engine, index=False)
+        return []
+
+    existing_columns = {column['name'] for column in inspector.get_columns(table_name)}
+    missing_columns = [col_name for col_name in data.columns if col_name not in existing_columns]
+    if missing_columns:
+        connection = engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                for col_name in missing_columns:
+                    cursor.execute(sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS {} {}").format(
+                        sql.Identifier(table_name), sql.Identifier(col_name), sql.SQL(_sql_column_type(data[col_name].dtype))
+                    ))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    return missing_columns
+
+def copy_dataframe(
+    data: pd.DataFrame,
+    table_name: str,
+    cursor,
+    columns: List[str] = None,
+    batch_size: int = None
+) -> int:
+    """
+    Carga un DataFrame en una tabla de PostgreSQL con el comando COPY, a través de un buffer CSV en memoria.
+
+    Args:
+        data (pd.DataFrame): DataFrame con los datos a cargar.
+        table_name (str): Nombre de la tabla de destino (debe existir).
+        cursor: Cursor de psycopg2 abierto sobre la conexión de destino.
+        columns (List[str], optional): Columnas a cargar. Default son todas las columnas del DataFrame.
+        batch_size (int, optional): Filas por cada COPY, para limitar el tamaño del buffer. Default carga todo de una vez.
+
+    Returns:
+        int: Número de filas cargadas.
+    """
+    columns = list(data.columns) if columns is None else list(columns)
+    batch_size = batch_size or max(len(data), 1)
+
+    copy_sql = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+        sql.Identifier(table_name),
+        sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+
+    # Serializar y enviar cada lote; los valores nulos se escriben como campos vacíos (NULL en COPY CSV).
+    # Primero se toman las filas del lote y luego las columnas, para copiar solo el lote y no todo el DataFrame
+    for start in range(0, len(data), batch_size):
+        buffer = io.StringIO()
+        data.iloc[start:start + batch_size][columns].to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor.copy_expert(copy_sql, buffer)
+
+    return len(data)
+
 def append_new_data_to_db(
     keys: List[str], 
     table_name: str, 
     data: pd.DataFrame, 
-    engine, 
+    engine=None, 
     index: bool = False, 
-    batch_percentage: float = 0.1  # Procesar en lotes de 10% del total por defecto
-) -> None:
+    batch_percentage: float = 0.1  # Enviar el COPY en lotes de 10% del total por defecto
+) -> dict:
     """
-    Agrega nuevos datos a la base de datos en lotes si no existen, basado en un porcentaje del tamaño de los datos.
+    Agrega a la base de datos solo las filas cuyas claves todavía no existen (upsert masivo sin actualización).
+
+    Las filas se cargan con COPY en una tabla temporal de staging y se insertan en la tabla de destino con un único
+    `INSERT ... ON CONFLICT DO NOTHING` sobre un índice único de las claves (se crea la primera vez), de modo que la
+    base de datos resuelve los duplicados, también entre cargas concurrentes, en lugar de comparar cada lote contra
+    toda la tabla desde Python. Si una clave se repite dentro de `data`, se inserta su primera aparición. Las filas
+    con alguna clave nula no coinciden con ninguna otra en el índice y siempre se insertan.
+
+    Si la tabla ya tiene claves repetidas (por ejemplo, de cargas anteriores con `copy_table`), el índice no se
+    puede crear: las filas se insertan con `WHERE NOT EXISTS` mientras la tabla está bloqueada para otras escrituras,
+    y las filas repetidas con claves nulas se insertan una sola vez.
 
     Args:
         keys (List[str]): Lista de nombres de columnas que se utilizan como claves primarias para la identificación de duplicados.
         table_name (str): Nombre de la tabla en la base de datos.
         data (pd.DataFrame): DataFrame que contiene los datos a agregar.
-        engine: Conexión al motor de la base de datos.
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
         index (bool, optional): Si se debe escribir el índice. Default es False.
-        batch_percentage (float, optional): Porcentaje de filas a procesar en cada lote. Default es 0.1 (10%).
+        batch_percentage (float, optional): Porcentaje de filas enviadas en cada COPY. Default es 0.1 (10%).
+
+    Returns:
+        dict: Número de filas insertadas ('inserted') y omitidas por estar duplicadas ('skipped').
     """
     # Verificar que el porcentaje es válido
     if not 0 < batch_percentage <= 1:
         raise ValueError("El porcentaje debe estar entre 0 y 1.")
 
-    # Inspeccionar si la tabla existe
-    inspector = inspect(engine)
+    if data.empty:
+        st.warning("No hay datos para insertar.")
+        return {'inserted': 0, 'skipped': 0}
+
+    if engine is None:
+        engine = get_engine()
+
+    if index:
+        data = data.reset_index()
+
+    # Si la tabla no existe, crearla vacía con el esquema del DataFrame; si le faltan columnas, añadirlas
+    if not inspect(engine).has_table(table_name):
+        st.info("Creando nueva tabla en la base de datos e insertando datos.")
+    added_columns = ensure_table(data, table_name, engine)
+    if added_columns:
+        st.info(f"Se añadieron las columnas {added_columns} a la tabla {table_name}.")
 
     # Calcular el tamaño del lote basado en el porcentaje
-    batch_size = int(len(data) * batch_percentage)
+    batch_size = max(int(len(data) * batch_percentage), 1)
+    columns = list(data.columns)
+    staging_table = f"{table_name}_staging"
 
-    if batch_size == 0:
-        st.warning("El tamaño del lote es 0. Aumenta el porcentaje o el tamaño de los datos.")
-        return
+    sql_names = {
+        'table': sql.Identifier(table_name),
+        'staging': sql.Identifier(staging_table),
+        'index': sql.Identifier(f"{table_name}_keys_uidx"),
+        'cols': sql.SQL(", ").join(map(sql.Identifier, columns)),
+        'keys': sql.SQL(", ").join(map(sql.Identifier, keys)),
+    }
+    # ctid sigue el orden en que el COPY escribió las filas en la tabla temporal, es decir, el orden de `data`:
+    # ON CONFLICT DO NOTHING omite las filas cuya clave ya existe o ya se insertó antes en la misma sentencia
+    insert_sql = sql.SQL(
+        "INSERT INTO {table} ({cols}) "
+        "SELECT {cols} FROM {staging} s ORDER BY s.ctid "
+        "ON CONFLICT ({keys}) DO NOTHING"
+    ).format(**sql_names)
+    # Sin índice único: DISTINCT ON conserva la primera fila de cada clave según el ORDER BY
+    insert_not_exists_sql = sql.SQL(
+        "INSERT INTO {table} ({cols}) "
+        "SELECT DISTINCT ON ({keys}) {cols} FROM {staging} s "
+        "WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {key_match}) "
+        "ORDER BY {keys}, s.ctid"
+    ).format(
+        key_match=sql.SQL(" AND ").join(sql.SQL("t.{key} = s.{key}").format(key=sql.Identifier(key)) for key in keys),
+        **sql_names
+    )
 
-    # Verificar si la tabla existe
-    if inspector.has_table(table_name):
-        query = f'SELECT {", ".join(keys)} FROM {table_name}'
+    st.info("Cargando los datos en la tabla de staging...")
 
-        st.info("Iniciando procesamiento en lotes...")
+    # Todo ocurre en una sola transacción; la tabla temporal se elimina al confirmar
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql.SQL("CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP").format(
+                sql.Identifier(staging_table), sql.Identifier(table_name)
+            ))
+            copy_dataframe(data, staging_table, cursor, columns, batch_size)
 
-        # Procesar lotes del DataFrame y compararlos con lotes desde la base de datos
-        for start in range(0, len(data), batch_size):
-            batch = data.iloc[start:start + batch_size]  # Obtener lote actual de la DataFrame
+            # Índice único de las claves; falla si la tabla ya tiene claves repetidas
+            cursor.execute("SAVEPOINT unique_keys")
+            try:
+                cursor.execute(sql.SQL("CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table} ({keys})").format(**sql_names))
+                cursor.execute("RELEASE SAVEPOINT unique_keys")
+                has_unique_index = True
+            except psycopg2.errors.UniqueViolation:
+                cursor.execute("ROLLBACK TO SAVEPOINT unique_keys")
+                has_unique_index = False
 
-            # Inicializar un DataFrame vacío para almacenar los nuevos usuarios de este lote
-            new_users_batch = pd.DataFrame()
+            if has_unique_index:
+                cursor.execute(insert_sql)
+            else:
+                st.warning(f"La tabla {table_name} tiene claves repetidas; se bloquea para otras escrituras durante la inserción.")
+                # SHARE ROW EXCLUSIVE bloquea a otras cargas (y a sí mismo) hasta confirmar, sin bloquear las lecturas
+                cursor.execute(sql.SQL("LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE").format(**sql_names))
+                cursor.execute(insert_not_exists_sql)
+            inserted = cursor.rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
 
-            # Leer y procesar lotes de la base de datos para comparar con los datos actuales
-            for chunk in pd.read_sql(query, engine, chunksize=batch_size):
-                # Convertir las claves existentes en el lote de la base de datos en un set de tuplas
-                existing_keys = set(chunk.apply(lambda row: tuple(row), axis=1))
+    result = {'inserted': inserted, 'skipped': len(data) - inserted}
+    st.success(f"Se insertaron {result['inserted']} filas nuevas y se omitieron {result['skipped']} duplicadas.")
 
-                # Filtrar los datos del lote actual que no estén en las claves existentes
-                mask = batch[keys].apply(lambda row: tuple(row) not in existing_keys, axis=1)
-                batch_new_data = batch[mask]
+    return result
 
-                # Acumular los nuevos datos de este lote
-                if not batch_new_data.empty:
-                    new_users_batch = pd.concat([new_users_batch, batch_new_data])
+def copy_table(data: pd.DataFrame, table_name: str, engine=None, batch_size: int = 100_000) -> dict:
+    """
+    Carga un DataFrame completo en una tabla con COPY, dentro de una única transacción.
 
-                # Liberar memoria del chunk
-                del chunk
+    Args:
+        data (pd.DataFrame): DataFrame con los datos a cargar.
+        table_name (str): Nombre de la tabla de destino. Si no existe, se crea con el esquema del DataFrame.
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+        batch_size (int, optional): Filas por cada COPY. Default es 100000.
+
+    Returns:
+        dict: Tabla, filas cargadas, segundos y filas por segundo.
+    """
+    start = time.perf_counter()
 
-            # Si hay nuevos datos en este lote, insertarlos en la base de datos
-            if not new_users_batch.empty:
-                st.info(f"Insertando nuevos datos del lote {start // batch_size + 1}...")
-                new_users_batch.to_sql(table_name, engine, if_exists='append', index=index)
+    if engine is None:
+        engine = get_engine()
 
-            # Liberar memoria del lote procesado
-            del new_users_batch
+    # Si la tabla no existe, crearla vacía con el esquema del DataFrame; si le faltan columnas, añadirlas
+    ensure_table(data, table_name, engine)
 
-        st.success("Todos los datos nuevos han sido insertados correctamente.")
-    else:
-        # Si la tabla no existe, crearla
-        st.info("Creando nueva tabla en la base de datos e insertando datos.")
-        data.to_sql(table_name, engine, index=index, chunksize=batch_size)
-        st.success("Datos insertados correctamente.")
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            rows = copy_dataframe(data, table_name, cursor, batch_size=batch_size)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    seconds = time.perf_counter() - start
 
-def check_users_in_db(df: pd.DataFrame, user_column: str, table_name: str, engine) -> pd.DataFrame:
+    return {'table': table_name, 'rows': rows, 'seconds': seconds, 'rows_per_sec': rows / seconds if seconds else None}
+
+def bulk_load_tables(
+    tables: Dict[str, pd.DataFrame],
+    engine=None,
+    dependencies: Dict[str, List[str]] = TABLE_DEPENDENCIES,
+    max_workers: int = None,
+    on_table_loaded: Callable[[dict], None] = None
+) -> pd.DataFrame:
+    """
+    Carga varias tablas con COPY en paralelo, respetando el orden de dependencias entre ellas.
+
+    Cada tabla se carga en su propia conexión y transacción. Una tabla se empieza a cargar en cuanto terminan
+    las tablas de las que depende; las tablas independientes se cargan al mismo tiempo.
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): Diccionario {nombre de la tabla: DataFrame}.
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+        dependencies (Dict[str, List[str]], optional): Tablas que deben cargarse antes de cada tabla. Las dependencias que no están en `tables` se ignoran.
+        max_workers (int, optional): Número máximo de tablas cargadas a la vez. Default es el número de tablas.
+        on_table_loaded (Callable, optional): Función que recibe las estadísticas de cada tabla al terminar su carga.
+
+    Returns:
+        pd.DataFrame: Filas, segundos y filas por segundo de cada tabla.
+    """
+    if engine is None:
+        engine = get_engine()
+
+    pending = {
+        table_name: {dep for dep in dependencies.get(table_name, []) if dep in tables and dep != table_name}
+        for table_name in tables
+    }
+    loaded = []
+    stats = []
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(tables), 1)) as executor:
+        running = {}
+        while pending or running:
+            # Lanzar las tablas cuyas dependencias ya fueron cargadas
+            for table_name in [name for name, deps in pending.items() if deps.issubset(loaded)]:
+                running[executor.submit(copy_table, tables[table_name], table_name, engine)] = table_name
+                del pending[table_name]
+
+            if not running:
+                raise ValueError(f"Dependencias circulares entre las tablas: {sorted(pending)}")
+
+            # Esperar a que termine alguna carga; si falla, las tablas que dependen de ella no se cargan
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                table_name = running.pop(future)
+                table_stats = future.result()
+                loaded.append(table_name)
+                stats.append(table_stats)
+                if on_table_loaded is not None:
+                    on_table_loaded(table_stats)
+
+    return pd.DataFrame(stats).set_index('table')
+
+def new_rows(data: pd.DataFrame, key_column: str, table_name: str, engine=None) -> pd.DataFrame:
+    """
+    Retorna las filas cuya clave todavía no está en la tabla, con una sola fila por clave (su primera aparición).
+
+    Se llama antes de una carga para saber qué filas agrega realmente: las que ya existen, las que se repiten en el
+    archivo o las que omite `append_new_data_to_db` no deben volver a sumarse a los conteos acumulados.
+
+    Args:
+        data (pd.DataFrame): DataFrame con las filas a cargar.
+        key_column (str): Columna que identifica cada fila (por ejemplo, 'trans_num').
+        table_name (str): Nombre de la tabla en la base de datos. Si no existe, todas las claves son nuevas.
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
+
+    Returns:
+        pd.DataFrame: Filas de `data` con claves nuevas, en su orden original.
+    """
+    if engine is None:
+        engine = get_engine()
+
+    data = data.drop_duplicates(subset=key_column)
+    if data.empty or not inspect(engine).has_table(table_name):
+        return data
+
+    # Una sola consulta basada en conjuntos, como check_users_in_db, sin el límite de las consultas interactivas
+    query = text(f"SELECT DISTINCT {key_column} FROM {table_name} WHERE {key_column} = ANY(:ids)")
+    with engine.connect() as connection:
+        existing_keys = connection.execute(query, {'ids': data[key_column].dropna().tolist()}).scalars().all()
+
+    return data[~data[key_column].isin(existing_keys)]
+
+def check_users_in_db(df: pd.DataFrame, user_column: str, table_name: str, engine=None) -> pd.DataFrame:
     """
     Verifica si los usuarios en el DataFrame están en la base de datos.
 
     Args:
         df (pd.DataFrame): DataFrame que contiene los usuarios a verificar.
         user_column (str): Nombre de la columna en el DataFrame que contiene los identificadores de usuario.
-        engine: Conexión al motor de la base de datos.
+        table_name (str): Nombre de la tabla de usuarios en la base de datos.
+        engine (optional): Conexión al motor de la base de datos. Default es el engine compartido (get_engine).
 
     Returns:
         pd.DataFrame: DataFrame con los usuarios que existen en la base de datos.
     """
-    user_ids = df[user_column].tolist()
+    if engine is None:
+        engine = get_engine()
 
-    # Dividir la lista de IDs en bloques más pequeños para evitar problemas de longitud de consulta
-    chunks = [user_ids[i:i + 1000] for i in range(0, len(user_ids), 1000)]
+    # Deduplicar los IDs y convertirlos a tipos de Python para que psycopg2 los envíe como un único arreglo
+    user_ids = pd.unique(df[user_column].dropna()).tolist()
 
-    # Inicializar un DataFrame para almacenar los usuarios existentes
-    existing_users = pd.DataFrame()
+    if not user_ids:
+        return pd.DataFrame(columns=[user_column])
 
-    # Ejecutar consultas en bloques
-    with engine.connect() as connection:
-        for chunk in chunks:
-            query = text(f"""
-            SELECT {user_column}
-            FROM {table_name}
-            WHERE {user_column} IN :ids
-            """)
-            result = connection.execute(query, {"ids": tuple(chunk)})
-            existing_users_chunk = pd.DataFrame(result.fetchall(), columns=[user_column])
-            existing_users = pd.concat([existing_users, existing_users_chunk])
-
-    return existing_users
\ No newline at end of file
+    # Una sola consulta basada en conjuntos: el arreglo de IDs se compara con = ANY(...)
+    query = text(f"""
+    SELECT DISTINCT {user_column}
+    FROM {table_name}
+    WHERE {user_column} = ANY(:ids)
+    """)
+
+    with interactive_connection(engine) as connection:
+        existing_users = pd.read_sql(query, connection, params={"ids": user_ids})
+
+    return existing_users
@@ -0,0 +1,144 @@
+# Librerias estandar
+import os
+from typing import Callable, Sequence
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.features import build_feature_matrix
+from helpers.schema import MODEL_COLUMNS, read_transactions_in_chunks
+from helpers.sql_utils import copy_table
+
+
+def classification_report_from_confusion(confusion: np.ndarray, labels: Sequence[int] = (0, 1)) -> tuple:
+    """
+    Calcula la precisión global y el reporte de clasificación a partir de una matriz de confusión acumulada.
+
+    Produce la misma estructura que `classification_report(..., output_dict=True)` de scikit-learn, lo que permite
+    combinar las métricas de varios bloques sin guardar todas las etiquetas y predicciones en memoria.
+
+    Parámetros:
+    - confusion: Matriz de confusión (filas = etiqueta real, columnas = predicción).
+    - labels: Etiquetas asociadas a cada fila/columna de la matriz.
+
+    Retorna:
+    - Una tupla con la precisión global (accuracy) y un DataFrame con el reporte de clasificación.
+    """
+    confusion = np.asarray(confusion, dtype=np.float64)
+    true_positives = np.diag(confusion)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+    total = confusion.sum()
+
+    # Evitar divisiones entre cero (scikit-learn también reporta 0.0 en esos casos)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+        recall = np.where(support > 0, true_positives / support, 0.0)
+        f1_score = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    # Solo se reportan las etiquetas presentes en los datos reales o en las predicciones
+    present = (support + predicted) > 0
+
+    report = {}
+    for i, label in enumerate(labels):
+        if present[i]:
+            report[str(label)] = {
+                'precision': precision[i], 'recall': recall[i], 'f1-score': f1_score[i], 'support': support[i]
+            }
+
+    accuracy = true_positives.sum() / total if total else 0.0
+    report['accuracy'] = accuracy
+    report['macro avg'] = {
+        'precision': precision[present].mean(), 'recall': recall[present].mean(),
+        'f1-score': f1_score[present].mean(), 'support': total
+    }
+    report['weighted avg'] = {
+        'precision': np.average(precision[present], weights=support[present]) if total else 0.0,
+        'recall': np.average(recall[present], weights=support[present]) if total else 0.0,
+        'f1-score': np.average(f1_score[present], weights=support[present]) if total else 0.0,
+        'support': total
+    }
+
+    return accuracy, pd.DataFrame(report).transpose()
+
+def predict_csv_in_chunks(
+    csv_source,
+    model,
+    scaler,
+    chunksize: int = 100_000,
+    output_path: str = None,
+    engine=None,
+    table_name: str = 'predictions',
+    id_col_name: str = 'trans_num',
+    target_col_name: str = 'is_fraud',
+    labels: Sequence[int] = (0, 1),
+    on_chunk: Callable[[int], None] = None
+) -> tuple:
+    """
+    Genera predicciones de fraude leyendo un CSV por bloques de filas, para procesar archivos más grandes que la memoria.
+
+    De cada bloque se construye la matriz de características escalada (enriquecimiento, fecha/hora, edad, distancia y
+    One Hot Encoding) y se predice con CatBoost. Las predicciones se escriben de forma incremental en un CSV y/o en la
+    base de datos, y las métricas se combinan mediante una matriz de confusión acumulada.
+
+    Parámetros:
+    - csv_source: Ruta o archivo abierto con el CSV de transacciones.
+    - model: Modelo entrenado de CatBoost usado para hacer predicciones.
+    - scaler: Escalador entrenado para las columnas numéricas.
+    - chunksize: Número de filas por bloque.
+    - output_path: Ruta del CSV donde se escriben las predicciones (trans_num, is_fraud). Si es None, no se escribe.
+    - engine: Motor de SQLAlchemy donde se anexan las predicciones de cada bloque con COPY. Si es None, no se escriben en la base de datos.
+    - table_name: Nombre de la tabla de predicciones en la base de datos.
+    - id_col_name: Nombre de la columna que identifica la transacción.
+    - target_col_name: Nombre de la columna con la etiqueta real.
+    - labels: Etiquetas posibles del modelo.
+    - on_chunk: Función opcional que recibe el total de filas procesadas después de cada bloque (por ejemplo, para mostrar progreso).
+
+    Retorna:
+    - Una tupla con el total de filas procesadas, el número de fraudes detectados, la precisión del modelo y un DataFrame con el reporte de clasificación.
+    """
+    if chunksize <= 0:
+        raise ValueError("El tamaño del bloque debe ser mayor que 0.")
+
+    # Matriz de confusión acumulada entre bloques
+    confusion = np.zeros((len(labels), len(labels)), dtype=np.int64)
+    label_index = pd.Index(labels)
+    total_rows = 0
+    fraud_cnt = 0
+
+    # Si ya existe un archivo de salida previo, se reemplaza
+    if output_path is not None and os.path.exists(output_path):
+        os.remove(output_path)
+
+    # Leer solo las columnas que usa el modelo, con el esquema compacto de tipos
+    for chunk in read_transactions_in_chunks(csv_source, chunksize, columns=MODEL_COLUMNS):
+        # Construir la matriz de características escalada y predecir
+        features = build_feature_matrix(chunk, scaler)
+        target = chunk[target_col_name].to_numpy()
+        predictions = np.asarray(model.predict(features)).astype(np.int64).ravel()
+        del features
+
+        # Acumular la matriz de confusión del bloque; una etiqueta desconocida o nula (posición -1) se sumaría en la
+        # última fila o columna y alteraría las métricas
+        target_positions = label_index.get_indexer(target)
+        prediction_positions = label_index.get_indexer(predictions)
+        if (target_positions < 0).any() or (prediction_positions < 0).any():
+            unknown = pd.unique(np.concatenate([target[target_positions < 0], predictions[prediction_positions < 0]]))
+            raise ValueError(f"Etiquetas desconocidas en la columna '{target_col_name}': {list(unknown)[:10]}. Se esperaban {list(labels)}.")
+        np.add.at(confusion, (target_positions, prediction_positions), 1)
+        total_rows += len(predictions)
+        fraud_cnt += int(predictions.sum())
+
+        # Escribir las predicciones del bloque
+        predictions_df = pd.DataFrame({id_col_name: chunk[id_col_name].to_numpy(), target_col_name: predictions})
+        if output_path is not None:
+            predictions_df.to_csv(output_path, mode='a', header=not os.path.exists(output_path), index=False)
+        if engine is not None:
+            copy_table(predictions_df, table_name, engine)
+
+        if on_chunk is not None:
+            on_chunk(total_rows)
+
+    accuracy, report_df = classification_report_from_confusion(confusion, labels)
+
+    return total_rows, fraud_cnt, accuracy, report_df
@@ -0,0 +1,246 @@
+# Librerias estandar
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Iterable, Union
+# Librearias de 3ros
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+# Librerias locales
+from helpers.profiling import profiled
+from helpers.schema import CATEGORY_COLUMNS, DATE_FORMATS, TRANSACTION_DTYPES, read_transactions_in_chunks
+from helpers.utils import open_csv_from_zip
+
+# Carpeta donde se guardan los datasets ya parseados (formato Arrow IPC)
+UPLOAD_CACHE_DIR = os.getenv('UPLOAD_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'fraud_upload_cache'))
+
+# Tamaño máximo de la caché en disco; al superarlo se eliminan los datasets usados hace más tiempo (ver evict_dataset_cache)
+UPLOAD_CACHE_MAX_BYTES = int(os.getenv('UPLOAD_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+# Versión del formato de la caché, parte del nombre de cada archivo. Incluye una huella del esquema de tipos
+# (helpers.schema), de modo que un archivo escrito con otro esquema o con otra versión del formato no se reutiliza
+UPLOAD_CACHE_VERSION = '1-' + hashlib.sha256(repr((TRANSACTION_DTYPES, DATE_FORMATS)).encode()).hexdigest()[:8]
+
+# DataFrames ya convertidos, compartidos por todo el proceso (los más recientes)
+_MAX_DATASETS_IN_MEMORY = 2
+_datasets = OrderedDict()
+_datasets_lock = threading.Lock()
+
+
+def file_sha256(uploaded_file, block_size: int = 1 << 20) -> str:
+    """
+    Calcula el hash SHA-256 de un archivo subido leyéndolo por bloques, sin copiarlo completo en memoria.
+
+    Parámetros:
+    - uploaded_file: Archivo subido (objeto tipo archivo con read y seek).
+    - block_size: Tamaño de cada bloque leído en bytes.
+
+    Retorna:
+    - El hash en formato hexadecimal.
+    """
+    digest = hashlib.sha256()
+    uploaded_file.seek(0)
+    for block in iter(lambda: uploaded_file.read(block_size), b''):
+        digest.update(block)
+    uploaded_file.seek(0)
+
+    return digest.hexdigest()
+
+def dataset_cache_path(dataset_key: str, cache_dir: str = UPLOAD_CACHE_DIR) -> str:
+    """
+    Retorna la ruta del archivo Arrow en caché para un dataset, con la versión actual del formato.
+    """
+    return os.path.join(cache_dir, f"{dataset_key}.v{UPLOAD_CACHE_VERSION}.arrow")
+
+def evict_dataset_cache(cache_dir: str = UPLOAD_CACHE_DIR, max_bytes: int = UPLOAD_CACHE_MAX_BYTES, keep: str = None) -> list:
+    """
+    Elimina de la caché los archivos de otras versiones del formato y, si la caché supera `max_bytes`, los datasets
+    usados hace más tiempo (según la fecha de modificación, que `cache_uploaded_zip` actualiza en cada uso).
+
+    Un archivo que otra sesión tiene abierto con memory-map sigue siendo legible después de eliminarlo (en Linux); si
+    el sistema no permite eliminarlo, se omite.
+
+    Parámetros:
+    - cache_dir: Carpeta de la caché.
+    - max_bytes: Tamaño máximo de la caché en bytes.
+    - keep: Ruta de un archivo que nunca se elimina (el dataset que se acaba de registrar).
+
+    Retorna:
+    - Lista con las rutas eliminadas.
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+
+    current_suffix = f".v{UPLOAD_CACHE_VERSION}.arrow"
+    stale, entries = [], []
+    for entry in os.scandir(cache_dir):
+        if not entry.is_file() or not entry.name.endswith('.arrow') or entry.path == keep:
+            continue
+        if entry.name.endswith(current_suffix):
+            entries.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+        else:
+            stale.append(entry.path)
+
+    # Primero los archivos de otras versiones; después, los más antiguos hasta quedar bajo el límite
+    total_bytes = sum(size for _, size, _ in entries) + (os.path.getsize(keep) if keep and os.path.exists(keep) else 0)
+    to_remove = list(stale)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        to_remove.append(path)
+        total_bytes -= size
+
+    removed = []
+    for path in to_remove:
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            pass
+
+    return removed
+
+def write_dataset_cache(
+    chunks: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    dataset_key: str,
+    cache_dir: str = UPLOAD_CACHE_DIR
+) -> str:
+    """
+    Guarda un dataset en la caché como archivo Arrow IPC sin comprimir, para poder reabrirlo con memory-map.
+
+    Acepta un DataFrame o un iterador de bloques, que se escriben uno a uno con memoria acotada. Las columnas
+    categóricas se guardan como texto, porque sus categorías cambian entre bloques; `load_dataset` las vuelve a
+    convertir en categorías. El archivo se escribe primero con un nombre temporal y luego se renombra, de modo que
+    otra sesión nunca lea un archivo a medio escribir.
+
+    Parámetros:
+    - chunks: DataFrame o iterador de DataFrames con las mismas columnas y tipos.
+    - dataset_key: Clave del dataset (hash SHA-256 del archivo subido).
+    - cache_dir: Carpeta de la caché.
+
+    Retorna:
+    - La ruta del archivo en caché.
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = dataset_cache_path(dataset_key, cache_dir)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            writer = None
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+
+                # El esquema se fija con el primer bloque, con las columnas categóricas como texto
+                if writer is None:
+                    schema = pa.schema([
+                        pa.field(field.name, field.type.value_type) if pa.types.is_dictionary(field.type) else field
+                        for field in table.schema
+                    ])
+                    writer = pa.ipc.new_file(sink, schema)
+
+                writer.write_table(table.cast(schema))
+
+            if writer is None:
+                raise ValueError("El archivo CSV está vacío.")
+            writer.close()
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    os.replace(tmp_path, path)
+
+    return path
+
+def open_dataset_cache(dataset_key: str, cache_dir: str = UPLOAD_CACHE_DIR) -> pa.Table:
+    """
+    Abre un dataset de la caché con memory-map: los datos se leen del disco bajo demanda, sin copiarlos a memoria.
+
+    Parámetros:
+    - dataset_key: Clave del dataset.
+    - cache_dir: Carpeta de la caché.
+
+    Retorna:
+    - Tabla de Arrow respaldada por el archivo mapeado en memoria.
+    """
+    source = pa.memory_map(dataset_cache_path(dataset_key, cache_dir), 'r')
+
+    return pa.ipc.open_file(source).read_all()
+
+@profiled(rows=None)
+def cache_uploaded_zip(uploaded_file, cache_dir: str = UPLOAD_CACHE_DIR, chunksize: int = 200_000) -> str:
+    """
+    Registra un archivo .zip subido en la caché y retorna su clave. El zip solo se extrae y se parsea la primera vez;
+    las siguientes veces (reruns, otras páginas u otras sesiones con el mismo archivo) se reutiliza la caché. Después
+    de escribir un dataset nuevo se aplica `evict_dataset_cache`.
+
+    Parámetros:
+    - uploaded_file: El archivo ZIP subido, que debe contener un único CSV.
+    - cache_dir: Carpeta de la caché.
+    - chunksize: Filas por bloque al parsear el CSV por primera vez.
+
+    Retorna:
+    - La clave del dataset (hash SHA-256 del zip). La versión del formato forma parte de la ruta del archivo, no de la
+      clave, que también identifica el lote en las tablas resumen del dashboard.
+
+    Excepciones:
+    - ValueError: Si el zip no contiene exactamente un archivo CSV o el CSV no se puede parsear.
+    """
+    dataset_key = file_sha256(uploaded_file)
+    path = dataset_cache_path(dataset_key, cache_dir)
+
+    if os.path.exists(path):
+        # Marcar el dataset como usado recientemente, para que la limpieza de la caché elimine primero los demás
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    else:
+        # Leer el CSV por bloques directamente desde el zip subido, con el esquema compacto de tipos
+        with open_csv_from_zip(uploaded_file) as csv_stream:
+            write_dataset_cache(read_transactions_in_chunks(csv_stream, chunksize), dataset_key, cache_dir)
+        evict_dataset_cache(cache_dir, keep=path)
+
+    return dataset_key
+
+@profiled(rows='result')
+def load_dataset(dataset_key: str, cache_dir: str = UPLOAD_CACHE_DIR) -> pd.DataFrame:
+    """
+    Retorna el DataFrame de un dataset en caché.
+
+    La conversión desde el archivo mapeado en memoria se hace una sola vez por proceso y el resultado se comparte
+    entre reruns y sesiones, por lo que el DataFrame devuelto no debe modificarse en el lugar.
+
+    Parámetros:
+    - dataset_key: Clave del dataset.
+    - cache_dir: Carpeta de la caché.
+
+    Retorna:
+    - DataFrame con los datos del archivo subido.
+    """
+    key = (dataset_key, os.path.abspath(cache_dir))
+    with _datasets_lock:
+        if key in _datasets:
+            _datasets.move_to_end(key)
+            return _datasets[key]
+
+    # Reconstruir las columnas categóricas del esquema y convertir a pandas
+    table = open_dataset_cache(dataset_key, cache_dir)
+    for i, field in enumerate(table.schema):
+        if field.name in CATEGORY_COLUMNS and not pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, pc.dictionary_encode(table.column(i)))
+    data = table.to_pandas(split_blocks=True)
+
+    with _datasets_lock:
+        _datasets[key] = data
+        while len(_datasets) > _MAX_DATASETS_IN_MEMORY:
+            _datasets.popitem(last=False)
+
+    return data
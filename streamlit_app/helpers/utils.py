@@ -1,21 +1,28 @@
 # Librerias estandar
-from datetime import datetime
+from contextlib import contextmanager
 from math import radians, sin, cos, sqrt, atan2
-from typing import List
+from typing import IO, Iterator, List
 import os
 import zipfile
 # Librearias de 3ros
 from sklearn.metrics import accuracy_score, classification_report
-import joblib
+import numpy as np
 import pandas as pd
 import streamlit as st
+# Librerias locales
+from helpers.datetime_features import age_in_years, datetime_parts
+from helpers.eda_aggregates import PERIOD_NS, bincount_by_code, period_codes
+from helpers.encoding import load_onehot_encoder
+from helpers.lookup import load_lookup_table, reference_table_path
+from helpers.profiling import profile_stage, profiled
 
 
+@profiled()
 def calc_pct_n_rank(
     data: pd.DataFrame,
-    group_merch_path: str = 'streamlit_app/data/group_fraud_by_merch.csv',
-    group_city_path: str = 'streamlit_app/data/group_fraud_by_city.csv',
-    group_state_path: str = 'streamlit_app/data/group_fraud_by_state.csv',
+    group_merch_path: str = None,
+    group_city_path: str = None,
+    group_state_path: str = None,
     merch_col_name: str = 'merchant',
     city_col_name: str = 'city',
     state_col_name: str = 'state',
@@ -31,9 +38,9 @@ def calc_pct_n_rank(
 
     Parámetros:
     - data: DataFrame principal al que se le añadirán las columnas de porcentaje de fraude y ranking.
-    - group_merch_path: Ruta al archivo CSV que contiene los datos de fraude por vendedor.
-    - group_city_path: Ruta al archivo CSV que contiene los datos de fraude por ciudad.
-    - group_state_path: Ruta al archivo CSV que contiene los datos de fraude por estado.
+    - group_merch_path: Ruta al archivo CSV que contiene los datos de fraude por vendedor. Si es None, se usa `reference_table_path`.
+    - group_city_path: Ruta al archivo CSV que contiene los datos de fraude por ciudad. Si es None, se usa `reference_table_path`.
+    - group_state_path: Ruta al archivo CSV que contiene los datos de fraude por estado. Si es None, se usa `reference_table_path`.
     - merch_col_name: Nombre de la columna que identifica a los vendedores en los datos de fraude.
     - city_col_name: Nombre de la columna que identifica las ciudades en los datos de fraude.
     - state_col_name: Nombre de la columna que identifica los estados en los datos de fraude.
@@ -47,34 +54,32 @@ def calc_pct_n_rank(
     Retorna:
     - DataFrame con las nuevas columnas de porcentaje de fraude y ranking añadidas.
     """
-    # Cargar los datos de fraude desde los archivos CSV
-    group_fraud_by_merch = pd.read_csv(group_merch_path)
-    group_fraud_by_city = pd.read_csv(group_city_path)
-    group_fraud_by_state = pd.read_csv(group_state_path)
+    # Cargar los índices de fraude precalculados (una sola vez por proceso)
+    group_merch_path = group_merch_path or reference_table_path('group_fraud_by_merch.csv')
+    group_city_path = group_city_path or reference_table_path('group_fraud_by_city.csv')
+    group_state_path = group_state_path or reference_table_path('group_fraud_by_state.csv')
+    lookups = [
+        (load_lookup_table(group_merch_path, merch_col_name, [fraud_merch_pct_name, fraud_merch_rank_name]), merch_col_name),
+        (load_lookup_table(group_city_path, city_col_name, [fraud_city_pct_name, fraud_city_rank_name]), city_col_name),
+        (load_lookup_table(group_state_path, state_col_name, [fraud_state_pct_name, fraud_state_rank_name]), state_col_name),
+    ]
+
+    # Copia superficial: se añaden columnas sin copiar los datos ni modificar el DataFrame original
+    data = data.copy(deep=False)
 
     # Añadir columnas de porcentaje de fraude y ranking para: vendedor, ciudad y estado
-    data = data.merge(
-        group_fraud_by_merch[[merch_col_name, fraud_merch_pct_name, fraud_merch_rank_name]], 
-        on=merch_col_name, 
-        how='left'
-    )
-    data = data.merge(
-        group_fraud_by_city[[city_col_name, fraud_city_pct_name, fraud_city_rank_name]], 
-        on=city_col_name, 
-        how='left'
-    )
-    data = data.merge(
-        group_fraud_by_state[[state_col_name, fraud_state_pct_name, fraud_state_rank_name]], 
-        on=state_col_name, 
-        how='left'
-    )
+    for table, key_col_name in lookups:
+        for col_name, values in table.lookup(data[key_col_name]).items():
+            data[col_name] = values
 
     return data
 
+@profiled()
 def catboost_model(
     features_scaled: pd.DataFrame, 
     target: pd.Series, 
-    model
+    model,
+    thread_count: int = -1
 ) -> tuple:
     """
     Genera predicciones utilizando un modelo CatBoost, evalúa el rendimiento del modelo y devuelve las predicciones, la precisión y un informe detallado de la clasificación.
@@ -83,6 +88,7 @@ def catboost_model(
     - features_scaled: DataFrame que contiene las características escaladas para el modelo.
     - target: Serie que contiene las etiquetas reales (verdaderas).
     - model: Modelo entrenado de CatBoost usado para hacer predicciones.
+    - thread_count: Número de hilos que CatBoost usa para predecir. -1 usa todos los núcleos disponibles.
 
     Retorna:
     - Una tupla con las predicciones, la precisión del modelo y un DataFrame que contiene el informe de clasificación.
@@ -93,11 +99,13 @@ def catboost_model(
     3. Genera un informe detallado de clasificación, que incluye precisión, recall y F1-score para cada clase.
     """
     # Hacer predicciones
-    predictions = model.predict(features_scaled)
+    with profile_stage('prediccion', len(target)):
+        predictions = model.predict(features_scaled, thread_count=thread_count)
 
     # Evaluar el modelo
-    accuracy = accuracy_score(target, predictions)
-    report = classification_report(target, predictions, output_dict=True)
+    with profile_stage('classification_report', len(target)):
+        accuracy = accuracy_score(target, predictions)
+        report = classification_report(target, predictions, output_dict=True)
 
     # Convertir el reporte de clasificación en un DataFrame
     report_df = pd.DataFrame(report).transpose()
@@ -145,6 +153,7 @@ def config_sidebar(logo_img_path: str = './streamlit_app/assets/logo.png') -> st
 
     return codigo_acceso
 
+@profiled()
 def datetime_split(
     data: pd.DataFrame, 
     datatime_col_name: str = 'trans_date_trans_time', 
@@ -169,18 +178,20 @@ def datetime_split(
     Retorna:
     - DataFrame con nuevas columnas que contienen el día, mes, año, hora y día de la semana.
     """
-    # Transformar la columna a tipo datetime para el procesado
-    data[datatime_col_name] = pd.to_datetime(data[datatime_col_name])
+    # Parsear la fecha una sola vez (con formato fijo) y calcular sus partes como enteros pequeños
+    parts = datetime_parts(data, datatime_col_name)
 
-    # Crear nuevas columnas para día, mes, año, hora y día de la semana
-    data[day_col_name] = data[datatime_col_name].dt.day
-    data[month_col_name] = data[datatime_col_name].dt.month
-    data[year_col_name] = data[datatime_col_name].dt.year
-    data[hour_col_name] = data[datatime_col_name].dt.hour
-    data[weekday_col_name] = data[datatime_col_name].dt.weekday
+    # Crear nuevas columnas para día, mes, año, hora y día de la semana, sin modificar el DataFrame original
+    data = data.copy(deep=False)
+    data[day_col_name] = parts['day']
+    data[month_col_name] = parts['month']
+    data[year_col_name] = parts['year']
+    data[hour_col_name] = parts['hour']
+    data[weekday_col_name] = parts['weekday']
 
     return data
 
+@profiled()
 def dob_to_age(
     data: pd.DataFrame, 
     dob_col_name: str = 'dob', 
@@ -198,14 +209,12 @@ def dob_to_age(
     - DataFrame con una nueva columna que contiene las edades en años.
     """
     
-    # Transformar la columna de fechas de nacimiento a tipo datetime, ignorando valores inválidos
-    data[dob_col_name] = pd.to_datetime(data[dob_col_name], errors='coerce')
+    # Calcular la edad en años parseando la fecha de nacimiento una sola vez
+    age = age_in_years(data, dob_col_name)
 
-    # Obtener la fecha actual
-    actual_date = pd.to_datetime(datetime.now().date())
-
-    # Calcular la edad en años para los registros válidos
-    data[age_col_name] = ((actual_date - data[dob_col_name]).dt.days / 365.25).astype('int')
+    # Crear la columna de edad sin modificar el DataFrame original
+    data = data.copy(deep=False)
+    data[age_col_name] = age
 
     return data
 
@@ -249,6 +258,7 @@ def extract_zip_to_csv(uploaded_file, dest_dir: str = None) -> list:
     return extracted_files
 
 
+@profiled()
 def frauds_per_day(
     data: pd.DataFrame, 
     datatime_col_name: str = 'trans_date_trans_time',
@@ -268,17 +278,13 @@ def frauds_per_day(
     Retorna:
     - DataFrame con el total de transacciones fraudulentas por día.
     """
-    # Asegurarse de que la columna de fechas esté en formato datetime
-    data[datatime_col_name] = pd.to_datetime(data[datatime_col_name])
-
-    # Filtrar solo las transacciones que son fraudes
-    data_frauds = data[data[fraud_col_name] == 1][[datatime_col_name, fraud_col_name]].copy()
+    # Códigos enteros de día solo de los fraudes, contados con np.bincount (sin copiar ni modificar el DataFrame)
+    is_fraud = (data[fraud_col_name] == 1).to_numpy()
+    first_day, counts, _ = bincount_by_code(period_codes(data, 'D', datatime_col_name, rows=is_fraud))
 
-    # Establecer la columna de fechas como índice
-    data_frauds.set_index(datatime_col_name, inplace=True)
-
-    # Agrupar por día y contar el número de fraudes
-    frauds_per_day = data_frauds.resample('D').size().reset_index(name=total_trans_col_name)
+    # Un registro por día entre el primer y el último fraude, incluidos los días sin fraudes
+    days = ((first_day + np.arange(len(counts))) * PERIOD_NS['D']).astype('datetime64[ns]')
+    frauds_per_day = pd.DataFrame({datatime_col_name: days, total_trans_col_name: counts.astype(np.int64)})
 
     return frauds_per_day
 
@@ -287,6 +293,9 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Calcula la distancia en línea recta entre dos puntos en la superficie de la Tierra,
     utilizando la fórmula del Haversine.
 
+    Se usa para cálculos de un solo punto (por ejemplo, al calificar una transacción); para columnas completas
+    usar `haversine_distance_array`.
+
     Parámetros:
     - lat1: Latitud del primer punto en grados.
     - lon1: Longitud del primer punto en grados.
@@ -316,25 +325,70 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
 
     return distance
 
-def job_encoder(data: pd.DataFrame, job_freq_path: str = 'streamlit_app/data/job_freq.csv') -> pd.DataFrame:
+@profiled()
+def haversine_distance_array(
+    lat1: np.ndarray,
+    lon1: np.ndarray,
+    lat2: np.ndarray,
+    lon2: np.ndarray,
+    out: np.ndarray = None
+) -> np.ndarray:
+    """
+    Calcula la distancia Haversine de forma vectorizada para columnas completas de coordenadas.
+
+    Parámetros:
+    - lat1: Arreglo con las latitudes del primer punto en grados.
+    - lon1: Arreglo con las longitudes del primer punto en grados.
+    - lat2: Arreglo con las latitudes del segundo punto en grados.
+    - lon2: Arreglo con las longitudes del segundo punto en grados.
+    - out: Arreglo preasignado (por ejemplo float32) donde se escribe el resultado. Si es None, se crea uno nuevo en float64.
+
+    Retorna:
+    - Arreglo con las distancias en kilómetros.
+    """
+    # Radio de la Tierra en kilómetros
+    R = 6371.0
+
+    # Convertir grados a radianes (el cálculo se hace en float64 para conservar la precisión)
+    lat1_rad = np.radians(np.asarray(lat1, dtype=np.float64))
+    lon1_rad = np.radians(np.asarray(lon1, dtype=np.float64))
+    lat2_rad = np.radians(np.asarray(lat2, dtype=np.float64))
+    lon2_rad = np.radians(np.asarray(lon2, dtype=np.float64))
+
+    # Diferencias de coordenadas
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+
+    # Fórmula del Haversine, reutilizando los arreglos temporales en lo posible
+    a = np.sin(dlat / 2) ** 2
+    a += np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    # Distancia final en kilómetros
+    if out is None:
+        return R * c
+    np.multiply(c, R, out=out, casting='same_kind')
+
+    return out
+
+@profiled()
+def job_encoder(data: pd.DataFrame, job_freq_path: str = None) -> pd.DataFrame:
     """
     Codifica la columna de trabajos en el DataFrame original utilizando la frecuencia de profesiones de un archivo CSV.
 
     Parámetros:
     - data: DataFrame principal al que se le añadirá la columna codificada de trabajos.
-    - job_freq_path: Ruta al archivo CSV que contiene la frecuencia de las profesiones y sus proporciones.
+    - job_freq_path: Ruta al archivo CSV que contiene la frecuencia de las profesiones y sus proporciones. Si es None, se usa `reference_table_path`.
 
     Retorna:
     - DataFrame con una nueva columna 'job_encoded' basada en la proporción de cada trabajo.
     """
-    # Cargar el DataFrame con la frecuencia de las profesiones
-    job_freq = pd.read_csv(job_freq_path)
+    # Cargar el índice con la frecuencia de las profesiones (una sola vez por proceso)
+    job_freq = load_lookup_table(job_freq_path or reference_table_path('job_freq.csv'), 'job', ['proportion'])
 
-    # Unir el DataFrame de frecuencias con el DataFrame original
-    data = data.merge(job_freq, on='job', how='left')
-
-    # Renombrar la columna 'proportion' a 'job_encoded'
-    data.rename(columns={'proportion': 'job_encoded'}, inplace=True)
+    # Añadir la proporción como 'job_encoded' sin copiar los datos del DataFrame original
+    data = data.copy(deep=False)
+    data['job_encoded'] = job_freq.lookup(data['job'])['proportion']
 
     return data
 
@@ -363,6 +417,7 @@ def load_data_from_zip(key: str = '1') -> tuple:
 
     return success_file, uploaded_file
 
+@profiled()
 def ohe_data(
     data: pd.DataFrame,
     ohe_path: str = 'streamlit_app/models/onehotencoder.pkl',
@@ -379,20 +434,82 @@ def ohe_data(
     Retorna:
     - DataFrame con las columnas transformadas mediante One Hot Encoding.
     """
-    # Cargar el codificador One Hot Encoder desde el archivo
-    encoder = joblib.load(ohe_path)
-    
-    # Aplicar One Hot Encoding a las columnas especificadas
-    data_ohe = encoder.transform(data[cols_to_transform])
-
-    # Reconstruir el dataframe
-    col_names = ['category_food_dining', 'category_gas_transport',
-       'category_grocery_net', 'category_grocery_pos',
-       'category_health_fitness', 'category_home', 'category_kids_pets',
-       'category_misc_net', 'category_misc_pos', 'category_personal_care',
-       'category_shopping_net', 'category_shopping_pos', 'category_travel',
-       'gender_M']
-    data_ohe = pd.DataFrame(data_ohe, columns=col_names)
-    data_ohe = pd.concat([data, data_ohe], axis=1)
-    
-    return data_ohe
\ No newline at end of file
+    # Cargar el codificador One Hot Encoder precompilado (una sola vez por proceso)
+    encoder = load_onehot_encoder(ohe_path)
+    if list(cols_to_transform) != encoder.feature_names_in:
+        raise ValueError("Las columnas a transformar no coinciden con las columnas del codificador.")
+
+    # Escribir los indicadores uint8 directamente como nuevas columnas, sin concatenar el DataFrame completo
+    indicators = encoder.transform(data)
+    data_ohe = data.copy(deep=False)
+    for j, col_name in enumerate(encoder.feature_names_out):
+        data_ohe[col_name] = indicators[:, j]
+
+    return data_ohe
+
+@contextmanager
+def open_csv_from_zip(uploaded_file) -> Iterator[IO[bytes]]:
+    """
+    Abre el CSV contenido en un archivo ZIP subido como un flujo descomprimido, directamente desde el buffer de carga.
+
+    A diferencia de `extract_zip_to_csv`, no copia el archivo subido en memoria ni escribe el zip o el CSV en disco.
+    El archivo debe contener exactamente un CSV; esto se verifica antes de descomprimir nada. Las carpetas y los
+    metadatos que agrega macOS (__MACOSX/) no cuentan como archivos.
+
+    Parámetros:
+    - uploaded_file: El archivo ZIP subido (objeto tipo archivo con read y seek).
+
+    Retorna:
+    - Un context manager que entrega el flujo binario del CSV.
+
+    Excepciones:
+    - ValueError: Si el zip no es válido o no contiene exactamente un archivo CSV.
+    """
+    uploaded_file.seek(0)
+    try:
+        zip_ref = zipfile.ZipFile(uploaded_file)
+    except zipfile.BadZipFile as e:
+        raise ValueError("El archivo subido no es un .zip válido.") from e
+
+    with zip_ref:
+        # Verificar el contenido del zip antes de descomprimir
+        members = [
+            info for info in zip_ref.infolist()
+            if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+        ]
+        if len(members) != 1 or not members[0].filename.lower().endswith('.csv'):
+            raise ValueError("El archivo .zip no contiene un archivo CSV válido o contiene múltiples archivos.")
+
+        with zip_ref.open(members[0]) as csv_stream:
+            yield csv_stream
+
+def read_csv_chunks_from_zip(uploaded_file, chunksize: int, **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Lee el CSV de un archivo ZIP subido por bloques de filas, descomprimiéndolo al vuelo.
+
+    Parámetros:
+    - uploaded_file: El archivo ZIP subido, que debe contener un único CSV.
+    - chunksize: Número de filas por bloque.
+    - read_csv_kwargs: Argumentos adicionales para `pd.read_csv`.
+
+    Retorna:
+    - Un iterador de DataFrames, uno por bloque.
+    """
+    with open_csv_from_zip(uploaded_file) as csv_stream:
+        with pd.read_csv(csv_stream, chunksize=chunksize, **read_csv_kwargs) as reader:
+            yield from reader
+
+@profiled(rows='result')
+def read_csv_from_zip(uploaded_file, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Lee completo el CSV de un archivo ZIP subido, descomprimiéndolo al vuelo sin escribirlo en disco.
+
+    Parámetros:
+    - uploaded_file: El archivo ZIP subido, que debe contener un único CSV.
+    - read_csv_kwargs: Argumentos adicionales para `pd.read_csv`.
+
+    Retorna:
+    - DataFrame con el contenido del CSV.
+    """
+    with open_csv_from_zip(uploaded_file) as csv_stream:
+        return pd.read_csv(csv_stream, **read_csv_kwargs)
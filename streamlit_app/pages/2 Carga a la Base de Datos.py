@@ -1,6 +1,10 @@
 import streamlit as st
 
-from helpers.sql_utils import db_conn
+from helpers.aggregate_store import update_aggregate_store
+from helpers.dashboard_metrics import load_dashboard_metrics, refresh_dashboard_metrics
+from helpers.normalization import load_normalized_tables
+from helpers.sql_utils import TABLE_DEPENDENCIES, TABLE_KEYS, append_new_data_to_db, bulk_load_tables, get_engine, new_rows
+from helpers.upload_cache import load_dataset
 
 st.title("2.- Previsualización de tablas relacionales para la carga en PostgreSQL")
 
@@ -14,27 +18,32 @@ if not st.session_state.get('access_granted', False):
     st.error("Acceso restringido. Por favor, ingresa el código de acceso en la barra lateral.")
     st.stop()
 
-# Verificar si la conexión ya está almacenada en session_state
-if 'db_engine' not in st.session_state:
-    st.session_state.db_engine = db_conn()
+# Verificar que se hayan cargado los datos en la página de predicciones (el modo streaming no los guarda en memoria)
+if 'dataset_key' not in st.session_state or 'predicts' not in st.session_state:
+    st.warning("Primero carga un archivo en la página 'Crea tus predicciones' (sin el modo streaming).")
+    st.stop()
+
+# Usar el engine compartido por todas las sesiones (un único pool de conexiones por proceso)
+engine = get_engine()
 
-# Usar la conexión almacenada
-engine = st.session_state.db_engine
+# Leer el dataset desde la caché en disco (compartida con la página de predicciones)
+df = load_dataset(st.session_state.dataset_key)
 
-df = st.session_state.data
+# Normalizar las tablas relacionales una sola vez por dataset: los reruns y el botón de carga las reutilizan
+tables = load_normalized_tables(st.session_state.dataset_key, df)
 
 col_table_locations, col_table_merchants, col_table_predictions = st.columns([1, 1.25, 1])
 
 with col_table_locations: 
-    # Crear la tabla locations
-    locations = df[['city', 'state', 'city_pop']].drop_duplicates()
+    # Tabla locations
+    locations = tables['locations']
     # Mostrar las primeras 5 filas
     st.write("Tabla: Ubicaciones [primeras 5 filas]")
     st.dataframe(locations.head())
     
 with col_table_merchants:
-    # Crear la tabla merchants
-    merchants = df[['merchant', 'merch_lat', 'merch_long']].drop_duplicates()
+    # Tabla merchants
+    merchants = tables['merchants']
     # Mostrar las primeras 5 filas
     st.write("Tabla: Vendedores [primeras 5 filas]")
     st.dataframe(merchants.head())
@@ -45,36 +54,75 @@ with col_table_predictions:
     predictions_df = st.session_state.predicts
     st.dataframe(predictions_df.head())
 
-# Crear la tabla users
-users = df[['cc_num', 'zip', 'first', 'last', 'gender', 'street', 'city', 'state', 'job', 'dob']].drop_duplicates()
+# Tabla users
+users = tables['users']
 # Mostrar las primeras 5 filas
 st.write("Tabla: Usuarios [primeras 5 filas]")
 st.dataframe(users.head())
 
 
-# Crear la tabla transactions
-transactions = df[['trans_date_trans_time', 'cc_num', 'merchant', 'category', 'amt', 'lat', 'long', 'trans_num', 'unix_time', 'is_fraud']].drop_duplicates()
+# Tabla transactions
+transactions = tables['transactions']
 # Mostrar las primeras 5 filas
 st.write("Tabla: Transacciones [primeras 5 filas]")
 st.dataframe(transactions.head())                        
 
+# Omitir las filas que ya están en la base de datos (por ejemplo, al volver a cargar el mismo archivo)
+skip_existing = st.checkbox("Omitir las filas que ya existen en la base de datos (más lento)", value=False)
+
 # Botón para cargar los datos a la base de datos
 if st.button("Cargar tablas a la base de datos"):
     try:
-        users.to_sql('users', engine, if_exists='append', index=False)
-        st.success("La tabla de Usuarios ha sido cargada en la Base de datos.")
-
-        merchants.to_sql('merchants', engine, if_exists='append', index=False)
-        st.success("La tabla de Vendedores ha sido cargada en la Base de datos.")
-
-        locations.to_sql('locations', engine, if_exists='append', index=False)
-        st.success("La tabla de Ubicaciones ha sido cargada en la Base de datos.")
-
-        predictions_df.to_sql('predictions', engine, if_exists='append', index=False)
-        st.success("La tabla de Predicciones ha sido cargada en la Base de datos.")
-
-        transactions.to_sql('transactions', engine, if_exists='append', index=False)
-        st.success("La tabla de Transacciones ha sido cargada en la Base de datos.")
+        # Nombre de cada tabla para los mensajes
+        table_labels = {
+            'users': 'Usuarios',
+            'merchants': 'Vendedores',
+            'locations': 'Ubicaciones',
+            'predictions': 'Predicciones',
+            'transactions': 'Transacciones',
+        }
+        tables_to_load = {
+            'users': users,
+            'merchants': merchants,
+            'locations': locations,
+            'predictions': predictions_df.reset_index(),
+            'transactions': transactions,
+        }
+
+        # Transacciones que esta carga agrega a la base de datos: sin las que ya existen ni las repetidas en el archivo
+        new_transactions = new_rows(df, 'trans_num', 'transactions', engine)
+
+        if skip_existing:
+            # Una tabla a la vez, en el orden de dependencias: solo se insertan las filas con claves nuevas
+            load_order = sorted(tables_to_load, key=lambda table_name: len(TABLE_DEPENDENCIES[table_name]))
+            for table_name in load_order:
+                st.write(f"Tabla de {table_labels[table_name]}:")
+                append_new_data_to_db(TABLE_KEYS[table_name], table_name, tables_to_load[table_name], engine)
+        else:
+            # Cargar las tablas con COPY; las independientes se cargan en paralelo
+            load_stats = bulk_load_tables(
+                tables_to_load,
+                engine,
+                on_table_loaded=lambda stats: st.success(
+                    f"La tabla de {table_labels[stats['table']]} ha sido cargada en la Base de datos "
+                    f"({stats['rows']} filas, {stats['rows_per_sec']:.0f} filas/s)."
+                )
+            )
+
+            # Mostrar el rendimiento de la carga por tabla
+            st.dataframe(load_stats)
+
+        # Sumar las transacciones nuevas de este lote a las tablas resumen del dashboard y descartar las métricas en caché
+        if refresh_dashboard_metrics(new_transactions, engine, batch_id=st.session_state.dataset_key):
+            load_dashboard_metrics.clear()
+
+        # Incorporar las transacciones nuevas a los conteos de fraude por vendedor, ciudad, estado y profesión
+        # (la primera vez, los conteos parten de las transacciones que ya están en la base de datos)
+        aggregate_store, folded = update_aggregate_store(new_transactions, batch_id=st.session_state.dataset_key, engine=engine)
+        if folded:
+            st.success(f"Tablas de fraude actualizadas ({aggregate_store.total_transactions} transacciones acumuladas).")
+        else:
+            st.info("Este archivo ya estaba incorporado en las tablas de fraude.")
 
     except Exception as e:
         st.error(f"Error al cargar los datos: {e}")
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+Servicio HTTP para puntuar transacciones individuales en el momento de la autorización.
+
+Mantiene en memoria el modelo, el escalador, el codificador y las tablas de referencia, y responde con la
+probabilidad de fraude de cada transacción. Solo usa la librería estándar de Python (http.server).
+
+Uso (desde la raíz del repositorio):
+    python streamlit_app/scoring_server.py --port 8000
+    python streamlit_app/scoring_server.py --port 8000 --micro-batch-size 64 --micro-batch-wait-ms 2
+
+Endpoints:
+- GET /health: Estado del servicio.
+- GET /stats: Histogramas de tamaño de lote y profundidad de la cola del micro-batching (si está activo).
+- POST /score: Recibe un objeto JSON con una transacción (mismos campos que el CSV) o una lista de transacciones,
+  y responde con 'fraud_probability' e 'is_fraud' para cada una.
+"""
+# Librerias estandar
+import argparse
+import asyncio
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+# Permitir importar los helpers de la aplicación al ejecutar el script directamente
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Librerias locales
+from helpers.micro_batching import MicroBatcher
+from helpers.scoring import TransactionScorer
+
+logger = logging.getLogger(__name__)
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """
+    Atiende las peticiones del servicio de puntuación. El scorer se comparte entre todos los hilos del servidor.
+    """
+    scorer: TransactionScorer = None
+    # Micro-batcher opcional y el bucle de eventos (en un hilo aparte) donde se ejecuta
+    batcher: MicroBatcher = None
+    batcher_loop: asyncio.AbstractEventLoop = None
+    # Segundos máximos que una petición espera su lote; después se responde 503 en lugar de bloquear el hilo
+    batch_timeout_s: float = 1.0
+    protocol_version = 'HTTP/1.1'
+    # Las cabeceras y el cuerpo se escriben por separado; sin esto, Nagle + ACK retrasado suman ~40 ms por respuesta
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._send_json(200, self.batcher.stats() if self.batcher is not None else {})
+        else:
+            self._send_json(404, {'error': 'Ruta no encontrada.'})
+
+    def do_POST(self) -> None:
+        if self.path != '/score':
+            self._send_json(404, {'error': 'Ruta no encontrada.'})
+            return
+
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length))
+
+            # Una transacción o una lista de transacciones
+            if isinstance(payload, list):
+                probabilities = self.scorer.score_many(payload)
+            elif self.batcher is not None:
+                # Agrupar con las peticiones concurrentes en una sola llamada al modelo
+                features = self.scorer.features(payload)
+                future = asyncio.run_coroutine_threadsafe(self.batcher.predict(features), self.batcher_loop)
+                try:
+                    probabilities = [future.result(timeout=self.batch_timeout_s)]
+                except concurrent.futures.TimeoutError:
+                    future.cancel()
+                    self._send_json(503, {'error': "El servicio está saturado; intenta de nuevo."})
+                    return
+            else:
+                probabilities = [self.scorer.score(payload)]
+        except KeyError as e:
+            self._send_json(400, {'error': f"Falta el campo requerido {e}."})
+            return
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {'error': f"Transacción inválida: {e}"})
+            return
+        except Exception:
+            # Cualquier otro error es del servicio, no de la petición: se registra y el cliente recibe un JSON
+            logger.exception("Error al puntuar la transacción.")
+            self._send_json(500, {'error': "Error interno al puntuar la transacción."})
+            return
+
+        results = [
+            {'fraud_probability': probability, 'is_fraud': int(probability >= self.scorer.threshold)}
+            for probability in probabilities
+        ]
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        if isinstance(payload, list):
+            self._send_json(200, {'results': results, 'latency_ms': latency_ms})
+        else:
+            self._send_json(200, {**results[0], 'latency_ms': latency_ms})
+
+    def log_message(self, format: str, *args) -> None:
+        # El registro por petición en stderr añade latencia; solo se registra si se pidió con --verbose
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    """
+    Servidor con un hilo por conexión y una cola de conexiones pendientes amplia, para que las ráfagas de
+    clientes concurrentes no se rechacen (socketserver acepta solo 5 por defecto).
+    """
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def start_micro_batcher(model, max_batch_size: int, max_wait_ms: float) -> tuple:
+    """
+    Inicia un micro-batcher en un bucle de eventos propio, ejecutado en un hilo en segundo plano.
+
+    Parámetros:
+    - model: Modelo de CatBoost.
+    - max_batch_size: Filas máximas por lote.
+    - max_wait_ms: Milisegundos máximos de espera para completar un lote.
+
+    Retorna:
+    - Una tupla con el micro-batcher y su bucle de eventos.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    batcher = MicroBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    asyncio.run_coroutine_threadsafe(batcher.start(), loop).result()
+
+    return batcher, loop
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servicio HTTP de puntuación de transacciones individuales.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--model-path', default='streamlit_app/models/catboost_bestmodel.cbm')
+    parser.add_argument('--threshold', type=float, default=0.5, help="Probabilidad a partir de la cual se marca fraude.")
+    parser.add_argument('--micro-batch-size', type=int, default=0, help="Filas máximas por lote del micro-batching (0 lo desactiva).")
+    parser.add_argument('--micro-batch-wait-ms', type=float, default=2.0, help="Espera máxima para completar un lote, en milisegundos.")
+    parser.add_argument('--micro-batch-timeout-ms', type=float, default=1000.0, help="Espera máxima de una petición por su lote antes de responder 503, en milisegundos.")
+    parser.add_argument('--verbose', action='store_true', help="Registrar cada petición en la consola.")
+    args = parser.parse_args()
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    # Cargar todos los artefactos una sola vez, antes de aceptar peticiones
+    ScoringRequestHandler.scorer = TransactionScorer(model_path=args.model_path, threshold=args.threshold)
+    if args.micro_batch_size > 0:
+        ScoringRequestHandler.batcher, ScoringRequestHandler.batcher_loop = start_micro_batcher(
+            ScoringRequestHandler.scorer.model, args.micro_batch_size, args.micro_batch_wait_ms
+        )
+        ScoringRequestHandler.batch_timeout_s = args.micro_batch_timeout_ms / 1000
+
+    server = ScoringHTTPServer((args.host, args.port), ScoringRequestHandler)
+    server.verbose = args.verbose
+    print(f"Servicio de puntuación escuchando en http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
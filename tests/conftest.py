@@ -0,0 +1,94 @@
+# Librerias estandar
+import io
+import os
+import sys
+import uuid
+# Librearias de 3ros
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Los helpers se importan como en la aplicación (`from helpers...`) y el generador sintético desde benchmarks/
+sys.path.insert(0, os.path.join(ROOT_DIR, 'streamlit_app'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+from synthetic_data import generate_transactions
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """
+    Las rutas por defecto de los helpers ('streamlit_app/data/...', 'streamlit_app/models/...') son relativas a la
+    raíz del repositorio, como al ejecutar `streamlit run streamlit_app/Home.py`.
+    """
+    monkeypatch.chdir(ROOT_DIR)
+
+@pytest.fixture(autouse=True)
+def aggregate_store_dir(monkeypatch, tmp_path) -> str:
+    """
+    Carpeta vacía para las instantáneas de la store de agregados: las pruebas usan los CSV originales de
+    `streamlit_app/data` aunque exista una store local. La variable de entorno llega a los procesos del pool.
+    """
+    store_dir = str(tmp_path / 'aggregates')
+    monkeypatch.setenv('AGGREGATE_STORE_DIR', store_dir)
+    monkeypatch.setattr('helpers.lookup.AGGREGATE_STORE_DIR', store_dir)
+
+    return store_dir
+
+@pytest.fixture(scope='session')
+def transactions_csv() -> str:
+    """
+    CSV sintético con las columnas y formatos del archivo que se sube a la aplicación.
+    """
+    data = generate_transactions(3_000, seed=7, fraud_rate=0.05, data_dir=os.path.join(ROOT_DIR, 'streamlit_app', 'data'))
+    # Algunas filas con vendedores, ciudades y profesiones que no están en las tablas de referencia
+    data['merchant'] = data['merchant'].cat.add_categories(['fraud_Desconocido'])
+    data['city'] = data['city'].cat.add_categories(['Ciudad Desconocida'])
+    data['job'] = data['job'].cat.add_categories(['Profesión desconocida'])
+    data.loc[::250, 'merchant'] = 'fraud_Desconocido'
+    data.loc[::333, 'city'] = 'Ciudad Desconocida'
+    data.loc[::400, 'job'] = 'Profesión desconocida'
+
+    return data.to_csv(index=False)
+
+@pytest.fixture
+def raw_transactions(transactions_csv) -> pd.DataFrame:
+    """
+    Transacciones leídas como en la versión original de la aplicación (`pd.read_csv` sin esquema de tipos).
+    """
+    return pd.read_csv(io.StringIO(transactions_csv))
+
+@pytest.fixture(scope='session')
+def pg_engine(tmp_path_factory):
+    """
+    Engine de PostgreSQL para las pruebas de la base de datos: el de las variables DB_* si están definidas o, si no,
+    un servidor local temporal con `pgserver` (paquete opcional). Sin ninguno de los dos, las pruebas se omiten.
+    """
+    if os.getenv('DB_HOST'):
+        from helpers.sql_utils import db_conn
+        engine = db_conn()
+    else:
+        pgserver = pytest.importorskip('pgserver')
+        server = pgserver.get_server(str(tmp_path_factory.mktemp('pgdata')), cleanup_mode='delete')
+        engine = create_engine(server.get_uri().replace('postgresql://', 'postgresql+psycopg2://', 1))
+
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def pg_table_names(pg_engine):
+    """
+    Genera nombres de tabla únicos para cada prueba y elimina esas tablas al terminar.
+    """
+    names = []
+
+    def new_name(prefix: str = 'test') -> str:
+        names.append(f"{prefix}_{uuid.uuid4().hex[:12]}")
+        return names[-1]
+
+    yield new_name
+    with pg_engine.begin() as connection:
+        for name in names:
+            connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
@@ -0,0 +1,65 @@
+# Librerias estandar
+import os
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+# Librerias locales
+from helpers.aggregate_store import AggregateStore, FRAUD_DIMENSIONS, update_aggregate_store
+from helpers.features import FEATURE_COLUMNS, build_feature_matrix
+from helpers.lookup import reference_table_path
+from helpers.normalization import normalize_tables
+from helpers.schema import read_transactions
+from helpers.sql_utils import copy_table
+
+
+def test_from_database_matches_folding_the_loaded_transactions(pg_engine, pg_table_names, transactions_csv, tmp_path):
+    csv_path = tmp_path / 'transacciones.csv'
+    csv_path.write_text(transactions_csv)
+    data = read_transactions(str(csv_path))
+    # En la base de datos la ciudad, el estado y la profesión son atributos del usuario (una fila por tarjeta)
+    for col_name in ['city', 'state', 'job']:
+        data[col_name] = data.groupby('cc_num', observed=True)[col_name].transform('first').astype(data[col_name].dtype)
+    tables = normalize_tables(data)
+
+    transactions_table, users_table, batches_table = pg_table_names('tx'), pg_table_names('users'), pg_table_names('batches')
+    copy_table(tables['transactions'], transactions_table, pg_engine)
+    copy_table(tables['users'], users_table, pg_engine)
+    with pg_engine.begin() as connection:
+        connection.execute(text(f"CREATE TABLE {batches_table} (batch_id TEXT PRIMARY KEY, loaded_at TIMESTAMPTZ NOT NULL DEFAULT now())"))
+        connection.execute(text(f"INSERT INTO {batches_table} (batch_id) VALUES ('lote-1')"))
+
+    store = AggregateStore.from_database(pg_engine, transactions_table, users_table, batches_table)
+    expected = AggregateStore()
+    expected.fold(data, batch_id='lote-1')
+
+    # El lote registrado ya está contado en la base de datos
+    assert store.batches == ['lote-1']
+    assert store.fold(data, batch_id='lote-1') is False
+    assert store.total_transactions == expected.total_transactions
+    for key_col_name in FRAUD_DIMENSIONS:
+        pd.testing.assert_frame_equal(store.fraud_table(key_col_name), expected.fraud_table(key_col_name))
+    pd.testing.assert_frame_equal(
+        store.frequency_table('job').sort_values('job', ignore_index=True),
+        expected.frequency_table('job').sort_values('job', ignore_index=True)
+    )
+
+def test_from_database_without_transactions_is_empty(pg_engine):
+    store = AggregateStore.from_database(pg_engine, transactions_table='tabla_que_no_existe')
+
+    assert store.total_transactions == 0 and store.batches == []
+
+def test_saved_snapshots_replace_the_static_tables_in_scoring(raw_transactions, aggregate_store_dir):
+    assert reference_table_path('job_freq.csv') == os.path.join('streamlit_app', 'data', 'job_freq.csv')
+    static_features = build_feature_matrix(raw_transactions, scale=False)
+
+    store = AggregateStore()
+    store.fold(raw_transactions, batch_id='lote-1')
+    store.save(aggregate_store_dir)
+
+    assert reference_table_path('job_freq.csv') == os.path.join(aggregate_store_dir, 'job_freq.csv')
+    features = build_feature_matrix(raw_transactions, scale=False)
+    merch_pct = features[:, FEATURE_COLUMNS.index('fraud_merch_pct')]
+    expected = store.fraud_table('merchant').set_index('merchant')['fraud_merch_pct']
+    np.testing.assert_allclose(merch_pct, expected.reindex(raw_transactions['merchant']).to_numpy(), rtol=1e-6)
+    assert not np.allclose(merch_pct, static_features[:, FEATURE_COLUMNS.index('fraud_merch_pct')], equal_nan=True)
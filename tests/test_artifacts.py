@@ -0,0 +1,71 @@
+# Librerias estandar
+import os
+import threading
+import time
+# Librerias locales
+from helpers.artifacts import ArtifactRegistry
+
+
+def test_registry_loads_once_and_reloads_on_change(tmp_path):
+    path = tmp_path / 'tabla.csv'
+    path.write_text('a\n1\n')
+    registry = ArtifactRegistry()
+    calls = []
+
+    def loader(abs_path: str) -> str:
+        calls.append(abs_path)
+        return open(abs_path).read()
+
+    assert registry.get(str(path), loader) == 'a\n1\n'
+    assert registry.get(str(path), loader) == 'a\n1\n'
+    assert len(calls) == 1
+
+    path.write_text('a\n2\n')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert registry.get(str(path), loader) == 'a\n2\n'
+    assert registry.stats() == {'hits': 1, 'misses': 2, 'artifacts': 1}
+
+def test_slow_load_does_not_block_other_artifacts(tmp_path):
+    slow_path, fast_path = tmp_path / 'lento.bin', tmp_path / 'rapido.bin'
+    slow_path.write_bytes(b'lento')
+    fast_path.write_bytes(b'rapido')
+    registry = ArtifactRegistry()
+    slow_started, release_slow = threading.Event(), threading.Event()
+
+    def slow_loader(abs_path: str) -> str:
+        slow_started.set()
+        release_slow.wait(5)
+        return 'lento'
+
+    slow_thread = threading.Thread(target=registry.get, args=(str(slow_path), slow_loader))
+    slow_thread.start()
+    assert slow_started.wait(5)
+
+    start = time.perf_counter()
+    assert registry.get(str(fast_path), lambda abs_path: 'rapido') == 'rapido'
+    assert time.perf_counter() - start < 1.0
+
+    release_slow.set()
+    slow_thread.join(5)
+
+def test_concurrent_requests_load_the_same_artifact_once(tmp_path):
+    path = tmp_path / 'modelo.bin'
+    path.write_bytes(b'modelo')
+    registry = ArtifactRegistry()
+    calls = []
+
+    def loader(abs_path: str) -> object:
+        calls.append(abs_path)
+        time.sleep(0.2)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get(str(path), loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 8 and all(result is results[0] for result in results)
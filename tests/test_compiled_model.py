@@ -0,0 +1,89 @@
+# Librerias estandar
+import os
+# Librearias de 3ros
+import numpy as np
+import pytest
+from catboost import CatBoost, CatBoostClassifier, CatBoostRegressor
+# Librerias locales
+from helpers.compiled_model import export_compiled_model, load_compiled_model, load_prediction_model
+
+
+def training_data(n_rows: int = 2_000, n_features: int = 6, seed: int = 0) -> tuple:
+    """
+    Matriz float32 con NaN y una etiqueta que depende de varias características.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features)).astype(np.float32)
+    y = X[:, 0] * 2 - X[:, 1] + np.sin(X[:, 2] * 3) + rng.normal(scale=0.3, size=n_rows)
+    X[rng.random(X.shape) < 0.03] = np.nan
+
+    return X, y
+
+def save_model(model, tmp_path) -> str:
+    path = os.path.join(tmp_path, 'model.cbm')
+    model.save_model(path)
+
+    return path
+
+
+@pytest.mark.parametrize('nan_mode', ['Min', 'Max'])
+def test_compiled_classifier_matches_catboost(tmp_path, nan_mode):
+    X, y = training_data()
+    model = CatBoostClassifier(iterations=60, depth=5, nan_mode=nan_mode, verbose=False, allow_writing_files=False)
+    model.fit(X, (y > 0).astype(int))
+    compiled = load_compiled_model(export_compiled_model(save_model(model, tmp_path), os.path.join(tmp_path, 'compiled')))
+
+    X_test, _ = training_data(seed=1)
+
+    np.testing.assert_allclose(
+        compiled.predict_raw(X_test), model.predict(X_test, prediction_type='RawFormulaVal'), rtol=1e-9, atol=1e-12
+    )
+    np.testing.assert_allclose(compiled.predict_proba(X_test), model.predict_proba(X_test), rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+
+def test_compiled_regressor_matches_catboost(tmp_path):
+    X, y = training_data()
+    model = CatBoostRegressor(iterations=60, depth=4, verbose=False, allow_writing_files=False)
+    model.fit(X, y)
+    compiled = load_compiled_model(export_compiled_model(save_model(model, tmp_path), os.path.join(tmp_path, 'compiled')))
+
+    X_test, _ = training_data(seed=1)
+
+    assert not compiled.is_classifier
+    np.testing.assert_allclose(compiled.predict(X_test), model.predict(X_test), rtol=1e-9, atol=1e-12)
+
+def test_export_rejects_non_symmetric_trees(tmp_path):
+    X, y = training_data()
+    model = CatBoostRegressor(iterations=5, grow_policy='Depthwise', verbose=False, allow_writing_files=False)
+    model.fit(X, y)
+
+    with pytest.raises(ValueError):
+        export_compiled_model(save_model(model, tmp_path), os.path.join(tmp_path, 'compiled'))
+
+def test_compiled_model_checks_feature_count(tmp_path):
+    X, y = training_data()
+    model = CatBoostRegressor(iterations=5, verbose=False, allow_writing_files=False)
+    model.fit(X, y)
+    compiled = load_compiled_model(export_compiled_model(save_model(model, tmp_path), os.path.join(tmp_path, 'compiled')))
+
+    with pytest.raises(ValueError):
+        compiled.predict(X[:, :-1])
+
+@pytest.mark.parametrize('model_class', [CatBoostClassifier, CatBoostRegressor])
+def test_load_prediction_model_without_export_keeps_the_model_type(tmp_path, monkeypatch, model_class):
+    X, y = training_data()
+    model = model_class(iterations=20, depth=4, verbose=False, allow_writing_files=False)
+    model.fit(X, (y > 0).astype(int) if model_class is CatBoostClassifier else y)
+    model_path = save_model(model, tmp_path)
+
+    # Sin la carpeta 'compiled' se carga el .cbm, una sola vez, con la clase que corresponde a su función de pérdida
+    reads = []
+    load_model = CatBoost.load_model
+    monkeypatch.setattr(CatBoost, 'load_model', lambda self, *args, **kwargs: reads.append(args) or load_model(self, *args, **kwargs))
+    loaded = load_prediction_model(model_path, os.path.join(tmp_path, 'compiled'))
+
+    assert len(reads) == 1
+    assert isinstance(loaded, model_class)
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+    if model_class is CatBoostClassifier:
+        np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
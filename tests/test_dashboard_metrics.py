@@ -0,0 +1,22 @@
+# Librerias estandar
+import logging
+# Librerias locales
+from helpers import dashboard_metrics
+from helpers.dashboard_metrics import STATIC_METRICS, load_dashboard_metrics
+
+
+def test_load_dashboard_metrics_logs_and_reports_the_static_fallback(monkeypatch, caplog):
+    def unavailable_db():
+        raise ConnectionError("servidor no disponible")
+
+    monkeypatch.setattr(dashboard_metrics, 'query_dashboard_metrics', unavailable_db)
+    load_dashboard_metrics.clear()
+
+    with caplog.at_level(logging.WARNING, logger=dashboard_metrics.__name__):
+        metrics = load_dashboard_metrics()
+    load_dashboard_metrics.clear()
+
+    assert metrics['source'] == 'static'
+    assert metrics['n_transactions'] == STATIC_METRICS['n_transactions']
+    assert 'servidor no disponible' in metrics['static_reason']
+    assert any(record.exc_info for record in caplog.records)
@@ -0,0 +1,22 @@
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.datetime_features import parsed_datetime
+
+
+def test_parsed_datetime_reparses_a_replaced_column_of_the_same_length():
+    data = pd.DataFrame({'trans_date_trans_time': ['2020-01-01 10:00:00', '2020-01-02 11:00:00']})
+    first = parsed_datetime(data, 'trans_date_trans_time')
+
+    # Misma longitud y mismo DataFrame, pero otra columna: la caché no debe devolver las fechas anteriores
+    data['trans_date_trans_time'] = ['2021-05-01 08:00:00', '2021-05-02 09:00:00']
+    second = parsed_datetime(data, 'trans_date_trans_time')
+
+    assert first[0] == np.datetime64('2020-01-01T10:00:00')
+    assert second.tolist() == pd.to_datetime(data['trans_date_trans_time']).to_numpy().tolist()
+
+def test_parsed_datetime_reuses_the_parse_of_an_unchanged_column():
+    data = pd.DataFrame({'dob': ['1960-03-04', '1999-12-31']})
+
+    assert parsed_datetime(data, 'dob') is parsed_datetime(data, 'dob')
@@ -0,0 +1,41 @@
+# Librearias de 3ros
+import pandas as pd
+# Librerias locales
+from helpers.eda_aggregates import fraud_counts_per_period, query_fraud_aggregates
+
+
+def test_fraud_counts_per_period_keeps_dates_before_1970_and_skips_invalid_ones():
+    data = pd.DataFrame({
+        'dob': ['1962-05-03', '1962-05-03', '1975-01-10', 'fecha inválida'],
+        'is_fraud': [1, 0, 1, 1],
+    })
+
+    counts = fraud_counts_per_period(data, 'D', datatime_col_name='dob')
+
+    assert counts['period'].tolist() == [pd.Timestamp('1962-05-03'), pd.Timestamp('1975-01-10')]
+    assert counts['total_transactions'].tolist() == [2, 1]
+    assert counts['total_frauds'].tolist() == [1, 1]
+
+def test_query_fraud_aggregates_refreshes_after_new_rows_are_loaded(pg_engine, pg_table_names):
+    table_name = pg_table_names('transactions')
+    first_load = pd.DataFrame({
+        'trans_date_trans_time': pd.to_datetime(['2020-01-01 10:00', '2020-01-03 12:00']),
+        'category': ['food', 'travel'],
+        'is_fraud': [1, 0],
+    })
+    first_load.to_sql(table_name, pg_engine, index=False)
+
+    first = query_fraud_aggregates('dataset', pg_engine, table_name)
+    assert first['per_day']['total_transactions'].tolist() == [1, 0, 1]
+    assert query_fraud_aggregates('dataset', pg_engine, table_name) is first
+
+    # Una carga nueva (aunque sus fechas sean anteriores a la más reciente) cambia la clave de la caché
+    pd.DataFrame({
+        'trans_date_trans_time': pd.to_datetime(['2020-01-02 09:00']),
+        'category': ['food'],
+        'is_fraud': [1],
+    }).to_sql(table_name, pg_engine, index=False, if_exists='append')
+
+    refreshed = query_fraud_aggregates('dataset', pg_engine, table_name)
+    assert refreshed['per_day']['total_transactions'].tolist() == [1, 1, 1]
+    assert refreshed['by_category'].set_index('category')['total_frauds'].to_dict() == {'food': 2, 'travel': 0}
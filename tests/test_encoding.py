@@ -0,0 +1,74 @@
+# Librearias de 3ros
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import OneHotEncoder
+# Librerias locales
+from helpers.encoding import CompiledOneHotEncoder, load_onehot_encoder
+
+OHE_PATH = 'streamlit_app/models/onehotencoder.pkl'
+
+
+@pytest.fixture
+def categories_frame(raw_transactions) -> pd.DataFrame:
+    """
+    Columnas del codificador con una categoría desconocida y valores nulos.
+    """
+    data = raw_transactions[['category', 'gender']].copy()
+    data.loc[::97, 'category'] = 'categoria_nueva'
+    data.loc[::101, 'gender'] = np.nan
+
+    return data
+
+
+@pytest.mark.filterwarnings('ignore:Found unknown categories')
+def test_compiled_encoder_matches_sklearn(categories_frame):
+    encoder = joblib.load(OHE_PATH)
+    compiled = CompiledOneHotEncoder.from_encoder(encoder)
+
+    expected = encoder.transform(categories_frame)
+
+    assert compiled.feature_names_out == list(encoder.get_feature_names_out())
+    np.testing.assert_array_equal(compiled.transform(categories_frame), expected)
+    np.testing.assert_array_equal(compiled.transform(categories_frame.astype('category')), expected)
+
+@pytest.mark.filterwarnings('ignore:Found unknown categories')
+def test_compiled_encoder_writes_into_float32_block(categories_frame):
+    encoder = joblib.load(OHE_PATH)
+    compiled = load_onehot_encoder(OHE_PATH)
+    out = np.full((len(categories_frame), len(compiled.feature_names_out) + 2), 7, dtype=np.float32)
+
+    compiled.transform(categories_frame, out=out[:, 1:-1])
+
+    np.testing.assert_array_equal(out[:, 1:-1], encoder.transform(categories_frame))
+    # Las columnas fuera del bloque no se modifican
+    assert (out[:, 0] == 7).all() and (out[:, -1] == 7).all()
+
+@pytest.mark.parametrize('drop', [None, 'first', 'if_binary'])
+def test_compiled_encoder_matches_sklearn_drop_options(drop):
+    train = pd.DataFrame({'color': ['rojo', 'verde', 'azul', 'rojo'], 'size': ['S', 'M', 'S', 'L']})
+    data = pd.DataFrame({'color': ['azul', 'verde', 'rojo', 'rojo'], 'size': ['L', 'S', 'M', 'M']})
+    encoder = OneHotEncoder(drop=drop, sparse_output=False).fit(train)
+
+    compiled = CompiledOneHotEncoder.from_encoder(encoder)
+
+    np.testing.assert_array_equal(compiled.transform(data), encoder.transform(data))
+
+def test_compiled_encoder_unknown_category_raises_like_sklearn():
+    train = pd.DataFrame({'color': ['rojo', 'verde']})
+    encoder = OneHotEncoder(handle_unknown='error', sparse_output=False).fit(train)
+    compiled = CompiledOneHotEncoder.from_encoder(encoder)
+    data = pd.DataFrame({'color': ['rojo', 'morado']})
+
+    with pytest.raises(ValueError):
+        encoder.transform(data)
+    with pytest.raises(ValueError):
+        compiled.transform(data)
+
+def test_compiled_encoder_rejects_infrequent_categories():
+    train = pd.DataFrame({'color': ['rojo'] * 10 + ['verde']})
+    encoder = OneHotEncoder(min_frequency=2, sparse_output=False).fit(train)
+
+    with pytest.raises(ValueError):
+        CompiledOneHotEncoder.from_encoder(encoder)
@@ -0,0 +1,84 @@
+# Librerias estandar
+import io
+from datetime import datetime
+from math import atan2, cos, radians, sin, sqrt
+# Librearias de 3ros
+import joblib
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.artifacts import load_joblib
+from helpers.features import FEATURE_COLUMNS, build_feature_matrix
+from helpers.preprocessing import COLS_TO_SCALE, preprocessing_data, scale_features
+from helpers.schema import MODEL_COLUMNS, read_transactions
+
+# Tolerancia absoluta de la matriz float32: al escalar 'trans_year' se resta la media (~2019) en float32, y el
+# espaciado de float32 cerca de 2020 es ~1.2e-4
+FLOAT32_ATOL = 2e-4
+
+
+def reference_features(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Características escaladas con el pipeline original: merges, accesores `.dt`, `apply` fila por fila,
+    `OneHotEncoder.transform` de scikit-learn y `scaler.transform`.
+    """
+    data = data.copy()
+    for path, key in [
+        ('streamlit_app/data/group_fraud_by_merch.csv', 'merchant'),
+        ('streamlit_app/data/group_fraud_by_city.csv', 'city'),
+        ('streamlit_app/data/group_fraud_by_state.csv', 'state'),
+    ]:
+        group = pd.read_csv(path)
+        data = data.merge(group[[key] + [col for col in group.columns if col.startswith('fraud_')]], on=key, how='left')
+    data = data.merge(pd.read_csv('streamlit_app/data/job_freq.csv'), on='job', how='left')
+    data = data.rename(columns={'proportion': 'job_encoded'})
+
+    trans_time = pd.to_datetime(data['trans_date_trans_time'])
+    data['trans_day'] = trans_time.dt.day
+    data['trans_month'] = trans_time.dt.month
+    data['trans_year'] = trans_time.dt.year
+    data['trans_hour'] = trans_time.dt.hour
+    data['trans_weekday'] = trans_time.dt.weekday
+    data['age'] = ((pd.to_datetime(datetime.now().date()) - pd.to_datetime(data['dob'])).dt.days / 365.25).astype('int')
+
+    def haversine(row) -> float:
+        lat1, lon1, lat2, lon2 = radians(row['lat']), radians(row['long']), radians(row['merch_lat']), radians(row['merch_long'])
+        a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+        return 6371.0 * 2 * atan2(sqrt(a), sqrt(1 - a))
+    data['distance_to_merch'] = data.apply(haversine, axis=1)
+
+    encoder = joblib.load('streamlit_app/models/onehotencoder.pkl')
+    ohe = pd.DataFrame(encoder.transform(data[['category', 'gender']]), columns=encoder.get_feature_names_out())
+    data = pd.concat([data, ohe], axis=1)
+
+    scaler = joblib.load('streamlit_app/models/scaler.pkl')
+    data[COLS_TO_SCALE] = scaler.transform(data[COLS_TO_SCALE])
+
+    return data[FEATURE_COLUMNS]
+
+
+def test_build_feature_matrix_matches_original_pipeline(transactions_csv, raw_transactions):
+    expected = reference_features(raw_transactions).to_numpy(dtype=np.float64)
+
+    features = build_feature_matrix(read_transactions(io.StringIO(transactions_csv), columns=MODEL_COLUMNS))
+
+    assert features.dtype == np.float32
+    assert features.shape == (len(raw_transactions), len(FEATURE_COLUMNS))
+    # float32: las diferencias son de redondeo; las claves desconocidas quedan en NaN en ambas rutas
+    np.testing.assert_allclose(features, expected, rtol=1e-5, atol=FLOAT32_ATOL, equal_nan=True)
+
+def test_build_feature_matrix_matches_preprocessing_and_scaling(raw_transactions):
+    scaler = load_joblib('streamlit_app/models/scaler.pkl')
+    preprocessed = preprocessing_data(raw_transactions).drop(columns=['is_fraud'])
+    expected = scale_features(preprocessed, scaler)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+    features = build_feature_matrix(raw_transactions, scaler)
+
+    np.testing.assert_allclose(features, expected, rtol=1e-5, atol=FLOAT32_ATOL, equal_nan=True)
+
+def test_build_feature_matrix_does_not_modify_input(raw_transactions):
+    before = raw_transactions.copy()
+
+    build_feature_matrix(raw_transactions)
+
+    pd.testing.assert_frame_equal(raw_transactions, before)
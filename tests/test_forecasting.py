@@ -0,0 +1,40 @@
+# Librerias estandar
+import os
+import shutil
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+# Librerias locales
+from helpers.compiled_model import export_compiled_model
+from helpers.forecasting import FORECAST_MODEL_PATH, FraudForecaster
+
+
+def hourly_frauds(n_hours: int = 24 * 10, seed: int = 3) -> pd.Series:
+    """
+    Fraudes por hora sintéticos con un patrón diario.
+    """
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range('2020-06-01', periods=n_hours, freq='h')
+    rate = 1.5 + np.sin(2 * np.pi * hours.hour / 24)
+
+    return pd.Series(rng.poisson(rate).astype(float), index=hours)
+
+def test_forecast_without_compiled_export(tmp_path):
+    # Copia del modelo de la serie temporal sin la carpeta 'compiled' a su lado (como en un clon recién hecho)
+    model_path = os.path.join(tmp_path, 'serie.cbm')
+    shutil.copy(FORECAST_MODEL_PATH, model_path)
+    frauds = hourly_frauds()
+
+    forecaster = FraudForecaster(model_path)
+    forecaster.update(frauds)
+    daily = forecaster.daily_forecast(3)
+
+    assert len(daily) == 3 and np.isfinite(daily.to_numpy()).all() and (daily >= 0).all()
+
+    # Misma predicción que con la exportación compilada del mismo modelo
+    export_compiled_model(model_path)
+    compiled_forecaster = FraudForecaster(model_path)
+    compiled_forecaster.update(frauds)
+
+    assert type(compiled_forecaster.model) is not type(forecaster.model)
+    np.testing.assert_allclose(compiled_forecaster.daily_forecast(3), daily, rtol=1e-6)
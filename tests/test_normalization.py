@@ -0,0 +1,53 @@
+# Librerias estandar
+import io
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+import pytest
+# Librerias locales
+from helpers.normalization import TABLE_COLUMNS, load_normalized_tables, normalize_tables
+from helpers.schema import read_transactions
+
+
+@pytest.fixture(params=['raw', 'schema'])
+def transactions_with_duplicates(request, transactions_csv) -> pd.DataFrame:
+    """
+    Transacciones con filas repetidas (como al subir dos veces parte del mismo archivo) y valores nulos, leídas
+    sin esquema o con el esquema compacto (columnas categóricas).
+    """
+    csv = io.StringIO(transactions_csv)
+    data = pd.read_csv(csv) if request.param == 'raw' else read_transactions(csv)
+    data = pd.concat([data, data.iloc[::7], data.iloc[:50]], ignore_index=True)
+    data.loc[::211, 'street'] = np.nan
+    data.loc[::307, 'merch_lat'] = np.nan
+
+    return data
+
+
+def test_normalize_tables_matches_drop_duplicates(transactions_with_duplicates):
+    tables = normalize_tables(transactions_with_duplicates)
+
+    assert list(tables) == list(TABLE_COLUMNS)
+    for table_name, columns in TABLE_COLUMNS.items():
+        expected = transactions_with_duplicates[columns].drop_duplicates()
+        pd.testing.assert_frame_equal(tables[table_name], expected)
+
+def test_normalize_tables_without_duplicates_keeps_all_rows(raw_transactions):
+    tables = normalize_tables(raw_transactions)
+
+    pd.testing.assert_frame_equal(tables['transactions'], raw_transactions[TABLE_COLUMNS['transactions']])
+
+def test_normalize_tables_distinguishes_text_only_differences(raw_transactions):
+    # Filas idénticas salvo por 'trans_num', la única columna de texto que se compara solo entre candidatos
+    data = pd.concat([raw_transactions.iloc[:20], raw_transactions.iloc[:20]], ignore_index=True)
+    data.loc[20:29, 'trans_num'] = data.loc[20:29, 'trans_num'] + 'x'
+
+    tables = normalize_tables(data)
+
+    pd.testing.assert_frame_equal(tables['transactions'], data[TABLE_COLUMNS['transactions']].drop_duplicates())
+    assert len(tables['transactions']) == 30
+
+def test_load_normalized_tables_reuses_tables_per_dataset(raw_transactions):
+    first = load_normalized_tables('test-dataset', raw_transactions)
+
+    assert load_normalized_tables('test-dataset', raw_transactions) is first
@@ -0,0 +1,32 @@
+# Librearias de 3ros
+import numpy as np
+import pytest
+# Librerias locales
+from helpers import parallel
+from helpers.artifacts import load_joblib
+from helpers.features import build_feature_matrix
+
+
+@pytest.fixture
+def process_pool():
+    yield
+    if parallel._executor is not None:
+        parallel._executor.shutdown()
+        parallel._executor = None
+
+
+def test_parallel_build_features_matches_serial_and_reuses_one_pool(raw_transactions, process_pool):
+    scaler = load_joblib('streamlit_app/models/scaler.pkl')
+
+    features = parallel.parallel_build_features(raw_transactions, scaler, n_workers=2, min_rows_per_partition=500)
+    first_pool = parallel._executor
+
+    np.testing.assert_array_equal(features, build_feature_matrix(raw_transactions, scaler))
+
+    # Con otro número de procesos, el pool anterior se cierra y se reemplaza
+    features = parallel.parallel_build_features(raw_transactions, scaler, n_workers=3, min_rows_per_partition=500)
+
+    assert parallel._executor is not first_pool and parallel._executor_workers == 3
+    with pytest.raises(RuntimeError):
+        first_pool.submit(int)
+    np.testing.assert_array_equal(features, build_feature_matrix(raw_transactions, scaler))
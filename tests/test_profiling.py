@@ -0,0 +1,37 @@
+# Librerias estandar
+import sys
+# Librearias de 3ros
+import pytest
+# Librerias locales
+from helpers import profiling
+from helpers.profiling import StageProfiler, active_profiler, profile_stage
+
+
+def test_activate_stops_the_profiler_when_a_stage_fails():
+    profiler = StageProfiler()
+
+    with pytest.raises(RuntimeError):
+        with profiler.activate():
+            with profile_stage('etapa', rows=10):
+                raise RuntimeError("fallo")
+
+    assert active_profiler() is None
+    assert profiler.summary()['etapa'].tolist() == ['etapa']
+
+def test_memory_is_not_measured_without_proc_or_psutil(monkeypatch):
+    # Monitor nuevo: crearlo no toca /proc ni importa psutil
+    monitor = profiling._RssMonitor()
+    assert not monitor._ready
+
+    monkeypatch.setattr(profiling, '_rss_monitor', monitor)
+    monkeypatch.setattr(sys, 'platform', 'win32')
+    monkeypatch.setitem(sys.modules, 'psutil', None)
+
+    profiler = StageProfiler()
+    with profiler.activate():
+        with profile_stage('etapa', rows=10):
+            pass
+
+    assert monitor._ready and not monitor.available
+    assert profiler.summary()['pico_rss_mb'].isna().all()
+    assert '"rss_available": false' in profiler.to_json()
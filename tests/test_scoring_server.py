@@ -0,0 +1,86 @@
+# Librerias estandar
+import asyncio
+import json
+import threading
+import urllib.error
+import urllib.request
+# Librearias de 3ros
+import numpy as np
+import pytest
+# Librerias locales
+from scoring_server import ScoringHTTPServer, ScoringRequestHandler, start_micro_batcher
+
+
+class StubScorer:
+    """
+    Scorer de prueba: falla con un error inesperado si la transacción lo pide.
+    """
+    threshold = 0.5
+
+    def features(self, transaction: dict) -> list:
+        return [transaction['amt']]
+
+    def score(self, transaction: dict) -> float:
+        if transaction.get('fallar'):
+            raise RuntimeError("fallo interno")
+        return 0.9
+
+
+class StalledModel:
+    """
+    Modelo de prueba que no responde a tiempo, para simular un micro-batcher saturado.
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def predict_proba(self, features, thread_count: int = 1):
+        self.release.wait(5)
+        return np.full((len(features), 2), 0.5)
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**handler_attrs) -> str:
+        handler = type('Handler', (ScoringRequestHandler,), {'scorer': StubScorer(), **handler_attrs})
+        server = ScoringHTTPServer(('127.0.0.1', 0), handler)
+        server.verbose = False
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/score"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def post(url: str, payload: dict) -> tuple:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'), method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_unexpected_errors_return_a_json_500(serve):
+    url = serve()
+
+    assert post(url, {'amt': 1.0})[0] == 200
+    status, body = post(url, {'amt': 1.0, 'fallar': True})
+    assert status == 500
+    assert 'error' in body
+
+def test_stalled_micro_batch_returns_503(serve):
+    model = StalledModel()
+    batcher, loop = start_micro_batcher(model, max_batch_size=4, max_wait_ms=1)
+    try:
+        status, body = post(serve(batcher=batcher, batcher_loop=loop, batch_timeout_s=0.2), {'amt': 1.0})
+    finally:
+        model.release.set()
+        asyncio.run_coroutine_threadsafe(batcher.stop(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+
+    assert status == 503
+    assert 'error' in body
@@ -0,0 +1,100 @@
+# Librearias de 3ros
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+# Librerias locales
+from helpers.sql_utils import append_new_data_to_db, copy_dataframe, copy_table, ensure_table, interactive_connection, new_rows
+
+
+class RecordingCursor:
+    """
+    Cursor de prueba que guarda el CSV de cada COPY.
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def copy_expert(self, statement, buffer) -> None:
+        self.batches.append(buffer.getvalue())
+
+
+def test_copy_dataframe_sends_selected_columns_in_batches():
+    data = pd.DataFrame({'a': range(10), 'b': list('abcdefghij'), 'c': [0.5] * 10})
+    cursor = RecordingCursor()
+
+    rows = copy_dataframe(data, 'tabla', cursor, columns=['b', 'a'], batch_size=4)
+
+    assert rows == 10
+    assert [batch.count('\n') for batch in cursor.batches] == [4, 4, 2]
+    assert cursor.batches[0].splitlines()[0] == 'a,0'
+    assert ''.join(cursor.batches) == data[['b', 'a']].to_csv(index=False, header=False)
+
+
+def test_append_new_data_to_db_skips_existing_and_keeps_first_duplicate(pg_engine, pg_table_names):
+    table_name = pg_table_names('users')
+    first_load = pd.DataFrame({'cc_num': [1, 2, 3], 'name': ['Ana', 'Hugo', 'Laura']})
+    second_load = pd.DataFrame({'cc_num': [3, 4, 4, 5, 4], 'name': ['Otra', 'Primera', 'Segunda', 'Sofia', 'Tercera']})
+
+    assert append_new_data_to_db(['cc_num'], table_name, first_load, pg_engine) == {'inserted': 3, 'skipped': 0}
+    assert append_new_data_to_db(['cc_num'], table_name, second_load, pg_engine, batch_percentage=0.4) == {'inserted': 2, 'skipped': 3}
+
+    with pg_engine.connect() as connection:
+        stored = pd.read_sql(text(f"SELECT cc_num, name FROM {table_name} ORDER BY cc_num"), connection)
+    assert stored['name'].tolist() == ['Ana', 'Hugo', 'Laura', 'Primera', 'Sofia']
+
+def test_append_new_data_to_db_uses_a_unique_index_and_keeps_null_keys(pg_engine, pg_table_names):
+    table_name = pg_table_names('merchants')
+    data = pd.DataFrame({'merchant': ['a', 'b', None, None], 'merch_lat': [1.0, 2.0, 3.0, 3.0]})
+
+    assert append_new_data_to_db(['merchant', 'merch_lat'], table_name, data, pg_engine) == {'inserted': 4, 'skipped': 0}
+    assert append_new_data_to_db(['merchant', 'merch_lat'], table_name, data, pg_engine) == {'inserted': 2, 'skipped': 2}
+
+    # El índice único impide duplicados también fuera de append_new_data_to_db (por ejemplo, otra carga concurrente)
+    with pytest.raises(IntegrityError):
+        with pg_engine.begin() as connection:
+            connection.execute(text(f"INSERT INTO {table_name} (merchant, merch_lat) VALUES ('a', 1.0)"))
+
+def test_append_new_data_to_db_without_unique_index_on_repeated_keys(pg_engine, pg_table_names):
+    table_name = pg_table_names('users')
+    # Tabla cargada antes con COPY, con una clave repetida: el índice único no se puede crear
+    copy_table(pd.DataFrame({'cc_num': [1, 1, 2], 'name': ['Ana', 'Ana', 'Hugo']}), table_name, pg_engine)
+    new_data = pd.DataFrame({'cc_num': [2, 3, 3], 'name': ['Hugo', 'Laura', 'Otra']})
+
+    assert append_new_data_to_db(['cc_num'], table_name, new_data, pg_engine) == {'inserted': 1, 'skipped': 2}
+
+    with pg_engine.connect() as connection:
+        stored = pd.read_sql(text(f"SELECT cc_num, name FROM {table_name} ORDER BY cc_num, name"), connection)
+    assert stored['name'].tolist() == ['Ana', 'Ana', 'Hugo', 'Laura']
+
+def test_copy_table_adds_missing_columns_to_existing_table(pg_engine, pg_table_names):
+    table_name = pg_table_names('predictions')
+    # Tabla creada como en la versión original: solo 'is_fraud'
+    pd.DataFrame({'is_fraud': [0, 1]}).to_sql(table_name, pg_engine, index=False)
+    predictions = pd.DataFrame({'trans_num': ['a1', 'b2'], 'is_fraud': [1, 0]})
+
+    stats = copy_table(predictions, table_name, pg_engine)
+
+    assert stats['rows'] == 2
+    with pg_engine.connect() as connection:
+        stored = pd.read_sql(text(f"SELECT trans_num, is_fraud FROM {table_name} ORDER BY trans_num NULLS FIRST, is_fraud"), connection)
+    assert stored['trans_num'].tolist() == [None, None, 'a1', 'b2']
+    assert stored['is_fraud'].tolist() == [0, 1, 1, 0]
+    assert ensure_table(predictions, table_name, pg_engine) == []
+
+def test_interactive_connection_limits_only_its_own_transaction(pg_engine):
+    with interactive_connection(pg_engine, timeout_ms=1500) as connection:
+        assert connection.execute(text("SHOW statement_timeout")).scalar_one() == '1500ms'
+
+    # El límite termina con la transacción: las demás conexiones (cargas masivas) no quedan limitadas
+    with pg_engine.connect() as connection:
+        assert connection.execute(text("SHOW statement_timeout")).scalar_one() == '0'
+
+def test_new_rows_keeps_the_first_row_of_each_key_not_in_the_table(pg_engine, pg_table_names):
+    table_name = pg_table_names('transactions')
+    data = pd.DataFrame({'trans_num': ['a', 'b', 'c', 'c', 'd'], 'amt': [1.0, 2.0, 3.0, 4.0, 5.0]})
+
+    assert new_rows(data, 'trans_num', table_name, pg_engine)['amt'].tolist() == [1.0, 2.0, 3.0, 5.0]
+
+    copy_table(data.iloc[[0, 2]], table_name, pg_engine)
+    assert new_rows(data, 'trans_num', table_name, pg_engine)['trans_num'].tolist() == ['b', 'd']
@@ -0,0 +1,66 @@
+# Librerias estandar
+import io
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+# Librerias locales
+from helpers.artifacts import load_joblib
+from helpers.streaming import classification_report_from_confusion, predict_csv_in_chunks
+
+
+class ThresholdModel:
+    """
+    Modelo de prueba: marca como fraude las transacciones con monto (escalado) alto.
+    """
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return (features[:, 0] > 1.0).astype(np.int64)
+
+
+@pytest.mark.parametrize('labels_seed', [0, 1, 2])
+def test_report_from_confusion_matches_sklearn(labels_seed):
+    rng = np.random.default_rng(labels_seed)
+    target = (rng.random(500) < 0.1).astype(int)
+    predictions = np.where(rng.random(500) < 0.8, target, 1 - target)
+
+    accuracy, report = classification_report_from_confusion(confusion_matrix(target, predictions, labels=[0, 1]))
+    expected = pd.DataFrame(classification_report(target, predictions, output_dict=True)).transpose()
+
+    assert accuracy == pytest.approx(accuracy_score(target, predictions))
+    pd.testing.assert_frame_equal(report, expected, check_dtype=False)
+
+def test_predict_csv_in_chunks_matches_single_pass(transactions_csv):
+    scaler = load_joblib('streamlit_app/models/scaler.pkl')
+
+    total_rows, fraud_cnt, accuracy, report = predict_csv_in_chunks(
+        io.StringIO(transactions_csv), ThresholdModel(), scaler, chunksize=700
+    )
+
+    data = pd.read_csv(io.StringIO(transactions_csv))
+    amt_scaled = (data['amt'] - scaler.mean_[0]) / scaler.scale_[0]
+    predictions = (amt_scaled > 1.0).astype(int)
+    assert total_rows == len(data)
+    assert fraud_cnt == predictions.sum()
+    assert accuracy == pytest.approx(accuracy_score(data['is_fraud'], predictions))
+
+def test_predict_csv_in_chunks_rejects_unknown_labels(raw_transactions):
+    data = raw_transactions.copy()
+    data.loc[10, 'is_fraud'] = 3
+    scaler = load_joblib('streamlit_app/models/scaler.pkl')
+
+    with pytest.raises(ValueError, match='Etiquetas desconocidas'):
+        predict_csv_in_chunks(io.StringIO(data.to_csv(index=False)), ThresholdModel(), scaler, chunksize=700)
+
+def test_predict_csv_in_chunks_copies_each_chunk_to_the_database(transactions_csv, monkeypatch):
+    copied = []
+    monkeypatch.setattr('helpers.streaming.copy_table', lambda data, table_name, engine: copied.append((table_name, len(data))))
+    scaler = load_joblib('streamlit_app/models/scaler.pkl')
+
+    total_rows, *_ = predict_csv_in_chunks(
+        io.StringIO(transactions_csv), ThresholdModel(), scaler, chunksize=700, engine=object(), table_name='predicciones'
+    )
+
+    assert [name for name, _ in copied] == ['predicciones'] * 5
+    assert sum(rows for _, rows in copied) == total_rows
@@ -0,0 +1,56 @@
+# Librerias estandar
+import io
+import os
+import zipfile
+# Librearias de 3ros
+import pandas as pd
+import pytest
+# Librerias locales
+from helpers import upload_cache
+from helpers.upload_cache import cache_uploaded_zip, dataset_cache_path, evict_dataset_cache, load_dataset
+
+
+def zip_bytes(files: dict) -> io.BytesIO:
+    """
+    Crea un zip en memoria con los archivos indicados (nombre -> contenido).
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zip_ref:
+        for name, content in files.items():
+            zip_ref.writestr(name, content)
+    buffer.seek(0)
+
+    return buffer
+
+def test_cache_uploaded_zip_round_trip_with_versioned_path(transactions_csv, tmp_path):
+    dataset_key = cache_uploaded_zip(zip_bytes({'datos.csv': transactions_csv}), cache_dir=str(tmp_path))
+
+    path = dataset_cache_path(dataset_key, str(tmp_path))
+    assert os.path.exists(path)
+    assert f".v{upload_cache.UPLOAD_CACHE_VERSION}." in os.path.basename(path)
+
+    data = load_dataset(dataset_key, cache_dir=str(tmp_path))
+    expected = pd.read_csv(io.StringIO(transactions_csv))
+    assert len(data) == len(expected)
+    assert data['trans_num'].tolist() == expected['trans_num'].tolist()
+
+def test_cache_uploaded_zip_reports_parse_errors(tmp_path):
+    bad_csv = "trans_date_trans_time,cc_num,amt\nno-es-una-fecha,1,2.5\n"
+
+    with pytest.raises(ValueError):
+        cache_uploaded_zip(zip_bytes({'datos.csv': bad_csv}), cache_dir=str(tmp_path))
+    assert not any(name.endswith('.arrow') for name in os.listdir(tmp_path))
+
+def test_evict_dataset_cache_removes_stale_versions_and_oldest_files(tmp_path):
+    cache_dir = str(tmp_path)
+    stale = os.path.join(cache_dir, 'viejo.v0-00000000.arrow')
+    oldest, newest, keep = (dataset_cache_path(name, cache_dir) for name in ['a', 'b', 'c'])
+    for mtime, path in enumerate([stale, oldest, newest, keep]):
+        with open(path, 'wb') as f:
+            f.write(b'x' * 100)
+        os.utime(path, (mtime, mtime))
+
+    removed = evict_dataset_cache(cache_dir, max_bytes=250, keep=keep)
+
+    assert sorted(removed) == sorted([stale, oldest])
+    assert os.path.exists(newest) and os.path.exists(keep)
@@ -0,0 +1,111 @@
+# Librerias estandar
+from math import atan2, cos, radians, sin, sqrt
+# Librearias de 3ros
+import numpy as np
+import pandas as pd
+import pytest
+# Librerias locales
+from helpers.utils import calc_pct_n_rank, frauds_per_day, haversine_distance, haversine_distance_array, job_encoder
+
+
+def reference_haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Distancia Haversine fila por fila con `math`, como en la versión original de `haversine_distance`.
+    """
+    lat1_rad, lon1_rad, lat2_rad, lon2_rad = radians(lat1), radians(lon1), radians(lat2), radians(lon2)
+    a = sin((lat2_rad - lat1_rad) / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin((lon2_rad - lon1_rad) / 2) ** 2
+
+    return 6371.0 * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+
+def test_haversine_distance_array_matches_scalar_formula(raw_transactions):
+    coords = raw_transactions[['lat', 'long', 'merch_lat', 'merch_long']].to_numpy()
+    expected = np.array([reference_haversine(*row) for row in coords])
+
+    distances = haversine_distance_array(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3])
+
+    np.testing.assert_allclose(distances, expected, rtol=1e-12)
+
+def test_haversine_distance_array_writes_float32_output(raw_transactions):
+    coords = raw_transactions[['lat', 'long', 'merch_lat', 'merch_long']].to_numpy()
+    out = np.empty(len(coords), dtype=np.float32)
+
+    result = haversine_distance_array(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3], out=out)
+
+    assert result is out
+    np.testing.assert_allclose(out, [reference_haversine(*row) for row in coords], rtol=1e-6)
+
+@pytest.mark.parametrize('points', [(0.0, 0.0, 0.0, 0.0), (40.7, -74.0, 34.05, -118.25), (-33.9, 151.2, 51.5, -0.13)])
+def test_haversine_distance_scalar(points):
+    assert haversine_distance(*points) == pytest.approx(reference_haversine(*points), rel=1e-12)
+
+
+def test_calc_pct_n_rank_matches_left_merge(raw_transactions):
+    expected = raw_transactions
+    for path, key in [
+        ('streamlit_app/data/group_fraud_by_merch.csv', 'merchant'),
+        ('streamlit_app/data/group_fraud_by_city.csv', 'city'),
+        ('streamlit_app/data/group_fraud_by_state.csv', 'state'),
+    ]:
+        group = pd.read_csv(path)
+        value_cols = [col for col in group.columns if col.startswith('fraud_')]
+        expected = expected.merge(group[[key] + value_cols], on=key, how='left')
+
+    result = calc_pct_n_rank(raw_transactions)
+
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected, check_dtype=False)
+    # El DataFrame original no se modifica
+    assert 'fraud_merch_pct' not in raw_transactions.columns
+
+def test_calc_pct_n_rank_unknown_keys_are_nan(raw_transactions):
+    result = calc_pct_n_rank(raw_transactions)
+    unknown = raw_transactions['merchant'] == 'fraud_Desconocido'
+
+    assert unknown.any()
+    assert result.loc[unknown, 'fraud_merch_pct'].isna().all()
+    assert result.loc[~unknown, 'fraud_merch_pct'].notna().all()
+
+def test_job_encoder_matches_left_merge(raw_transactions):
+    job_freq = pd.read_csv('streamlit_app/data/job_freq.csv')
+    expected = raw_transactions.merge(job_freq, on='job', how='left').rename(columns={'proportion': 'job_encoded'})
+
+    result = job_encoder(raw_transactions)
+
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected, check_dtype=False)
+
+def test_lookups_accept_categorical_columns(raw_transactions):
+    categorical = raw_transactions.astype({'merchant': 'category', 'city': 'category', 'state': 'category', 'job': 'category'})
+
+    np.testing.assert_array_equal(
+        calc_pct_n_rank(categorical)['fraud_city_rank'].to_numpy(),
+        calc_pct_n_rank(raw_transactions)['fraud_city_rank'].to_numpy()
+    )
+    np.testing.assert_array_equal(
+        job_encoder(categorical)['job_encoded'].to_numpy(), job_encoder(raw_transactions)['job_encoded'].to_numpy()
+    )
+
+
+def reference_frauds_per_day(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fraudes por día con `resample`, como en la versión original de `frauds_per_day`.
+    """
+    data = data.copy()
+    data['trans_date_trans_time'] = pd.to_datetime(data['trans_date_trans_time'])
+    data_frauds = data[data['is_fraud'] == 1][['trans_date_trans_time', 'is_fraud']].set_index('trans_date_trans_time')
+
+    return data_frauds.resample('D').size().reset_index(name='total_transacciones')
+
+def test_frauds_per_day_matches_resample(raw_transactions):
+    # Unos días sin fraudes en medio del periodo, que también deben aparecer con 0
+    data = raw_transactions.copy()
+    dates = pd.to_datetime(data['trans_date_trans_time'])
+    data.loc[(dates >= '2020-08-01') & (dates < '2020-08-05'), 'is_fraud'] = 0
+
+    expected = reference_frauds_per_day(data)
+    result = frauds_per_day(data)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert (result['total_transacciones'] == 0).any()
+    # El DataFrame original no se modifica (la fecha sigue siendo texto)
+    assert data['trans_date_trans_time'].dtype == object